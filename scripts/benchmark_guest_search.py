@@ -0,0 +1,103 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime
+
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from src.main import app
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.services.guest_search import find_guests, trigram_available
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ishaan', 'Rohan', 'Priya', 'Ananya', 'Diya', 'Kavya', 'Meera',
+               'John', 'Emma', 'Michael', 'Sophia', 'James', 'Olivia', 'Robert', 'Ava', 'David', 'Isabella']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Patel', 'Singh', 'Khan', 'Das',
+              'Smith', 'Johnson', 'Brown', 'Williams', 'Jones', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor']
+
+# Front-desk style queries: name fragments, typos and phone prefixes
+QUERIES = ['Priya', 'shar', 'Jon Smth', 'Kavya Nair', 'Willaims', 'ish', '98765', '70', 'Meera Iyer', 'Patle']
+
+# The search as it was before the indexed modes: unranked, unbounded ilike
+def legacy_search(query):
+    return Guest.query.filter(
+        (Guest.full_name.ilike(f'%{query}%')) |
+        (Guest.contact_number.ilike(f'%{query}%'))
+    ).all()
+
+def seed_guests(count, batch_size=10000):
+    room = Room(room_number=f'bench-{int(time.time())}', capacity=count, status='occupied')
+    db.session.add(room)
+    db.session.flush()
+    
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        rows.append({
+            'full_name': f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {i}',
+            'contact_number': f'{random.choice("6789")}{random.randint(0, 999999999):09d}',
+            'id_proof_url': 'benchmark',
+            'check_in_date': date.today(),
+            'rent_amount': 5000,
+            'status': 'active',
+            'room_id': room.id,
+            'created_at': now,
+            'updated_at': now
+        })
+        if len(rows) == batch_size:
+            db.session.execute(Guest.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Guest.__table__.insert(), rows)
+    
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text('ANALYZE guests'))
+
+def measure(search, repeat):
+    timings = []
+    results = 0
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            results += len(search(query))
+            timings.append((time.perf_counter() - started) * 1000)
+    
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'rows': results / repeat
+    }
+
+# Compares the legacy ilike search with the indexed search on synthetic
+# guests. Seeded rows are rolled back at the end. Run after migrations so the
+# search indexes exist.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark guest search')
+    parser.add_argument('--guests', type=int, default=100000, help='Synthetic guests to add')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes over the query set')
+    parser.add_argument('--limit', type=int, default=20, help='Result limit for the indexed search')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        try:
+            print(f"Seeding {args.guests} guests...")
+            seed_guests(args.guests)
+            
+            results = {
+                'legacy ilike': measure(legacy_search, args.repeat),
+                'indexed': measure(lambda query: find_guests(query, args.limit)[0], args.repeat)
+            }
+            
+            print(f"Database: {db.engine.dialect.name}, trigram index: {'yes' if trigram_available() else 'no'}")
+            print(f"{'mode':14} {'p50 ms':>10} {'p95 ms':>10} {'rows/pass':>12}")
+            for mode, result in results.items():
+                print(f"{mode:14} {result['p50']:10.2f} {result['p95']:10.2f} {result['rows']:12.0f}")
+        finally:
+            db.session.rollback()
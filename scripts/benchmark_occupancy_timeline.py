@@ -0,0 +1,100 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from src.main import app
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+from src.services.occupancy_timeline import build_occupancy_timeline, occupancy_timeline_cache
+
+def seed_stays(rooms, stays, years, batch_size=10000):
+    now = datetime.utcnow()
+    first_day = date.today() - timedelta(days=365 * years)
+    
+    room_ids = []
+    for i in range(rooms):
+        room = Room(room_number=f'bench-{int(time.time())}-{i}', capacity=4, status='available')
+        db.session.add(room)
+        db.session.flush()
+        room_ids.append(room.id)
+    
+    guest = Guest(full_name='Benchmark Guest', contact_number='0000000000', id_proof_url='benchmark',
+                  check_in_date=first_day, rent_amount=1, status='inactive', room_id=room_ids[0])
+    db.session.add(guest)
+    db.session.flush()
+    
+    rows = []
+    for _ in range(stays):
+        start_date = first_day + timedelta(days=random.randint(0, 365 * years))
+        rows.append({
+            'room_id': random.choice(room_ids),
+            'guest_id': guest.id,
+            'start_date': start_date,
+            'end_date': None if random.random() < 0.05 else start_date + timedelta(days=random.randint(1, 180)),
+            'created_at': now,
+            'updated_at': now
+        })
+        if len(rows) == batch_size:
+            db.session.execute(RoomHistory.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(RoomHistory.__table__.insert(), rows)
+    
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text('ANALYZE room_history'))
+    
+    return first_day
+
+def timed(start_date, end_date, by_room):
+    started = time.perf_counter()
+    timeline = build_occupancy_timeline(start_date, end_date, by_room=by_room)
+    return (time.perf_counter() - started) * 1000, len(timeline['days'])
+
+# Times a multi-year occupancy timeline with a cold cache, warm from the closed
+# month cache, and as the per-day query loop it replaces. Seeded rows are rolled
+# back at the end.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the occupancy timeline')
+    parser.add_argument('--rooms', type=int, default=200, help='Synthetic rooms to add')
+    parser.add_argument('--stays', type=int, default=50000, help='Synthetic room stays to add')
+    parser.add_argument('--years', type=int, default=3, help='Years the stays and the timeline span')
+    parser.add_argument('--by-room', action='store_true', help='Include the per-room series')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        try:
+            print(f"Seeding {args.stays} stays over {args.rooms} rooms...")
+            start_date = seed_stays(args.rooms, args.stays, args.years)
+            end_date = date.today()
+            
+            occupancy_timeline_cache.invalidate()
+            cold, days = timed(start_date, end_date, args.by_room)
+            warm, _ = timed(start_date, end_date, args.by_room)
+            
+            # One counting query per day, sampled and scaled to the full range
+            sample = 30
+            started = time.perf_counter()
+            for offset in range(0, days, days // sample):
+                day = start_date + timedelta(days=offset)
+                RoomHistory.query.filter(
+                    RoomHistory.start_date <= day,
+                    (RoomHistory.end_date == None) | (RoomHistory.end_date > day)
+                ).count()
+            per_day = (time.perf_counter() - started) * 1000 / len(range(0, days, days // sample)) * days
+            
+            print(f"Database: {db.engine.dialect.name}, {days} days")
+            print(f"{'query per day (est.)':22} {per_day:10.1f} ms")
+            print(f"{'sweep, cold cache':22} {cold:10.1f} ms")
+            print(f"{'sweep, warm cache':22} {warm:10.1f} ms")
+        finally:
+            db.session.rollback()
+            occupancy_timeline_cache.invalidate()
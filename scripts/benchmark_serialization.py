@@ -0,0 +1,111 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from flask import jsonify
+from src.main import app
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.payment import Payment
+from src.models.room import Room
+from src.services.serialization import serializable, serialized_rows, json_response, orjson
+
+def seed(count, batch_size=10000):
+    room = Room(room_number=f'bench-{int(time.time())}', capacity=count, status='occupied')
+    db.session.add(room)
+    db.session.flush()
+    
+    now = datetime.utcnow()
+    guests = []
+    for i in range(count):
+        guests.append({
+            'full_name': f'Benchmark Guest {i}',
+            'contact_number': f'9{random.randint(0, 999999999):09d}',
+            'id_proof_url': f'https://example.com/id/{i}.jpg',
+            'check_in_date': date.today() - timedelta(days=random.randint(0, 700)),
+            'rent_amount': random.randint(3000, 15000),
+            'status': 'active',
+            'room_id': room.id,
+            'created_at': now,
+            'updated_at': now
+        })
+        if len(guests) == batch_size:
+            db.session.execute(Guest.__table__.insert(), guests)
+            guests = []
+    if guests:
+        db.session.execute(Guest.__table__.insert(), guests)
+    
+    guest_id = db.session.query(Guest.id).filter_by(room_id=room.id).limit(1).scalar()
+    payments = []
+    for i in range(count):
+        payments.append({
+            'guest_id': guest_id,
+            'amount': random.randint(300000, 1500000) / 100,
+            'payment_date': date.today() - timedelta(days=i),
+            'payment_type': 'full',
+            'status': random.choice(['paid', 'unpaid', 'partial']),
+            # One guest's due dates must be unique
+            'due_date': date.today() - timedelta(days=i, weeks=1),
+            'created_at': now,
+            'updated_at': now
+        })
+        if len(payments) == batch_size:
+            db.session.execute(Payment.__table__.insert(), payments)
+            payments = []
+    if payments:
+        db.session.execute(Payment.__table__.insert(), payments)
+    
+    return room.id, guest_id
+
+# The list endpoint path before: hydrate models, to_dict() each, jsonify
+def to_dict_path(query):
+    return jsonify({'items': [item.to_dict() for item in query.all()]}).get_data()
+
+# The list endpoint path now: select the to_dict() columns as tuples, encode
+def serialized_path(query, model):
+    return json_response({'items': serialized_rows(serializable(query, model).all())}).get_data()
+
+def measure(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        body = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), body
+
+# Compares Guest.to_dict / Payment.to_dict + jsonify with the column-tuple
+# serialization path on synthetic rows, and checks both produce the same
+# bytes. Seeded rows are rolled back at the end.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark list serialization')
+    parser.add_argument('--rows', type=int, default=50000, help='Synthetic guests and payments to add')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the median is reported')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        try:
+            print(f"Seeding {args.rows} guests and {args.rows} payments...")
+            room_id, guest_id = seed(args.rows)
+            
+            cases = {
+                'Guest': (Guest, Guest.query.filter_by(room_id=room_id).order_by(Guest.id)),
+                'Payment': (Payment, Payment.query.filter_by(guest_id=guest_id).order_by(Payment.id))
+            }
+            
+            print(f"Database: {db.engine.dialect.name}, encoder: {'orjson' if orjson else 'json'}")
+            print(f"{'model':10} {'to_dict ms':>12} {'serialized ms':>14} {'speedup':>9} {'same bytes':>11}")
+            for name, (model, query) in cases.items():
+                before, expected = measure(lambda: to_dict_path(query), args.repeat)
+                after, body = measure(lambda: serialized_path(query, model), args.repeat)
+                print(f"{name:10} {before:12.1f} {after:14.1f} {before / after:8.1f}x {str(body == expected):>11}")
+        finally:
+            db.session.rollback()
@@ -0,0 +1,79 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import re
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only the report exports need; importing any of them at startup is a regression
+HEAVY_MODULES = ['pandas', 'numpy', 'fpdf', 'matplotlib', 'reportlab', 'weasyprint']
+
+# "import time: self [us] | cumulative | imported package"
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Imports the app in a fresh interpreter under -X importtime and returns
+# (module, self us, cumulative us, depth) for every module it loaded. The
+# database port points nowhere, so any database I/O at import fails loudly.
+def import_times(module):
+    env = dict(os.environ, DB_HOST='127.0.0.1', DB_PORT='1', PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Importing {module} failed")
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+# importtime prints a module after everything it imported, so the module's
+# direct imports are the depth 1 entries just before its own line
+def direct_imports(modules, module):
+    names = [entry[0] for entry in modules]
+    index = names.index(module) if module in names else len(modules)
+    children = []
+    for entry in reversed(modules[:index]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            children.append(entry)
+    return children
+
+# Reports how long importing the app takes and which modules dominate it.
+# Exits non-zero when a heavy report dependency is imported at startup or
+# the total exceeds --max-ms, so it can guard startup time in CI.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark application import time')
+    parser.add_argument('--module', default='src.main', help='Module to import')
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+    parser.add_argument('--max-ms', type=float, help='Fail when importing takes longer than this')
+    args = parser.parse_args()
+    
+    modules = import_times(args.module)
+    # Top-level entries cover everything imported beneath them
+    total_ms = sum(entry[2] for entry in modules if entry[3] == 0) / 1000
+    
+    print(f"Imported {len(modules)} modules in {total_ms:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, _ in sorted(direct_imports(modules, args.module), key=lambda entry: -entry[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+    
+    loaded = {entry[0].split('.')[0] for entry in modules}
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    failed = False
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Startup import time {total_ms:.1f} ms exceeds {args.max_ms:.1f} ms")
+        failed = True
+    
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,32 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from src.main import app
+from src.services.occupancy import find_occupancy_drift, repair_occupancy_drift
+
+# Compares each room's active occupant counter with its active guests and
+# optionally repairs the counters. Exits with status 1 when drift is found
+# and not repaired.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check room occupant counters against guests')
+    parser.add_argument('--repair', action='store_true', help='Reset drifted counters from the guests table')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        drift = repair_occupancy_drift() if args.repair else find_occupancy_drift()
+    
+    for room in drift:
+        print(f"Room {room['room_number']} (id {room['room_id']}): counter {room['counter']}, active guests {room['actual']}")
+    
+    if not drift:
+        print("All room occupant counters match")
+    elif args.repair:
+        print(f"Repaired {len(drift)} rooms")
+    else:
+        print(f"{len(drift)} rooms drifted; rerun with --repair to fix them")
+    
+    sys.exit(1 if drift and not args.repair else 0)
@@ -205,7 +205,7 @@ def create_mock_data():
             # Skip inactive guests
             if guest.status == "inactive":
                 continue
-                
+            
             # Create 3-6 payments for each active guest
             num_payments = random.randint(3, 6)
             for j in range(num_payments):
@@ -246,7 +246,7 @@ def create_mock_data():
             # Skip inactive guests
             if guest.status == "inactive":
                 continue
-                
+            
             # Create 2-4 notifications for each active guest
             num_notifications = random.randint(2, 4)
             for j in range(num_notifications):
@@ -274,6 +274,11 @@ def create_mock_data():
         
         db.session.commit()
         
+        # Change the table versions so clients holding ETags refetch
+        if db.inspect(db.engine).has_table('table_versions'):
+            db.session.execute(db.text("UPDATE table_versions SET version = version + 1"))
+            db.session.commit()
+        
         print("Mock data created successfully!")
         
         # Return summary of created data
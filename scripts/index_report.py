@@ -0,0 +1,54 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import json
+
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from src.main import app
+from src.models.db import db
+from src.services.index_report import build_index_report
+
+# Reports declared indexes missing from the database, indexes PostgreSQL has
+# never used, and hot queries whose plans fall back to sequential scans.
+# Exits with status 1 when anything is missing or flagged.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Report missing and unused indexes')
+    parser.add_argument('--min-rows', type=int, default=1000, help='Only flag sequential scans over tables at least this large')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        with db.engine.connect() as connection:
+            report = build_index_report(connection, args.min_rows)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Database: {report['dialect']}")
+        
+        print("\nMissing indexes:")
+        for index in report['missing_indexes']:
+            print(f"  {index['table']}.{index['index']}")
+        if not report['missing_indexes']:
+            print("  none")
+        
+        print("\nUnused indexes:")
+        for index in report['unused_indexes']:
+            print(f"  {index['table']}.{index['index']} ({index['size_bytes']} bytes, {index['scans']} scans)")
+        if not report['unused_indexes']:
+            print("  none" if report['dialect'] == 'postgresql' else "  not tracked by this database")
+        
+        print("\nHot query plans:")
+        for plan in report['plans']:
+            scans = ', '.join(f"{scan['table']} ({scan['rows']} rows)" for scan in plan['sequential_scans'])
+            status = 'SEQ SCAN' if plan['flagged'] else 'ok'
+            if plan.get('error'):
+                print(f"  {'ERROR':8} {plan['query']} - {plan['error']}")
+            else:
+                print(f"  {status:8} {plan['query']}" + (f" - scans {scans}" if scans else ''))
+    
+    flagged = report['missing_indexes'] or any(plan['flagged'] for plan in report['plans'])
+    sys.exit(1 if flagged else 0)
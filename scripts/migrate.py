@@ -0,0 +1,30 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import logging
+
+# Migrations run here explicitly, not as a side effect of importing the app
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from src.main import app
+from src.services.migrations import migration_status, run_migrations
+
+# Applies pending schema migrations from src/migrations.
+# Run as a deploy step when the app starts with AUTO_MIGRATE=false.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply schema migrations')
+    parser.add_argument('--target', type=int, help='Stop after this migration version')
+    parser.add_argument('--status', action='store_true', help='List migrations and whether they are applied')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    with app.app_context():
+        if args.status:
+            for migration, applied in migration_status():
+                print(f"{migration.version:04d} {'applied' if applied else 'pending':8} {migration.description}")
+        else:
+            versions = run_migrations(target=args.target)
+            print(f"Applied {len(versions)} migrations" + (f": {', '.join(f'{version:04d}' for version in versions)}" if versions else ''))
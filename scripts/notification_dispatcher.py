@@ -0,0 +1,36 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import logging
+from src.main import app
+from src.services.notification_dispatcher import NotificationDispatcher
+
+# Worker process that delivers pending notifications from the outbox.
+# Run one or more of these next to the web workers.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Deliver queued notifications')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('NOTIFICATION_CONCURRENCY', 4)), help='Parallel sends per batch')
+    parser.add_argument('--batch-size', type=int, default=int(os.getenv('NOTIFICATION_BATCH_SIZE', 100)), help='Notifications claimed per batch')
+    parser.add_argument('--max-attempts', type=int, default=int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5)), help='Attempts before a notification is marked failed')
+    parser.add_argument('--retry-base', type=int, default=int(os.getenv('NOTIFICATION_RETRY_BASE_SECONDS', 30)), help='First retry delay in seconds, doubled on each attempt')
+    parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to wait when the outbox is empty')
+    parser.add_argument('--once', action='store_true', help='Exit once the outbox is drained')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    dispatcher = NotificationDispatcher(
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts,
+        retry_base_seconds=args.retry_base
+    )
+    
+    try:
+        with app.app_context():
+            dispatcher.run(poll_interval=args.poll_interval, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dispatcher.close()
@@ -0,0 +1,18 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+from src.main import app
+from src.services.collection_rollup import rebuild_monthly_collection
+
+# Rebuilds the monthly collection rollup from the payments table.
+# Run after bulk imports or to repair drift, optionally for a single year.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Rebuild the monthly collection rollup')
+    parser.add_argument('--year', type=int, help='Only rebuild this year')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        rows = rebuild_monthly_collection(args.year)
+    
+    print(f"Rebuilt {rows} monthly collection rows")
@@ -0,0 +1,107 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import argparse
+import re
+import threading
+import time
+from collections import Counter
+from sqlalchemy.engine import make_url
+
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+from flask_jwt_extended import create_access_token
+from src.main import create_app
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+from src.services.etags import bump_table_versions
+from src.services.migrations import run_migrations
+
+# Databases the script agrees to write to: the name must mark them as scratch
+THROWAWAY_NAME = re.compile(r'(^|[_\-])(test|stress|scratch)([_\-]|$)')
+
+def throwaway_database(uri):
+    url = make_url(uri)
+    name = os.path.basename(url.database or '')
+    return bool(THROWAWAY_NAME.search(os.path.splitext(name)[0]))
+
+# Hammers one room with concurrent check-ins through the API and checks that
+# it never ends up over capacity, against PostgreSQL row locks where the test
+# suite (tests/test_concurrent_check_in.py) only has SQLite. It writes guest
+# rows, so it only runs against --database-url naming a throwaway database
+# (test, stress or scratch in the name), never the configured DATABASE_URL.
+# Exits with status 1 if the room was overfilled or its counter drifted.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Concurrent check-in stress test')
+    parser.add_argument('--database-url', required=True, help='Throwaway database to run against, e.g. postgresql://localhost/pg_stress')
+    parser.add_argument('--threads', type=int, default=20, help='Concurrent check-in requests per round')
+    parser.add_argument('--capacity', type=int, default=3, help='Capacity of the test room')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds to run, each against a fresh room')
+    args = parser.parse_args()
+    
+    if not throwaway_database(args.database_url) or args.database_url == os.getenv('DATABASE_URL'):
+        sys.exit(f'Refusing to write to {make_url(args.database_url).database!r}: '
+                 'pass a throwaway database with test, stress or scratch in its name')
+    
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url})
+    with app.app_context():
+        run_migrations()
+        token = create_access_token(identity={'id': 0, 'role': 'admin'})
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    failed = False
+    for round_number in range(1, args.rounds + 1):
+        with app.app_context():
+            room = Room(room_number=f'stress-{int(time.time() * 1000)}', capacity=args.capacity, status='available')
+            db.session.add(room)
+            db.session.commit()
+            room_id = room.id
+        
+        barrier = threading.Barrier(args.threads)
+        statuses = Counter()
+        statuses_lock = threading.Lock()
+        
+        def check_in(index):
+            client = app.test_client()
+            barrier.wait()
+            response = client.post('/api/v1/guests', headers=headers, json={
+                'full_name': f'Stress Guest {round_number}-{index}',
+                'contact_number': f'90000{index:05d}',
+                'id_proof_url': 'stress-test',
+                'check_in_date': time.strftime('%Y-%m-%d'),
+                'rent_amount': 1,
+                'room_id': room_id
+            })
+            code = (response.get_json(silent=True) or {}).get('error', {}).get('code', '')
+            with statuses_lock:
+                statuses[f'{response.status_code} {code}'.strip()] += 1
+        
+        threads = [threading.Thread(target=check_in, args=(index,)) for index in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        with app.app_context():
+            active_guests = Guest.query.filter_by(room_id=room_id, status='active').count()
+            counter = db.session.query(Room.active_occupants).filter_by(id=room_id).scalar()
+            
+            # Clean up the test room and its guests
+            guest_ids = [guest_id for guest_id, in db.session.query(Guest.id).filter_by(room_id=room_id)]
+            RoomHistory.query.filter_by(room_id=room_id).delete(synchronize_session=False)
+            Guest.query.filter(Guest.id.in_(guest_ids)).delete(synchronize_session=False)
+            Room.query.filter_by(id=room_id).delete(synchronize_session=False)
+            bump_table_versions('guests', 'rooms')
+            db.session.commit()
+        
+        ok = active_guests <= args.capacity and counter == active_guests
+        failed = failed or not ok
+        print(f"Round {round_number}: {dict(statuses)} -> {active_guests}/{args.capacity} active, counter {counter}, "
+              f"{elapsed * 1000:.0f} ms {'OK' if ok else 'FAILED'}")
+    
+    sys.exit(1 if failed else 0)
@@ -2,49 +2,30 @@ import os
 import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify, current_app
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from src.models.user import db
+from src.models.db import db, REPLICA_BIND
 from src.routes.auth import auth_bp
 from src.routes.user import user_bp
 from src.routes.room import room_bp
 from src.routes.guest import guest_bp
 from src.routes.payment import payment_bp
 from src.routes.notification import notification_bp
+from src.routes.dashboard import dashboard_bp
 from src.routes.report import report_bp
-
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-CORS(app)
-
-# Configuration
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-in-production'
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 86400  # 24 hours in seconds
-
-# Database configuration - PostgreSQL
-app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql://{os.getenv('DB_USERNAME', 'postgres')}:{os.getenv('DB_PASSWORD', 'postgres')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'pg_management')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Initialize extensions
-db.init_app(app)
-jwt = JWTManager(app)
-
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
-app.register_blueprint(user_bp, url_prefix='/api/v1')
-app.register_blueprint(room_bp, url_prefix='/api/v1')
-app.register_blueprint(guest_bp, url_prefix='/api/v1')
-app.register_blueprint(payment_bp, url_prefix='/api/v1')
-app.register_blueprint(notification_bp, url_prefix='/api/v1')
-app.register_blueprint(report_bp, url_prefix='/api/v1')
-
-# Create database tables
-with app.app_context():
-    db.create_all()
+from src.routes.report_job import report_job_bp
+from src.routes.search import search_bp
+from src.routes.metrics import metrics_bp
+from src.services.migrations import run_migrations
+from src.services.autocomplete import init_autocomplete
+from src.services.response_cache import response_cache
+from src.services.compression import init_compression, static_file_response
+from src.services.db_pool import database_uri, replica_database_uri, engine_options
+from src.services.read_replica import replica_router
+from src.services.query_counter import init_query_counter
 
 # Error handlers
-@app.errorhandler(404)
 def not_found(error):
     return jsonify({
         'success': False,
@@ -54,7 +35,6 @@ def not_found(error):
         }
     }), 404
 
-@app.errorhandler(500)
 def server_error(error):
     return jsonify({
         'success': False,
@@ -64,206 +44,100 @@ def server_error(error):
         }
     }), 500
 
-# Dashboard endpoint
-@app.route('/api/v1/dashboard/summary', methods=['GET'])
-@jwt_required()
-def get_dashboard_summary():
-    from src.models.guest import Guest
-    from src.models.room import Room
-    from src.models.payment import Payment
-    from datetime import date
-    
-    # Get active guests count
-    active_guests_count = Guest.query.filter_by(status='active').count()
-    
-    # Get vacant rooms count
-    vacant_rooms_count = Room.query.filter_by(status='available').count()
-    
-    # Get total collected rent
-    paid_payments = Payment.query.filter_by(status='paid').all()
-    total_collected = sum(float(payment.amount) for payment in paid_payments)
-    
-    # Get pending dues
-    pending_payments = Payment.query.filter(
-        Payment.status.in_(['unpaid', 'partial'])
-    ).all()
-    pending_dues = sum(float(payment.amount) for payment in pending_payments)
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'active_guests': active_guests_count,
-            'vacant_rooms': vacant_rooms_count,
-            'total_collected': total_collected,
-            'pending_dues': pending_dues
-        },
-        'message': 'Dashboard summary retrieved successfully'
-    }), 200
-
-@app.route('/api/v1/dashboard/due-this-week', methods=['GET'])
-@jwt_required()
-def get_due_this_week():
-    from src.models.payment import Payment
-    from datetime import date, timedelta
-    
-    # Calculate date range for this week
-    today = date.today()
-    end_of_week = today + timedelta(days=7)
-    
-    # Get payments due this week
-    payments = Payment.query.filter(
-        Payment.status.in_(['unpaid', 'partial']),
-        Payment.due_date >= today,
-        Payment.due_date <= end_of_week
-    ).all()
-    
-    payments_list = [payment.to_dict() for payment in payments]
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'payments': payments_list
-        },
-        'message': 'Payments due this week retrieved successfully'
-    }), 200
-
-@app.route('/api/v1/dashboard/new-guests', methods=['GET'])
-@jwt_required()
-def get_new_guests():
-    from src.models.guest import Guest
-    from datetime import date, timedelta
-    
-    # Calculate date 30 days ago
-    thirty_days_ago = date.today() - timedelta(days=30)
-    
-    # Get guests who checked in within the last 30 days
-    guests = Guest.query.filter(
-        Guest.check_in_date >= thirty_days_ago
-    ).all()
-    
-    guests_list = [guest.to_dict() for guest in guests]
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'guests': guests_list
-        },
-        'message': 'New guests retrieved successfully'
-    }), 200
-
-@app.route('/api/v1/dashboard/vacant-rooms', methods=['GET'])
-@jwt_required()
-def get_vacant_rooms():
-    from src.models.room import Room
-    
-    # Get vacant rooms
-    rooms = Room.query.filter_by(status='available').all()
-    
-    rooms_list = [room.to_dict() for room in rooms]
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'rooms': rooms_list
-        },
-        'message': 'Vacant rooms retrieved successfully'
-    }), 200
-
-@app.route('/api/v1/dashboard/monthly-collection', methods=['GET'])
-@jwt_required()
-def get_monthly_collection():
-    from src.models.payment import Payment
-    from datetime import date
-    import calendar
-    
-    # Get query parameters
-    year = request.args.get('year')
-    
-    if not year:
-        year = date.today().year
-    else:
-        try:
-            year = int(year)
-        except ValueError:
-            return jsonify({
-                'success': False,
-                'error': {
-                    'code': 'INVALID_YEAR',
-                    'message': 'Year must be an integer'
-                }
-            }), 400
-    
-    # Prepare monthly data
-    months_data = []
-    
-    for month in range(1, 13):
-        # Get start and end date for the month
-        _, last_day = calendar.monthrange(year, month)
-        start_date = date(year, month, 1)
-        end_date = date(year, month, last_day)
-        
-        # Get paid payments for the month
-        payments = Payment.query.filter(
-            Payment.status == 'paid',
-            Payment.payment_date >= start_date,
-            Payment.payment_date <= end_date
-        ).all()
-        
-        # Calculate total amount
-        total_amount = sum(float(payment.amount) for payment in payments)
-        
-        months_data.append({
-            'month': month,
-            'month_name': calendar.month_name[month],
-            'amount': total_amount
-        })
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'year': year,
-            'months': months_data
-        },
-        'message': 'Monthly collection retrieved successfully'
-    }), 200
-
-@app.route('/api/v1/dashboard/occupancy-rate', methods=['GET'])
-@jwt_required()
-def get_occupancy_rate():
-    from src.models.room import Room
-    
-    # Get all rooms
-    total_rooms = Room.query.count()
-    occupied_rooms = Room.query.filter_by(status='occupied').count()
-    
-    # Calculate occupancy rate
-    occupancy_rate = (occupied_rooms / total_rooms) * 100 if total_rooms > 0 else 0
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'rate': occupancy_rate,
-            'total_rooms': total_rooms,
-            'occupied_rooms': occupied_rooms
-        },
-        'message': 'Occupancy rate retrieved successfully'
-    }), 200
-
 # Serve static files
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if static_folder_path is None:
         return "Static folder not configured", 404
     if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
+        return static_file_response(static_folder_path, path)
     else:
         index_path = os.path.join(static_folder_path, 'index.html')
         if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+            return static_file_response(static_folder_path, 'index.html')
         else:
             return "index.html not found", 404
 
+# Work that talks to the database runs once, before the first request, so
+# importing the app (gunicorn workers, scripts, test processes) stays free of
+# database I/O
+def start_services(app):
+    # Bring the schema up to date. Set AUTO_MIGRATE=false to run
+    # scripts/migrate.py as a deploy step instead.
+    if os.getenv('AUTO_MIGRATE', 'true').lower() == 'true':
+        run_migrations()
+    
+    # Warm the in-memory autocomplete index in the background.
+    # Set AUTOCOMPLETE_ENABLED=false to answer autocomplete from the database.
+    if os.getenv('AUTOCOMPLETE_ENABLED', 'true').lower() == 'true':
+        init_autocomplete(app)
+
+# Builds the application. config overrides the defaults below; database and
+# pool settings (DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+# DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS,
+# DB_APPLICATION_NAME, DATABASE_REPLICA_URL) come from config or the environment.
+def create_app(config=None):
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    CORS(app)
+    
+    # Configuration
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-in-production'
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 86400  # 24 hours in seconds
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config or {})
+    
+    # Database configuration - PostgreSQL unless DATABASE_URL says otherwise
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_uri(app.config))
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config, app.config['SQLALCHEMY_DATABASE_URI']))
+    
+    # Read-only endpoints read from DATABASE_REPLICA_URL when it is set and
+    # the replica is within REPLICA_MAX_LAG_SECONDS of the primary
+    replica_uri = replica_database_uri(app.config)
+    if replica_uri:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = replica_uri
+    
+    # Initialize extensions
+    db.init_app(app)
+    JWTManager(app)
+    replica_router.configure(app)
+    
+    # Cache dashboard responses; RESPONSE_CACHE_BACKEND selects memory, redis or none
+    response_cache.configure(app)
+    
+    # Count statements per request and log N+1 patterns; SQL_QUERY_COUNTER_ENABLED=false
+    # turns the instrumentation off
+    if os.getenv('SQL_QUERY_COUNTER_ENABLED', 'true').lower() == 'true':
+        init_query_counter(app)
+    
+    # Brotli/gzip responses for clients that accept them; COMPRESSION_ENABLED=false
+    # leaves compression to a reverse proxy
+    if os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true':
+        init_compression(app)
+    
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
+    app.register_blueprint(user_bp, url_prefix='/api/v1')
+    app.register_blueprint(room_bp, url_prefix='/api/v1')
+    app.register_blueprint(guest_bp, url_prefix='/api/v1')
+    app.register_blueprint(payment_bp, url_prefix='/api/v1')
+    app.register_blueprint(notification_bp, url_prefix='/api/v1')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/v1')
+    app.register_blueprint(report_bp, url_prefix='/api/v1')
+    app.register_blueprint(report_job_bp, url_prefix='/api/v1')
+    app.register_blueprint(search_bp, url_prefix='/api/v1')
+    app.register_blueprint(metrics_bp, url_prefix='/api/v1')
+    
+    app.register_error_handler(404, not_found)
+    app.register_error_handler(500, server_error)
+    
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+    
+    app.before_first_request(lambda: start_services(app))
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,15 @@
+from src.models.db import db
+import src.models.user
+import src.models.guest
+import src.models.payment
+import src.models.notification
+import src.models.room_history
+import src.models.report_job
+import src.models.monthly_collection
+
+DESCRIPTION = 'Create the tables that do not exist yet from the models'
+
+# Databases created by the old db.create_all() at startup already have their
+# tables, so this only fills in what is missing
+def upgrade(connection):
+    db.metadata.create_all(bind=connection, checkfirst=True)
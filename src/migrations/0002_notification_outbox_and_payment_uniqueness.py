@@ -0,0 +1,12 @@
+from src.services.migrations import add_column, create_index
+
+DESCRIPTION = 'Add notification delivery columns and one payment per guest per due date'
+
+def upgrade(connection):
+    add_column(connection, 'notifications', 'attempts', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'notifications', 'next_attempt_at', 'TIMESTAMP')
+    add_column(connection, 'notifications', 'last_error', 'TEXT')
+    
+    # Backs uq_payments_guest_due_date on databases created before the constraint.
+    # Fails if duplicate payments exist; merge those before upgrading.
+    create_index(connection, 'uq_payments_guest_due_date', 'payments', ['guest_id', 'due_date'], unique=True)
@@ -0,0 +1,34 @@
+from src.services.migrations import create_index
+
+DESCRIPTION = 'Index the columns hot queries filter on'
+
+# Built concurrently on PostgreSQL so large tables stay writable
+TRANSACTIONAL = False
+
+def upgrade(connection):
+    # Due, overdue and due-this-week lists and the reminder fan-out
+    create_index(connection, 'ix_payments_open_due_date', 'payments', ['due_date'],
+                 where="status IN ('unpaid', 'partial')", concurrently=True)
+    # Payments report and generate-monthly listing
+    create_index(connection, 'ix_payments_due_date', 'payments', ['due_date'], concurrently=True)
+    # Rent report and the monthly collection rebuild
+    create_index(connection, 'ix_payments_payment_date', 'payments', ['payment_date'], concurrently=True)
+    # Status-filtered payment listing, paged by id
+    create_index(connection, 'ix_payments_status_id', 'payments', ['status', 'id'], concurrently=True)
+    
+    # Occupancy counts on check-in, check-out and room changes
+    create_index(connection, 'ix_guests_active_room_id', 'guests', ['room_id'],
+                 where="status = 'active'", concurrently=True)
+    create_index(connection, 'ix_guests_room_id', 'guests', ['room_id'], concurrently=True)
+    create_index(connection, 'ix_guests_status_id', 'guests', ['status', 'id'], concurrently=True)
+    
+    # Dispatcher claim query; pending rows are a small slice of the table
+    create_index(connection, 'ix_notifications_pending_id', 'notifications', ['id'],
+                 where="status = 'pending'", concurrently=True)
+    create_index(connection, 'ix_notifications_guest_id', 'notifications', ['guest_id'], concurrently=True)
+    create_index(connection, 'ix_notifications_status_type', 'notifications', ['status', 'type'], concurrently=True)
+    
+    # Open stay lookup when a guest checks out or changes rooms
+    create_index(connection, 'ix_room_history_guest_room_end_date', 'room_history',
+                 ['guest_id', 'room_id', 'end_date'], concurrently=True)
+    create_index(connection, 'ix_room_history_room_start_date', 'room_history', ['room_id', 'start_date'], concurrently=True)
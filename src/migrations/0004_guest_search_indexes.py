@@ -0,0 +1,32 @@
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy import text
+from src.services.migrations import create_index, has_extension
+import logging
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = 'Index guest names and contact numbers for search'
+
+TRANSACTIONAL = False
+
+def upgrade(connection):
+    # Prefix matching on contact numbers; text_pattern_ops lets LIKE 'prefix%'
+    # use the index whatever the database collation
+    if connection.dialect.name == 'postgresql':
+        create_index(connection, 'ix_guests_contact_number_prefix', 'guests',
+                     ['contact_number text_pattern_ops'], concurrently=True)
+    else:
+        create_index(connection, 'ix_guests_contact_number_prefix', 'guests', ['contact_number'])
+        return
+    
+    # Installing pg_trgm needs extra privileges on managed databases. Without
+    # it guest search falls back to ranked substring matching.
+    if not has_extension(connection, 'pg_trgm'):
+        try:
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        except DBAPIError as e:
+            logger.warning('pg_trgm is not available, skipping the trigram name index: %s', e.orig)
+            return
+    
+    create_index(connection, 'ix_guests_full_name_trgm', 'guests', ['lower(full_name) gin_trgm_ops'],
+                 using='gin', concurrently=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from src.services.migrations import add_column
+
+DESCRIPTION = 'Add the active occupant counter to rooms'
+
+def upgrade(connection):
+    add_column(connection, 'rooms', 'active_occupants', 'INTEGER NOT NULL DEFAULT 0')
+    
+    # Backfill from the guests table; later changes are maintained by the routes
+    connection.execute(text(
+        "UPDATE rooms SET active_occupants = ("
+        "SELECT count(*) FROM guests WHERE guests.room_id = rooms.id AND guests.status = 'active')"
+    ))
@@ -0,0 +1,13 @@
+from src.services.migrations import create_index
+
+DESCRIPTION = 'Index room stays by date for the point-in-time occupancy report'
+
+# Built concurrently on PostgreSQL so room_history stays writable
+TRANSACTIONAL = False
+
+def upgrade(connection):
+    # Open stays (end_date NULL) and stays ending after the report date lead the
+    # index, which is the selective side of the range; room_id and guest_id are
+    # included so the report can be answered from the index
+    create_index(connection, 'ix_room_history_end_start_date', 'room_history',
+                 ['end_date', 'start_date', 'room_id', 'guest_id'], concurrently=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import text
+from src.models.table_version import TableVersion
+
+DESCRIPTION = 'Add per-table change versions for ETags'
+
+VERSIONED_TABLES = ['guests', 'rooms', 'payments']
+
+def upgrade(connection):
+    TableVersion.__table__.create(bind=connection, checkfirst=True)
+    
+    for table_name in VERSIONED_TABLES:
+        exists = connection.execute(
+            text('SELECT 1 FROM table_versions WHERE table_name = :name'),
+            {'name': table_name}
+        ).scalar()
+        if not exists:
+            connection.execute(
+                text('INSERT INTO table_versions (table_name, version) VALUES (:name, 1)'),
+                {'name': table_name}
+            )
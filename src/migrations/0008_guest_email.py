@@ -0,0 +1,6 @@
+from src.services.migrations import add_column
+
+DESCRIPTION = 'Add an optional email address to guests for email notifications'
+
+def upgrade(connection):
+    add_column(connection, 'guests', 'email', 'VARCHAR(255)')
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from src.services.migrations import create_index, drop_column
+
+DESCRIPTION = 'Allow one in-flight report job per parameters and drop the report job progress column'
+
+def upgrade(connection):
+    # Fail all but the newest in-flight duplicate so the unique index can be built
+    connection.execute(text(
+        "UPDATE report_jobs SET status = 'failed', error = 'Superseded by an identical report job', "
+        "completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP "
+        "WHERE status IN ('pending', 'running') AND id NOT IN ("
+        "SELECT max(id) FROM report_jobs WHERE status IN ('pending', 'running') GROUP BY params_hash)"
+    ))
+    create_index(connection, 'uq_report_jobs_in_flight_params_hash', 'report_jobs', ['params_hash'],
+                 where="status IN ('pending', 'running')", unique=True)
+    
+    # Only ever reported 0, 10 or 100; status says as much
+    drop_column(connection, 'report_jobs', 'progress')
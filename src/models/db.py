@@ -0,0 +1,30 @@
+from flask import g, has_app_context
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import orm
+from sqlalchemy.sql.expression import Select, CompoundSelect
+
+# SQLALCHEMY_BINDS key of the read replica engine
+REPLICA_BIND = 'replica'
+
+# Session that sends reads to the replica engine while the current request
+# has been routed there (see src/services/read_replica.py). Flushes and any
+# other statement go to the primary, and once the session has written, its
+# reads follow to the primary so the request reads its own writes.
+class RoutingSession(SignallingSession):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not (has_app_context() and g.get('db_read_replica')) or self.info.get('wrote'):
+            return super().get_bind(mapper, clause)
+        
+        reads = isinstance(clause, (Select, CompoundSelect)) and getattr(clause, '_for_update_arg', None) is None
+        if self._flushing or not reads:
+            self.info['wrote'] = True
+            return super().get_bind(mapper, clause)
+        return get_state(self.app).db.get_engine(self.app, bind=REPLICA_BIND)
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+# The one SQLAlchemy instance behind every model: one metadata, one engine and
+# connection pool, and one session per request that can span all tables
+db = RoutingSQLAlchemy()
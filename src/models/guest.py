@@ -1,14 +1,26 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
 
-from src.models.room import db
-
 class Guest(db.Model):
     __tablename__ = 'guests'
+    __table_args__ = (
+        # Indexes matched to the hot query shapes; created by migration 0003
+        db.Index(
+            'ix_guests_active_room_id', 'room_id',
+            postgresql_where=db.text("status = 'active'"),
+            sqlite_where=db.text("status = 'active'")
+        ),
+        db.Index('ix_guests_room_id', 'room_id'),
+        db.Index('ix_guests_status_id', 'status', 'id'),
+        # Contact number prefix search. The trigram name index needs pg_trgm,
+        # so it exists only in migration 0004.
+        db.Index('ix_guests_contact_number_prefix', 'contact_number', postgresql_ops={'contact_number': 'text_pattern_ops'}),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(255), nullable=False)
     contact_number = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(255), nullable=True)  # email notifications are only queued when set
     id_proof_url = db.Column(db.String(255), nullable=False)
     check_in_date = db.Column(db.Date, nullable=False)
     check_out_date = db.Column(db.Date, nullable=True)
@@ -23,11 +35,15 @@ class Guest(db.Model):
     room_history = db.relationship('RoomHistory', backref='guest', lazy=True)
     notifications = db.relationship('Notification', backref='guest', lazy=True)
     
+    # Keys of to_dict(); list endpoints select only these columns
+    SERIALIZED_FIELDS = ('id', 'full_name', 'contact_number', 'email', 'id_proof_url', 'check_in_date', 'check_out_date', 'rent_amount', 'status', 'room_id', 'created_at', 'updated_at')
+    
     def to_dict(self):
         return {
             'id': self.id,
             'full_name': self.full_name,
             'contact_number': self.contact_number,
+            'email': self.email,
             'id_proof_url': self.id_proof_url,
             'check_in_date': self.check_in_date.isoformat() if self.check_in_date else None,
             'check_out_date': self.check_out_date.isoformat() if self.check_out_date else None,
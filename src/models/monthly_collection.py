@@ -0,0 +1,25 @@
+from src.models.db import db
+from datetime import datetime
+
+class MonthlyCollection(db.Model):
+    __tablename__ = 'monthly_collections'
+    __table_args__ = (
+        db.UniqueConstraint('year', 'month', name='uq_monthly_collections_year_month'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)  # total of paid payments by payment_date
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'year': self.year,
+            'month': self.month,
+            'amount': float(self.amount),
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
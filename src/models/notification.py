@@ -1,11 +1,19 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
 
-from src.models.guest import db
-from src.models.payment import Payment
-
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Indexes matched to the hot query shapes; created by migration 0003.
+        # The partial index keeps the dispatcher's claim query off sent rows.
+        db.Index(
+            'ix_notifications_pending_id', 'id',
+            postgresql_where=db.text("status = 'pending'"),
+            sqlite_where=db.text("status = 'pending'")
+        ),
+        db.Index('ix_notifications_guest_id', 'guest_id'),
+        db.Index('ix_notifications_status_type', 'status', 'type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     guest_id = db.Column(db.Integer, db.ForeignKey('guests.id'), nullable=False)
@@ -14,9 +22,16 @@ class Notification(db.Model):
     message = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(50), nullable=False)  # 'sent', 'failed', or 'pending'
     sent_at = db.Column(db.DateTime, nullable=True)
+    # Outbox delivery state, maintained by the notification dispatcher
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Keys of to_dict(); list endpoints select only these columns
+    SERIALIZED_FIELDS = ('id', 'guest_id', 'payment_id', 'type', 'message', 'status', 'sent_at', 'created_at', 'updated_at')
+    
     def to_dict(self):
         return {
             'id': self.id,
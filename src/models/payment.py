@@ -1,10 +1,22 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
 
-from src.models.guest import db
-
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # One payment per guest per billing month; generate-monthly relies on this
+        db.UniqueConstraint('guest_id', 'due_date', name='uq_payments_guest_due_date'),
+        # Indexes matched to the hot query shapes; created by migration 0003.
+        # guest_id lookups use the unique constraint above.
+        db.Index(
+            'ix_payments_open_due_date', 'due_date',
+            postgresql_where=db.text("status IN ('unpaid', 'partial')"),
+            sqlite_where=db.text("status IN ('unpaid', 'partial')")
+        ),
+        db.Index('ix_payments_due_date', 'due_date'),
+        db.Index('ix_payments_payment_date', 'payment_date'),
+        db.Index('ix_payments_status_id', 'status', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     guest_id = db.Column(db.Integer, db.ForeignKey('guests.id'), nullable=False)
@@ -19,6 +31,9 @@ class Payment(db.Model):
     # Relationships
     notifications = db.relationship('Notification', backref='payment', lazy=True)
     
+    # Keys of to_dict(); list endpoints select only these columns
+    SERIALIZED_FIELDS = ('id', 'guest_id', 'amount', 'payment_date', 'payment_type', 'status', 'due_date', 'created_at', 'updated_at')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,47 @@
+from src.models.db import db
+from datetime import datetime
+import json
+
+class ReportJob(db.Model):
+    __tablename__ = 'report_jobs'
+    __table_args__ = (
+        # At most one queued or running job per set of parameters, so workers
+        # in different processes share a render; created by migration 0009
+        db.Index(
+            'uq_report_jobs_in_flight_params_hash', 'params_hash', unique=True,
+            postgresql_where=db.text("status IN ('pending', 'running')"),
+            sqlite_where=db.text("status IN ('pending', 'running')")
+        ),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    report_type = db.Column(db.String(50), nullable=False)  # 'rent', 'occupancy', 'guests' or 'payments'
+    format = db.Column(db.String(10), nullable=False)  # 'json', 'csv' or 'pdf'
+    params = db.Column(db.Text, nullable=False)  # JSON encoded query parameters
+    params_hash = db.Column(db.String(64), nullable=False, index=True)
+    status = db.Column(db.String(50), nullable=False)  # 'pending', 'running', 'completed' or 'failed'
+    file_path = db.Column(db.String(512), nullable=True)
+    file_name = db.Column(db.String(255), nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'report_type': self.report_type,
+            'format': self.format,
+            'params': json.loads(self.params),
+            'status': self.status,
+            'file_name': self.file_name,
+            'error': self.error,
+            'created_by': self.created_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
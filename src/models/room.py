@@ -1,8 +1,6 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
 
-db = SQLAlchemy()
-
 class Room(db.Model):
     __tablename__ = 'rooms'
     
@@ -11,6 +9,9 @@ class Room(db.Model):
     capacity = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(50), nullable=False)  # 'available' or 'occupied'
     notes = db.Column(db.Text, nullable=True)
+    # Active guests in the room, maintained with the guest changes
+    # (src/services/occupancy.py). Internal: not part of to_dict().
+    active_occupants = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -18,6 +19,9 @@ class Room(db.Model):
     guests = db.relationship('Guest', backref='room', lazy=True)
     room_history = db.relationship('RoomHistory', backref='room', lazy=True)
     
+    # Keys of to_dict(); list endpoints select only these columns
+    SERIALIZED_FIELDS = ('id', 'room_number', 'capacity', 'status', 'notes', 'created_at', 'updated_at')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -1,11 +1,15 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
 
-from src.models.room import db
-from src.models.guest import Guest
-
 class RoomHistory(db.Model):
     __tablename__ = 'room_history'
+    __table_args__ = (
+        # Indexes matched to the hot query shapes; created by migration 0003
+        db.Index('ix_room_history_guest_room_end_date', 'guest_id', 'room_id', 'end_date'),
+        db.Index('ix_room_history_room_start_date', 'room_id', 'start_date'),
+        # Stays covering a date for the occupancy report; created by migration 0006
+        db.Index('ix_room_history_end_start_date', 'end_date', 'start_date', 'room_id', 'guest_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
@@ -0,0 +1,15 @@
+from src.models.db import db
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    
+    # Bumped in the same transaction as every write to the table, so readers
+    # can tell whether it changed without scanning it (src/services/etags.py)
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version
+        }
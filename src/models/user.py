@@ -1,8 +1,5 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.models.db import db
 from datetime import datetime
-import uuid
-
-db = SQLAlchemy()
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -15,6 +12,9 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Keys of to_dict(); list endpoints select only these columns
+    SERIALIZED_FIELDS = ('id', 'email', 'full_name', 'role', 'created_at', 'updated_at')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from src.models.user import db, User
+from src.models.db import db
+from src.models.user import User
 from datetime import timedelta
 
 auth_bp = Blueprint('auth', __name__)
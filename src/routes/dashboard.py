@@ -0,0 +1,228 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from src.models.db import db
+from src.models.payment import Payment
+from src.models.guest import Guest
+from src.models.room import Room
+from src.models.monthly_collection import MonthlyCollection
+from src.services.pagination import paginate, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
+from src.services.response_cache import response_cache, GUESTS, ROOMS, PAYMENTS
+from src.services.etags import conditional_get
+from src.services.read_replica import read_only
+from sqlalchemy import func, case
+from datetime import date, timedelta
+import calendar
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+@dashboard_bp.route('/dashboard/summary', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([GUESTS, ROOMS, PAYMENTS])
+@response_cache.cached('dashboard-summary', [GUESTS, ROOMS, PAYMENTS])
+def get_dashboard_summary():
+    # Every figure is a scalar subquery so the database computes the whole
+    # summary in a single round trip without returning any payment rows
+    active_guests = db.session.query(func.count(Guest.id)).filter(
+        Guest.status == 'active'
+    ).scalar_subquery()
+    
+    vacant_rooms = db.session.query(func.count(Room.id)).filter(
+        Room.status == 'available'
+    ).scalar_subquery()
+    
+    # Collected and pending totals share one scan of payments via conditional sums
+    payment_totals = db.session.query(
+        func.coalesce(func.sum(case((Payment.status == 'paid', Payment.amount), else_=0)), 0).label('total_collected'),
+        func.coalesce(func.sum(case((Payment.status.in_(['unpaid', 'partial']), Payment.amount), else_=0)), 0).label('pending_dues')
+    ).subquery()
+    
+    summary = db.session.query(
+        active_guests.label('active_guests'),
+        vacant_rooms.label('vacant_rooms'),
+        payment_totals.c.total_collected,
+        payment_totals.c.pending_dues
+    ).one()
+    
+    active_guests_count = summary.active_guests
+    vacant_rooms_count = summary.vacant_rooms
+    total_collected = float(summary.total_collected)
+    pending_dues = float(summary.pending_dues)
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'active_guests': active_guests_count,
+            'vacant_rooms': vacant_rooms_count,
+            'total_collected': total_collected,
+            'pending_dues': pending_dues
+        },
+        'message': 'Dashboard summary retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/due-this-week', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([PAYMENTS])
+@response_cache.cached('dashboard-due-this-week', [PAYMENTS])
+def get_due_this_week():
+    # Calculate date range for this week
+    today = date.today()
+    end_of_week = today + timedelta(days=7)
+    
+    # Get payments due this week
+    query = Payment.query.filter(
+        Payment.status.in_(['unpaid', 'partial']),
+        Payment.due_date >= today,
+        Payment.due_date <= end_of_week
+    )
+    
+    try:
+        payments, next_cursor = paginate(serializable(query, Payment), Payment.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    
+    payments_list = serialized_rows(payments)
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'payments': payments_list,
+            'next_cursor': next_cursor
+        },
+        'message': 'Payments due this week retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/new-guests', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([GUESTS])
+@response_cache.cached('dashboard-new-guests', [GUESTS])
+def get_new_guests():
+    # Calculate date 30 days ago
+    thirty_days_ago = date.today() - timedelta(days=30)
+    
+    # Get guests who checked in within the last 30 days
+    query = Guest.query.filter(
+        Guest.check_in_date >= thirty_days_ago
+    )
+    
+    try:
+        guests, next_cursor = paginate(serializable(query, Guest), Guest.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    
+    guests_list = serialized_rows(guests)
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'guests': guests_list,
+            'next_cursor': next_cursor
+        },
+        'message': 'New guests retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/vacant-rooms', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([ROOMS])
+@response_cache.cached('dashboard-vacant-rooms', [ROOMS])
+def get_vacant_rooms():
+    # Get vacant rooms
+    try:
+        rooms, next_cursor = paginate(serializable(Room.query.filter_by(status='available'), Room), Room.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    
+    rooms_list = serialized_rows(rooms)
+    
+    return json_response({
+        'success': True,
+        'data': {
+            'rooms': rooms_list,
+            'next_cursor': next_cursor
+        },
+        'message': 'Vacant rooms retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/monthly-collection', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([PAYMENTS])
+@response_cache.cached('dashboard-monthly-collection', [PAYMENTS])
+def get_monthly_collection():
+    # Get query parameters
+    year = request.args.get('year')
+    
+    if not year:
+        year = date.today().year
+    else:
+        try:
+            year = int(year)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'INVALID_YEAR',
+                    'message': 'Year must be an integer'
+                }
+            }), 400
+    
+    # Read the twelve precomputed monthly totals for the year
+    rollups = MonthlyCollection.query.filter_by(year=year).all()
+    totals = {rollup.month: float(rollup.amount) for rollup in rollups}
+    
+    # Prepare monthly data
+    months_data = []
+    
+    for month in range(1, 13):
+        months_data.append({
+            'month': month,
+            'month_name': calendar.month_name[month],
+            'amount': totals.get(month, 0)
+        })
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'year': year,
+            'months': months_data
+        },
+        'message': 'Monthly collection retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/occupancy-rate', methods=['GET'])
+@jwt_required()
+@read_only
+@conditional_get([ROOMS])
+@response_cache.cached('dashboard-occupancy-rate', [ROOMS])
+def get_occupancy_rate():
+    # Get all rooms
+    total_rooms = Room.query.count()
+    occupied_rooms = Room.query.filter_by(status='occupied').count()
+    
+    # Calculate occupancy rate
+    occupancy_rate = (occupied_rooms / total_rooms) * 100 if total_rooms > 0 else 0
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'rate': occupancy_rate,
+            'total_rooms': total_rooms,
+            'occupied_rooms': occupied_rooms
+        },
+        'message': 'Occupancy rate retrieved successfully'
+    }), 200
+
+@dashboard_bp.route('/dashboard/cache-stats', methods=['GET'])
+@jwt_required()
+def get_dashboard_cache_stats():
+    return jsonify({
+        'success': True,
+        'data': {
+            'cache': response_cache.stats()
+        },
+        'message': 'Dashboard cache stats retrieved successfully'
+    }), 200
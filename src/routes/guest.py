@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.guest import db, Guest
+from src.models.db import db
+from src.models.guest import Guest
 from src.models.room import Room
 from src.models.room_history import RoomHistory
+from src.services.pagination import paginate, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
+from src.services.guest_search import search_limit, find_guests
+from src.services.autocomplete import autocomplete_index
+from src.services.occupancy import occupancy_key, record_occupancy_change, record_stay_change, RoomFullError
+from src.services.occupancy_timeline import invalidate_occupancy_timeline
+from src.services.response_cache import GUESTS, ROOMS
+from src.services.etags import conditional_get, bump_table_versions
 from datetime import datetime, date
 
 guest_bp = Blueprint('guest', __name__)
 
 @guest_bp.route('/guests', methods=['GET'])
 @jwt_required()
+@conditional_get([GUESTS])
 def get_guests():
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -50,47 +60,73 @@ def get_guests():
             }), 400
     
     # Execute query and get results
-    guests = query.all()
-    guests_list = [guest.to_dict() for guest in guests]
+    try:
+        guests, next_cursor = paginate(serializable(query, Guest), Guest.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    guests_list = serialized_rows(guests)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'guests': guests_list
+            'guests': guests_list,
+            'next_cursor': next_cursor
         },
         'message': 'Guests retrieved successfully'
     }), 200
 
 @guest_bp.route('/guests/active', methods=['GET'])
 @jwt_required()
+@conditional_get([GUESTS])
 def get_active_guests():
-    guests = Guest.query.filter_by(status='active').all()
-    guests_list = [guest.to_dict() for guest in guests]
+    try:
+        guests, next_cursor = paginate(serializable(Guest.query.filter_by(status='active'), Guest), Guest.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    guests_list = serialized_rows(guests)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'guests': guests_list
+            'guests': guests_list,
+            'next_cursor': next_cursor
         },
         'message': 'Active guests retrieved successfully'
     }), 200
 
 @guest_bp.route('/guests/inactive', methods=['GET'])
 @jwt_required()
+@conditional_get([GUESTS])
 def get_inactive_guests():
-    guests = Guest.query.filter_by(status='inactive').all()
-    guests_list = [guest.to_dict() for guest in guests]
+    try:
+        guests, next_cursor = paginate(serializable(Guest.query.filter_by(status='inactive'), Guest), Guest.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    guests_list = serialized_rows(guests)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'guests': guests_list
+            'guests': guests_list,
+            'next_cursor': next_cursor
         },
         'message': 'Inactive guests retrieved successfully'
     }), 200
 
+# Response for a check-in or room change that lost the race for the last place
+def _room_full_conflict():
+    db.session.rollback()
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'ROOM_FULL',
+            'message': 'Room reached full capacity while this request was processed'
+        }
+    }), 409
+
 @guest_bp.route('/guests/<int:guest_id>', methods=['GET'])
 @jwt_required()
+@conditional_get([GUESTS])
 def get_guest(guest_id):
     guest = Guest.query.get(guest_id)
     
@@ -139,18 +175,15 @@ def create_guest():
             }
         }), 404
     
-    # Check if room is available
-    if room.status == 'occupied':
-        # Check if room has capacity
-        active_guests_count = Guest.query.filter_by(room_id=room.id, status='active').count()
-        if active_guests_count >= room.capacity:
-            return jsonify({
-                'success': False,
-                'error': {
-                    'code': 'ROOM_FULL',
-                    'message': 'Room is at full capacity'
-                }
-            }), 400
+    # Check if room has capacity
+    if room.active_occupants >= room.capacity:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'ROOM_FULL',
+                'message': 'Room is at full capacity'
+            }
+        }), 400
     
     # Parse check-in date
     try:
@@ -168,27 +201,37 @@ def create_guest():
     new_guest = Guest(
         full_name=data.get('full_name'),
         contact_number=data.get('contact_number'),
+        email=data.get('email') or None,
         id_proof_url=data.get('id_proof_url'),
         check_in_date=check_in_date,
         rent_amount=data.get('rent_amount'),
         status='active',
-        room_id=data.get('room_id')
+        room_id=room.id
     )
     
+    # Claim a place in the room first. This locks the room row for the rest of
+    # the transaction and fails if a concurrent check-in took the last place.
+    try:
+        record_occupancy_change(None, occupancy_key(new_guest))
+    except RoomFullError:
+        return _room_full_conflict()
+    
+    # Flush to get the guest id for the room history entry
+    db.session.add(new_guest)
+    db.session.flush()
+    
     # Create room history entry
     room_history = RoomHistory(
-        room_id=data.get('room_id'),
+        room_id=room.id,
         guest_id=new_guest.id,
         start_date=check_in_date
     )
     
-    # Update room status if it was available
-    if room.status == 'available':
-        room.status = 'occupied'
-    
-    db.session.add(new_guest)
     db.session.add(room_history)
+    bump_table_versions(GUESTS, ROOMS)
     db.session.commit()
+    autocomplete_index.index_guest(new_guest)
+    invalidate_occupancy_timeline(check_in_date)
     
     return jsonify({
         'success': True,
@@ -214,6 +257,10 @@ def update_guest(guest_id):
     
     data = request.get_json()
     
+    # Where the guest counts as an occupant before this update
+    old_occupancy_key = occupancy_key(guest)
+    old_stay = (guest.room_id, guest.status, guest.check_in_date, guest.check_out_date)
+    
     # Update fields if provided
     if data.get('full_name'):
         guest.full_name = data.get('full_name')
@@ -221,6 +268,10 @@ def update_guest(guest_id):
     if data.get('contact_number'):
         guest.contact_number = data.get('contact_number')
     
+    # An empty email clears the address
+    if 'email' in data:
+        guest.email = data.get('email') or None
+    
     if data.get('id_proof_url'):
         guest.id_proof_url = data.get('id_proof_url')
     
@@ -240,23 +291,10 @@ def update_guest(guest_id):
         # If changing from active to inactive, set check_out_date if not provided
         if guest.status == 'active' and data.get('status') == 'inactive' and not data.get('check_out_date'):
             guest.check_out_date = date.today()
-            
-            # Update room history
-            room_history = RoomHistory.query.filter_by(
-                guest_id=guest.id,
-                room_id=guest.room_id,
-                end_date=None
-            ).first()
-            
-            if room_history:
-                room_history.end_date = date.today()
-            
-            # Check if room is now empty
-            active_guests_count = Guest.query.filter_by(room_id=guest.room_id, status='active').count()
-            if active_guests_count <= 1:  # Only this guest is active
-                room = Room.query.get(guest.room_id)
-                if room:
-                    room.status = 'available'
+        
+        # Reactivating starts a new stay, so the old check-out no longer applies
+        if guest.status == 'inactive' and data.get('status') == 'active' and not data.get('check_out_date'):
+            guest.check_out_date = None
         
         guest.status = data.get('status')
     
@@ -288,25 +326,8 @@ def update_guest(guest_id):
             check_out_date = datetime.strptime(data.get('check_out_date'), '%Y-%m-%d').date()
             guest.check_out_date = check_out_date
             
-            # Update room history
-            room_history = RoomHistory.query.filter_by(
-                guest_id=guest.id,
-                room_id=guest.room_id,
-                end_date=None
-            ).first()
-            
-            if room_history:
-                room_history.end_date = check_out_date
-            
             # If setting check_out_date, also set status to inactive
             guest.status = 'inactive'
-            
-            # Check if room is now empty
-            active_guests_count = Guest.query.filter_by(room_id=guest.room_id, status='active').count()
-            if active_guests_count <= 1:  # Only this guest is active
-                room = Room.query.get(guest.room_id)
-                if room:
-                    room.status = 'available'
         except ValueError:
             return jsonify({
                 'success': False,
@@ -330,8 +351,7 @@ def update_guest(guest_id):
         
         # Check if new room has capacity
         if guest.status == 'active':
-            active_guests_count = Guest.query.filter_by(room_id=new_room.id, status='active').count()
-            if active_guests_count >= new_room.capacity:
+            if new_room.active_occupants >= new_room.capacity:
                 return jsonify({
                     'success': False,
                     'error': {
@@ -340,39 +360,29 @@ def update_guest(guest_id):
                     }
                 }), 400
         
-        # Close current room history
-        current_room_history = RoomHistory.query.filter_by(
-            guest_id=guest.id,
-            room_id=guest.room_id,
-            end_date=None
-        ).first()
-        
-        if current_room_history:
-            current_room_history.end_date = date.today()
-        
-        # Create new room history
-        new_room_history = RoomHistory(
-            room_id=new_room.id,
-            guest_id=guest.id,
-            start_date=date.today()
-        )
-        
-        db.session.add(new_room_history)
-        
-        # Update old room status if needed
-        old_room = Room.query.get(guest.room_id)
-        if old_room and guest.status == 'active':
-            active_guests_count = Guest.query.filter_by(room_id=old_room.id, status='active').count()
-            if active_guests_count <= 1:  # Only this guest is active
-                old_room.status = 'available'
-        
-        # Update new room status if needed
-        if new_room.status == 'available' and guest.status == 'active':
-            new_room.status = 'occupied'
-        
         guest.room_id = new_room.id
     
+    # Move the guest between room occupant counters in this transaction; room
+    # status follows the counters
+    new_occupancy_key = occupancy_key(guest)
+    try:
+        record_occupancy_change(old_occupancy_key, new_occupancy_key)
+    except RoomFullError:
+        return _room_full_conflict()
+    
+    # Stays follow the same transitions: checking out ends the stay on the
+    # check-out date, moving rooms or reactivating starts one on the check-in
+    # date given with this update, or today
+    closed_on = guest.check_out_date if guest.status == 'inactive' and guest.check_out_date else date.today()
+    opened_on = guest.check_in_date if data.get('check_in_date') else date.today()
+    record_stay_change(guest.id, old_occupancy_key, new_occupancy_key, closed_on, opened_on)
+    
+    bump_table_versions(GUESTS, ROOMS)
     db.session.commit()
+    autocomplete_index.index_guest(guest)
+    new_stay = (guest.room_id, guest.status, guest.check_in_date, guest.check_out_date)
+    if new_stay != old_stay:
+        invalidate_occupancy_timeline(old_stay[2], old_stay[3], new_stay[2], new_stay[3])
     
     return jsonify({
         'success': True,
@@ -417,16 +427,15 @@ def delete_guest(guest_id):
             }
         }), 400
     
-    # Update room status if needed
-    if guest.status == 'active':
-        room = Room.query.get(guest.room_id)
-        if room:
-            active_guests_count = Guest.query.filter_by(room_id=room.id, status='active').count()
-            if active_guests_count <= 1:  # Only this guest is active
-                room.status = 'available'
+    # Update the room occupant counter and status if needed
+    record_occupancy_change(occupancy_key(guest), None)
     
+    check_in_date = guest.check_in_date
     db.session.delete(guest)
+    bump_table_versions(GUESTS, ROOMS)
     db.session.commit()
+    autocomplete_index.remove_guest(guest_id)
+    invalidate_occupancy_timeline(check_in_date)
     
     return jsonify({
         'success': True,
@@ -473,6 +482,7 @@ def checkout_guest(guest_id):
     else:
         check_out_date = date.today()
     
+    old_occupancy_key = occupancy_key(guest)
     guest.check_out_date = check_out_date
     guest.status = 'inactive'
     
@@ -486,14 +496,13 @@ def checkout_guest(guest_id):
     if room_history:
         room_history.end_date = check_out_date
     
-    # Check if room is now empty
-    active_guests_count = Guest.query.filter_by(room_id=guest.room_id, status='active').count()
-    if active_guests_count <= 1:  # Only this guest is active
-        room = Room.query.get(guest.room_id)
-        if room:
-            room.status = 'available'
+    # Update the room occupant counter; the room becomes available when it empties
+    record_occupancy_change(old_occupancy_key, occupancy_key(guest))
     
+    bump_table_versions(GUESTS, ROOMS)
     db.session.commit()
+    autocomplete_index.index_guest(guest)
+    invalidate_occupancy_timeline(check_out_date)
     
     return jsonify({
         'success': True,
@@ -507,7 +516,7 @@ def checkout_guest(guest_id):
 @jwt_required()
 def search_guests():
     # Get search query
-    query = request.args.get('q', '')
+    query = request.args.get('q', '').strip()
     
     if not query:
         return jsonify({
@@ -518,18 +527,28 @@ def search_guests():
             }
         }), 400
     
-    # Search in name and contact number
-    guests = Guest.query.filter(
-        (Guest.full_name.ilike(f'%{query}%')) | 
-        (Guest.contact_number.ilike(f'%{query}%'))
-    ).all()
+    try:
+        limit = search_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_LIMIT',
+                'message': 'Limit must be an integer'
+            }
+        }), 400
+    
+    # Phone-like queries match contact numbers by prefix; anything else is a
+    # ranked name search, typo tolerant when pg_trgm is installed
+    guests, mode = find_guests(query, limit)
     
     guests_list = [guest.to_dict() for guest in guests]
     
     return jsonify({
         'success': True,
         'data': {
-            'guests': guests_list
+            'guests': guests_list,
+            'mode': mode
         },
         'message': 'Search results retrieved successfully'
     }), 200
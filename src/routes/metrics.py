@@ -0,0 +1,29 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from src.models.db import db
+from src.services.db_pool import pool_stats
+from src.services.read_replica import replica_router
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics/db-pool', methods=['GET'])
+@jwt_required()
+def get_db_pool_metrics():
+    return jsonify({
+        'success': True,
+        'data': {
+            'db_pool': pool_stats(db.engine)
+        },
+        'message': 'Database pool metrics retrieved successfully'
+    }), 200
+
+@metrics_bp.route('/metrics/read-replica', methods=['GET'])
+@jwt_required()
+def get_read_replica_metrics():
+    return jsonify({
+        'success': True,
+        'data': {
+            'read_replica': replica_router.stats()
+        },
+        'message': 'Read replica metrics retrieved successfully'
+    }), 200
@@ -1,13 +1,31 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.notification import db, Notification
+from src.models.db import db
+from src.models.notification import Notification
 from src.models.guest import Guest
 from src.models.payment import Payment
+from src.services.pagination import paginate, page_limit, encode_cursor, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
+from src.services.sql_helpers import insert_returning_ids
 from datetime import datetime, date, timedelta
-import os
 
 notification_bp = Blueprint('notification', __name__)
 
+# Email notifications need an address to deliver to, so they are refused when
+# queued for a guest without one rather than failing later in the dispatcher
+def _guest_has_no_email():
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'GUEST_HAS_NO_EMAIL',
+            'message': 'Guest has no email address'
+        }
+    }), 400
+
+# Channels a guest can be notified on: SMS always, email when they have an address
+def _guest_channels(email):
+    return ['sms', 'email'] if email else ['sms']
+
 @notification_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
@@ -28,13 +46,17 @@ def get_notifications():
         query = query.filter(Notification.type == type)
     
     # Execute query and get results
-    notifications = query.all()
-    notifications_list = [notification.to_dict() for notification in notifications]
+    try:
+        notifications, next_cursor = paginate(serializable(query, Notification), Notification.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    notifications_list = serialized_rows(notifications)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'notifications': notifications_list
+            'notifications': notifications_list,
+            'next_cursor': next_cursor
         },
         'message': 'Notifications retrieved successfully'
     }), 200
@@ -111,6 +133,9 @@ def create_notification():
             }
         }), 400
     
+    if data.get('type') == 'email' and not guest.email:
+        return _guest_has_no_email()
+    
     # Create new notification
     new_notification = Notification(
         guest_id=data.get('guest_id'),
@@ -120,13 +145,10 @@ def create_notification():
         status='pending'
     )
     
+    # The notification is queued as pending and delivered by the notification dispatcher
     db.session.add(new_notification)
     db.session.commit()
     
-    # In a real application, we would send the notification here
-    # For now, we'll simulate sending and update the status
-    send_notification(new_notification)
-    
     return jsonify({
         'success': True,
         'data': {
@@ -161,6 +183,8 @@ def update_notification(notification_id):
                     'message': 'Type must be either sms or email'
                 }
             }), 400
+        if data.get('type') == 'email' and not notification.guest.email:
+            return _guest_has_no_email()
         notification.type = data.get('type')
     
     if data.get('message'):
@@ -175,6 +199,12 @@ def update_notification(notification_id):
                     'message': 'Status must be sent, failed, or pending'
                 }
             }), 400
+        # Setting a notification back to pending queues it for another delivery
+        if data.get('status') == 'pending' and notification.status != 'pending':
+            notification.attempts = 0
+            notification.next_attempt_at = None
+            notification.last_error = None
+        
         notification.status = data.get('status')
     
     db.session.commit()
@@ -234,17 +264,123 @@ def get_guest_notifications(guest_id):
             }
         }), 404
     
-    notifications = Notification.query.filter_by(guest_id=guest_id).all()
-    notifications_list = [notification.to_dict() for notification in notifications]
+    try:
+        notifications, next_cursor = paginate(serializable(Notification.query.filter_by(guest_id=guest_id), Notification), Notification.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    notifications_list = serialized_rows(notifications)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'notifications': notifications_list
+            'notifications': notifications_list,
+            'next_cursor': next_cursor
         },
         'message': 'Guest notifications retrieved successfully'
     }), 200
 
+# Fetches (payment, active guest) candidates with one joined query and groups
+# them by guest, oldest due date first, so each guest is notified once per run
+def _payment_candidates_by_guest(*criteria):
+    rows = db.session.query(
+        Payment.id,
+        Payment.amount,
+        Payment.due_date,
+        Guest.id,
+        Guest.full_name,
+        Guest.email
+    ).join(
+        Guest, Guest.id == Payment.guest_id
+    ).filter(
+        Payment.status.in_(['unpaid', 'partial']),
+        Guest.status == 'active',
+        *criteria
+    ).order_by(Guest.id, Payment.due_date, Payment.id).all()
+    
+    candidates = {}
+    for payment_id, amount, due_date, guest_id, full_name, email in rows:
+        candidates.setdefault(guest_id, {
+            'guest_id': guest_id,
+            'full_name': full_name,
+            'channels': _guest_channels(email),
+            'payments': []
+        })['payments'].append((payment_id, amount, due_date))
+    
+    return list(candidates.values())
+
+# Bulk inserts one notification per channel for each (guest_id, payment_id,
+# message, channels) and returns the ids of the created rows
+def _queue_notifications(messages):
+    now = datetime.utcnow()
+    rows = [
+        {
+            'guest_id': guest_id,
+            'payment_id': payment_id,
+            'type': notification_type,
+            'message': message,
+            'status': 'pending',
+            'attempts': 0,
+            'created_at': now,
+            'updated_at': now
+        }
+        for guest_id, payment_id, message, channels in messages
+        for notification_type in channels
+    ]
+    
+    # Queued in this transaction and delivered by the notification dispatcher.
+    # Every row of this run carries its created_at.
+    created_ids = []
+    if rows:
+        created_ids = insert_returning_ids(Notification, Notification.__table__.insert(), [
+            Notification.created_at == now,
+            Notification.status == 'pending'
+        ], rows)
+    db.session.commit()
+    
+    return created_ids
+
+# Parses the optional listing arguments (include_notifications, limit).
+# Returns the page size, or None when no listing was requested.
+def _listing_limit(data):
+    if not data or not data.get('include_notifications'):
+        return None
+    
+    return page_limit(data.get('limit'))
+
+# Builds the response data for a fan-out run. created_cursor points just before
+# the first notification this run created (None when it created none), so
+# GET /notifications?cursor=<created_cursor> walks them; when a listing was
+# requested the first page of exactly the created rows is included as well
+def _fan_out_summary(limit, guests_count, payments_count, created_ids):
+    summary = {
+        'guests_notified': guests_count,
+        'payments_covered': payments_count,
+        'created_count': len(created_ids),
+        'created_cursor': encode_cursor(created_ids[0] - 1) if created_ids else None
+    }
+    
+    if limit:
+        page = Notification.query.filter(
+            Notification.id.in_(created_ids[:limit + 1])
+        ).order_by(Notification.id).all()
+        
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        summary['notifications'] = [notification.to_dict() for notification in page]
+        summary['next_cursor'] = encode_cursor(page[-1].id) if has_more else None
+    
+    return summary
+
+def _invalid_format_response():
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'INVALID_FORMAT',
+            'message': 'days_before and limit must be integers'
+        }
+    }), 400
+
 @notification_bp.route('/notifications/send-reminders', methods=['POST'])
 @jwt_required()
 def send_reminders():
@@ -259,68 +395,46 @@ def send_reminders():
             }
         }), 403
     
-    data = request.get_json()
+    data = request.get_json(silent=True)
     
     # Default to 3 days before due date if not specified
-    days_before = data.get('days_before', 3) if data else 3
+    try:
+        days_before = int(data.get('days_before', 3)) if data else 3
+        listing_limit = _listing_limit(data)
+    except (TypeError, ValueError, PaginationError):
+        return _invalid_format_response()
     
     # Calculate the target due date
     target_date = date.today() + timedelta(days=days_before)
     
-    # Find payments due on the target date
-    due_payments = Payment.query.filter(
-        Payment.status.in_(['unpaid', 'partial']),
-        Payment.due_date == target_date
-    ).all()
+    # Find payments due on the target date for active guests
+    candidates = _payment_candidates_by_guest(Payment.due_date == target_date)
     
-    sent_notifications = []
+    messages = []
+    payments_count = 0
     
-    for payment in due_payments:
-        guest = Guest.query.get(payment.guest_id)
+    for candidate in candidates:
+        payments = candidate['payments']
+        payments_count += len(payments)
+        payment_id, amount, due_date = payments[0]
+        
+        # Create reminder message
+        if len(payments) == 1:
+            message = f"Dear {candidate['full_name']}, your rent payment of {amount} is due on {due_date.strftime('%Y-%m-%d')}. Please make the payment on time."
+        else:
+            total = sum(payment[1] for payment in payments)
+            message = f"Dear {candidate['full_name']}, your {len(payments)} rent payments totalling {total} are due on {due_date.strftime('%Y-%m-%d')}. Please make the payment on time."
         
-        if guest and guest.status == 'active':
-            # Create reminder message
-            message = f"Dear {guest.full_name}, your rent payment of {payment.amount} is due on {payment.due_date.strftime('%Y-%m-%d')}. Please make the payment on time."
-            
-            # Create notification for SMS
-            sms_notification = Notification(
-                guest_id=guest.id,
-                payment_id=payment.id,
-                type='sms',
-                message=message,
-                status='pending'
-            )
-            
-            # Create notification for Email
-            email_notification = Notification(
-                guest_id=guest.id,
-                payment_id=payment.id,
-                type='email',
-                message=message,
-                status='pending'
-            )
-            
-            db.session.add(sms_notification)
-            db.session.add(email_notification)
-            
-            # In a real application, we would send the notifications here
-            # For now, we'll simulate sending and update the status
-            send_notification(sms_notification)
-            send_notification(email_notification)
-            
-            sent_notifications.extend([sms_notification, email_notification])
+        messages.append((candidate['guest_id'], payment_id, message, candidate['channels']))
     
-    db.session.commit()
+    created_ids = _queue_notifications(messages)
     
-    # Convert to dict for response
-    sent_list = [notification.to_dict() for notification in sent_notifications]
+    summary = _fan_out_summary(listing_limit, len(candidates), payments_count, created_ids)
     
     return jsonify({
         'success': True,
-        'data': {
-            'sent': sent_list
-        },
-        'message': f'Sent {len(sent_notifications)} reminders for payments due in {days_before} days'
+        'data': summary,
+        'message': f'Queued {len(created_ids)} reminders for payments due in {days_before} days'
     }), 200
 
 @notification_bp.route('/notifications/send-overdue', methods=['POST'])
@@ -337,98 +451,44 @@ def send_overdue_alerts():
             }
         }), 403
     
-    # Find overdue payments
-    overdue_payments = Payment.query.filter(
-        Payment.status.in_(['unpaid', 'partial']),
-        Payment.due_date < date.today()
-    ).all()
+    data = request.get_json(silent=True)
+    today = date.today()
     
-    sent_notifications = []
+    try:
+        listing_limit = _listing_limit(data)
+    except (TypeError, ValueError, PaginationError):
+        return _invalid_format_response()
     
-    for payment in overdue_payments:
-        guest = Guest.query.get(payment.guest_id)
-        
-        if guest and guest.status == 'active':
-            # Calculate days overdue
-            days_overdue = (date.today() - payment.due_date).days
-            
-            # Create overdue message
-            message = f"URGENT: Dear {guest.full_name}, your rent payment of {payment.amount} is overdue by {days_overdue} days. Please make the payment immediately to avoid any inconvenience."
-            
-            # Create notification for SMS
-            sms_notification = Notification(
-                guest_id=guest.id,
-                payment_id=payment.id,
-                type='sms',
-                message=message,
-                status='pending'
-            )
-            
-            # Create notification for Email
-            email_notification = Notification(
-                guest_id=guest.id,
-                payment_id=payment.id,
-                type='email',
-                message=message,
-                status='pending'
-            )
-            
-            db.session.add(sms_notification)
-            db.session.add(email_notification)
-            
-            # In a real application, we would send the notifications here
-            # For now, we'll simulate sending and update the status
-            send_notification(sms_notification)
-            send_notification(email_notification)
-            
-            sent_notifications.extend([sms_notification, email_notification])
+    # Find overdue payments for active guests
+    candidates = _payment_candidates_by_guest(Payment.due_date < today)
     
-    db.session.commit()
+    messages = []
+    payments_count = 0
     
-    # Convert to dict for response
-    sent_list = [notification.to_dict() for notification in sent_notifications]
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'sent': sent_list
-        },
-        'message': f'Sent {len(sent_notifications)} overdue payment alerts'
-    }), 200
-
-# Helper function to simulate sending notifications
-def send_notification(notification):
-    # In a real application, this would integrate with Twilio for SMS
-    # or SendGrid for email
-    
-    # For now, we'll just simulate sending and update the status
-    if notification.type == 'sms':
-        # Simulate Twilio SMS integration
-        # twilio_client = Client(account_sid, auth_token)
-        # message = twilio_client.messages.create(
-        #     body=notification.message,
-        #     from_='+1234567890',
-        #     to='+1' + notification.guest.contact_number
-        # )
+    for candidate in candidates:
+        payments = candidate['payments']
+        payments_count += len(payments)
         
-        # Simulate success
-        notification.status = 'sent'
-        notification.sent_at = datetime.utcnow()
-    
-    elif notification.type == 'email':
-        # Simulate SendGrid email integration
-        # sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
-        # from_email = Email("noreply@pgmanagement.com")
-        # to_email = To(notification.guest.email)
-        # subject = "PG Management Notification"
-        # content = Content("text/plain", notification.message)
-        # mail = Mail(from_email, to_email, subject, content)
-        # response = sg.client.mail.send.post(request_body=mail.get())
+        # A guest with several overdue months gets one alert about the oldest,
+        # which also states the total outstanding
+        payment_id, amount, due_date = payments[0]
+        days_overdue = (today - due_date).days
         
-        # Simulate success
-        notification.status = 'sent'
-        notification.sent_at = datetime.utcnow()
+        # Create overdue message
+        if len(payments) == 1:
+            message = f"URGENT: Dear {candidate['full_name']}, your rent payment of {amount} is overdue by {days_overdue} days. Please make the payment immediately to avoid any inconvenience."
+        else:
+            total = sum(payment[1] for payment in payments)
+            message = f"URGENT: Dear {candidate['full_name']}, you have {len(payments)} overdue rent payments totalling {total}, the oldest overdue by {days_overdue} days. Please make the payment immediately to avoid any inconvenience."
+        
+        messages.append((candidate['guest_id'], payment_id, message, candidate['channels']))
     
-    db.session.commit()
+    created_ids = _queue_notifications(messages)
+    
+    summary = _fan_out_summary(listing_limit, len(candidates), payments_count, created_ids)
     
-    return notification
+    return jsonify({
+        'success': True,
+        'data': summary,
+        'message': f'Queued {len(created_ids)} overdue payment alerts'
+    }), 200
\ No newline at end of file
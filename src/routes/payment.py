@@ -1,15 +1,23 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.payment import db, Payment
+from src.models.db import db
+from src.models.payment import Payment
 from src.models.guest import Guest
-from src.models.notification import Notification
-from datetime import datetime, date, timedelta
+from src.services.collection_rollup import collection_key, record_payment_change
+from src.services.sql_helpers import conflict_aware_insert, insert_returning_ids
+from src.services.pagination import paginate, page_limit, encode_cursor, decode_cursor, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
+from src.services.response_cache import PAYMENTS, GUESTS
+from src.services.etags import conditional_get, bump_table_versions
+from sqlalchemy import select, exists, literal, and_
+from datetime import datetime, date
 import calendar
 
 payment_bp = Blueprint('payment', __name__)
 
 @payment_bp.route('/payments', methods=['GET'])
 @jwt_required()
+@conditional_get([PAYMENTS])
 def get_payments():
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -51,57 +59,76 @@ def get_payments():
             }), 400
     
     # Execute query and get results
-    payments = query.all()
-    payments_list = [payment.to_dict() for payment in payments]
+    try:
+        payments, next_cursor = paginate(serializable(query, Payment), Payment.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    payments_list = serialized_rows(payments)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'payments': payments_list
+            'payments': payments_list,
+            'next_cursor': next_cursor
         },
         'message': 'Payments retrieved successfully'
     }), 200
 
 @payment_bp.route('/payments/due', methods=['GET'])
 @jwt_required()
+@conditional_get([PAYMENTS])
 def get_due_payments():
     # Get payments that are due but not paid
-    payments = Payment.query.filter(
+    query = Payment.query.filter(
         Payment.status.in_(['unpaid', 'partial']),
         Payment.due_date >= date.today()
-    ).all()
+    )
     
-    payments_list = [payment.to_dict() for payment in payments]
+    try:
+        payments, next_cursor = paginate(serializable(query, Payment), Payment.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
     
-    return jsonify({
+    payments_list = serialized_rows(payments)
+    
+    return json_response({
         'success': True,
         'data': {
-            'payments': payments_list
+            'payments': payments_list,
+            'next_cursor': next_cursor
         },
         'message': 'Due payments retrieved successfully'
     }), 200
 
 @payment_bp.route('/payments/overdue', methods=['GET'])
 @jwt_required()
+@conditional_get([PAYMENTS])
 def get_overdue_payments():
     # Get payments that are overdue
-    payments = Payment.query.filter(
+    query = Payment.query.filter(
         Payment.status.in_(['unpaid', 'partial']),
         Payment.due_date < date.today()
-    ).all()
+    )
     
-    payments_list = [payment.to_dict() for payment in payments]
+    try:
+        payments, next_cursor = paginate(serializable(query, Payment), Payment.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
     
-    return jsonify({
+    payments_list = serialized_rows(payments)
+    
+    return json_response({
         'success': True,
         'data': {
-            'payments': payments_list
+            'payments': payments_list,
+            'next_cursor': next_cursor
         },
         'message': 'Overdue payments retrieved successfully'
     }), 200
 
 @payment_bp.route('/payments/<int:payment_id>', methods=['GET'])
 @jwt_required()
+@conditional_get([PAYMENTS])
 def get_payment(payment_id):
     payment = Payment.query.get(payment_id)
     
@@ -183,6 +210,17 @@ def create_payment():
             }
         }), 400
     
+    # Only one payment may exist per guest and due date
+    existing_payment = Payment.query.filter_by(guest_id=guest.id, due_date=due_date).first()
+    if existing_payment:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'PAYMENT_EXISTS',
+                'message': 'A payment for this guest and due date already exists'
+            }
+        }), 409
+    
     # Create new payment
     new_payment = Payment(
         guest_id=data.get('guest_id'),
@@ -194,6 +232,8 @@ def create_payment():
     )
     
     db.session.add(new_payment)
+    record_payment_change(None, collection_key(new_payment))
+    bump_table_versions(PAYMENTS)
     db.session.commit()
     
     return jsonify({
@@ -220,6 +260,9 @@ def update_payment(payment_id):
     
     data = request.get_json()
     
+    # Remember how the payment counted towards monthly collection before the update
+    old_collection_key = collection_key(payment)
+    
     # Update fields if provided
     if data.get('amount'):
         payment.amount = data.get('amount')
@@ -262,7 +305,6 @@ def update_payment(payment_id):
     if data.get('due_date'):
         try:
             due_date = datetime.strptime(data.get('due_date'), '%Y-%m-%d').date()
-            payment.due_date = due_date
         except ValueError:
             return jsonify({
                 'success': False,
@@ -271,7 +313,26 @@ def update_payment(payment_id):
                     'message': 'Date format should be YYYY-MM-DD'
                 }
             }), 400
+        
+        # Only one payment may exist per guest and due date
+        existing_payment = Payment.query.filter(
+            Payment.guest_id == payment.guest_id,
+            Payment.due_date == due_date,
+            Payment.id != payment.id
+        ).first()
+        if existing_payment:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'PAYMENT_EXISTS',
+                    'message': 'A payment for this guest and due date already exists'
+                }
+            }), 409
+        
+        payment.due_date = due_date
     
+    record_payment_change(old_collection_key, collection_key(payment))
+    bump_table_versions(PAYMENTS)
     db.session.commit()
     
     return jsonify({
@@ -307,7 +368,9 @@ def delete_payment(payment_id):
             }
         }), 404
     
+    record_payment_change(collection_key(payment), None)
     db.session.delete(payment)
+    bump_table_versions(PAYMENTS)
     db.session.commit()
     
     return jsonify({
@@ -317,6 +380,7 @@ def delete_payment(payment_id):
 
 @payment_bp.route('/payments/guest/<int:guest_id>', methods=['GET'])
 @jwt_required()
+@conditional_get([PAYMENTS, GUESTS])
 def get_guest_payments(guest_id):
     # Validate guest exists
     guest = Guest.query.get(guest_id)
@@ -329,13 +393,17 @@ def get_guest_payments(guest_id):
             }
         }), 404
     
-    payments = Payment.query.filter_by(guest_id=guest_id).all()
-    payments_list = [payment.to_dict() for payment in payments]
+    try:
+        payments, next_cursor = paginate(serializable(Payment.query.filter_by(guest_id=guest_id), Payment), Payment.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    payments_list = serialized_rows(payments)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'payments': payments_list
+            'payments': payments_list,
+            'next_cursor': next_cursor
         },
         'message': 'Guest payments retrieved successfully'
     }), 200
@@ -387,8 +455,13 @@ def generate_monthly_payments():
             }
         }), 400
     
-    # Get all active guests
-    active_guests = Guest.query.filter_by(status='active').all()
+    # Optional listing of the generated payments, paged by id
+    include_payments = bool(data.get('include_payments'))
+    try:
+        limit = page_limit(data.get('limit'))
+        after_id = decode_cursor(data['cursor']) if data.get('cursor') else None
+    except PaginationError as e:
+        return pagination_error(e)
     
     # Calculate due date (1st of the month)
     due_date = date(year, month, 1)
@@ -397,38 +470,79 @@ def generate_monthly_payments():
     _, last_day = calendar.monthrange(year, month)
     payment_date = date(year, month, last_day)
     
-    # Generate payments for each active guest
-    generated_payments = []
-    
-    for guest in active_guests:
-        # Check if payment already exists for this month and guest
-        existing_payment = Payment.query.filter(
-            Payment.guest_id == guest.id,
+    # Generate payments for every active guest in one INSERT ... SELECT, skipping
+    # guests who already have a payment for this due date. Re-running is a no-op,
+    # so later pages of the listing can be requested with the same body.
+    now = datetime.utcnow()
+    candidates = select(
+        Guest.id,
+        Guest.rent_amount,
+        literal(payment_date, db.Date),
+        literal('full'),
+        literal('unpaid'),
+        literal(due_date, db.Date),
+        literal(now, db.DateTime),
+        literal(now, db.DateTime)
+    ).where(
+        Guest.status == 'active',
+        ~exists().where(and_(
+            Payment.guest_id == Guest.id,
             Payment.due_date == due_date
-        ).first()
-        
-        if not existing_payment:
-            new_payment = Payment(
-                guest_id=guest.id,
-                amount=guest.rent_amount,
-                payment_date=payment_date,
-                payment_type='full',
-                status='unpaid',
-                due_date=due_date
-            )
-            
-            db.session.add(new_payment)
-            generated_payments.append(new_payment)
-    
+        ))
+    )
+    columns = ['guest_id', 'amount', 'payment_date', 'payment_type', 'status', 'due_date', 'created_at', 'updated_at']
+    
+    # The (guest_id, due_date) unique constraint covers concurrent runs
+    statement = conflict_aware_insert(Payment)
+    if statement is not None:
+        statement = statement.from_select(columns, candidates).on_conflict_do_nothing(
+            index_elements=['guest_id', 'due_date']
+        )
+    else:
+        statement = Payment.__table__.insert().from_select(columns, candidates)
+    
+    # Every row this call inserts carries its created_at
+    generated_ids = insert_returning_ids(Payment, statement, [
+        Payment.due_date == due_date,
+        Payment.created_at == now
+    ])
+    generated_count = len(generated_ids)
+    bump_table_versions(PAYMENTS)
     db.session.commit()
     
-    # Convert to dict for response
-    generated_list = [payment.to_dict() for payment in generated_payments]
+    active_guests_count = Guest.query.filter_by(status='active').count()
+    
+    response_data = {
+        'month': month,
+        'year': year,
+        'due_date': due_date.isoformat(),
+        'generated_count': generated_count,
+        'skipped_count': active_guests_count - generated_count
+    }
+    
+    if include_payments:
+        # Without a cursor the listing starts at the rows this call inserted.
+        # Later pages continue through the rows inserted by the run that
+        # produced the cursor row, which all share its created_at.
+        if after_id is None:
+            query = Payment.query.filter(Payment.id.in_(generated_ids[:limit + 1]))
+        else:
+            run_created_at = select(Payment.created_at).where(Payment.id == after_id).scalar_subquery()
+            query = Payment.query.filter(
+                Payment.due_date == due_date,
+                Payment.created_at == run_created_at,
+                Payment.id > after_id
+            )
+        page = query.order_by(Payment.id).limit(limit + 1).all()
+        
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        response_data['generated'] = [payment.to_dict() for payment in page]
+        response_data['next_cursor'] = encode_cursor(page[-1].id) if has_more else None
     
     return jsonify({
         'success': True,
-        'data': {
-            'generated': generated_list
-        },
-        'message': f'Generated {len(generated_payments)} payments for {month}/{year}'
+        'data': response_data,
+        'message': f'Generated {generated_count} payments for {month}/{year}'
     }), 201
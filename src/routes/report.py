@@ -1,21 +1,213 @@
-from flask import Blueprint, request, jsonify, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.payment import db, Payment
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from src.models.db import db
+from src.models.payment import Payment
 from src.models.guest import Guest
 from src.models.room import Room
+from src.models.room_history import RoomHistory
+from sqlalchemy import func, or_
+from src.services.read_replica import read_only
+from src.services.occupancy_timeline import build_occupancy_timeline, occupancy_timeline_cache, MAX_TIMELINE_DAYS
 from datetime import datetime, date, timedelta
-import calendar
 import os
 import csv
 import tempfile
 import io
-import pandas as pd
-from fpdf2 import FPDF
 
 report_bp = Blueprint('report', __name__)
 
+# Number of rows fetched per round trip when streaming report queries
+REPORT_BATCH_SIZE = 1000
+
+# Approximate size in bytes of each chunk sent by streamed CSV exports
+CSV_CHUNK_SIZE = 64 * 1024
+
+# Yields rent report rows from one Payment -> Guest -> Room query that selects
+# only the needed columns, streamed in batches instead of loading every row
+def rent_report_rows(start_date, end_date, guest_id=None, room_id=None):
+    query = db.session.query(
+        Payment.id,
+        Guest.full_name,
+        Room.room_number,
+        Payment.amount,
+        Payment.payment_date,
+        Payment.status,
+        Payment.due_date
+    ).outerjoin(
+        Guest, Guest.id == Payment.guest_id
+    ).outerjoin(
+        Room, Room.id == Guest.room_id
+    ).filter(
+        Payment.payment_date >= start_date,
+        Payment.payment_date <= end_date
+    )
+    
+    # Apply additional filters if provided
+    if guest_id:
+        query = query.filter(Payment.guest_id == guest_id)
+    
+    if room_id:
+        query = query.filter(Guest.room_id == room_id)
+    
+    query = query.order_by(Payment.id).yield_per(REPORT_BATCH_SIZE)
+    
+    for payment_id, guest_name, room_number, amount, payment_date, status, due_date in query:
+        yield {
+            'payment_id': payment_id,
+            'guest_name': guest_name if guest_name is not None else 'Unknown',
+            'room_number': room_number if room_number is not None else 'Unknown',
+            'amount': float(amount),
+            'payment_date': payment_date.strftime('%Y-%m-%d'),
+            'status': status,
+            'due_date': due_date.strftime('%Y-%m-%d')
+        }
+
+# Separates guest names aggregated in SQL; a control character cannot clash
+# with a name
+GUEST_NAME_SEPARATOR = '\x1f'
+
+def _aggregate_names(column):
+    if db.engine.dialect.name == 'postgresql':
+        return func.string_agg(column, GUEST_NAME_SEPARATOR)
+    return func.group_concat(column, GUEST_NAME_SEPARATOR)
+
+# Yields occupancy report rows, one per room, as the rooms stood on report_date.
+# A single grouped query joins each room to the stays in room_history covering
+# that date and aggregates the guests' names. Stays are half-open: a guest
+# counts from start_date up to, but not on, end_date, so a guest who moves
+# rooms is only counted in the new room on the day of the move.
+def occupancy_report_rows(report_date):
+    stays = db.session.query(
+        RoomHistory.room_id,
+        Guest.full_name
+    ).join(
+        Guest, Guest.id == RoomHistory.guest_id
+    ).filter(
+        RoomHistory.start_date <= report_date,
+        or_(RoomHistory.end_date == None, RoomHistory.end_date > report_date)
+    ).subquery()
+    
+    query = db.session.query(
+        Room.id,
+        Room.room_number,
+        Room.capacity,
+        func.count(stays.c.room_id),
+        _aggregate_names(stays.c.full_name)
+    ).outerjoin(
+        stays, stays.c.room_id == Room.id
+    ).group_by(
+        Room.id, Room.room_number, Room.capacity
+    ).order_by(Room.id).yield_per(REPORT_BATCH_SIZE)
+    
+    for room_id, room_number, capacity, occupancy, names in query:
+        yield {
+            'room_id': room_id,
+            'room_number': room_number,
+            'capacity': capacity,
+            'status': 'occupied' if occupancy else 'available',
+            'occupancy': occupancy,
+            'guests': sorted(names.split(GUEST_NAME_SEPARATOR)) if names else []
+        }
+
+# Yields guests report rows from one Guest -> Room query, streamed in batches
+def guests_report_rows(status=None):
+    query = db.session.query(
+        Guest.id,
+        Guest.full_name,
+        Guest.contact_number,
+        Room.room_number,
+        Guest.check_in_date,
+        Guest.check_out_date,
+        Guest.rent_amount,
+        Guest.status
+    ).outerjoin(
+        Room, Room.id == Guest.room_id
+    )
+    
+    # Apply filter if provided
+    if status:
+        query = query.filter(Guest.status == status)
+    
+    query = query.order_by(Guest.id).yield_per(REPORT_BATCH_SIZE)
+    
+    for guest_id, full_name, contact_number, room_number, check_in_date, check_out_date, rent_amount, guest_status in query:
+        yield {
+            'guest_id': guest_id,
+            'full_name': full_name,
+            'contact_number': contact_number,
+            'room_number': room_number if room_number is not None else 'Unknown',
+            'check_in_date': check_in_date.strftime('%Y-%m-%d'),
+            'check_out_date': check_out_date.strftime('%Y-%m-%d') if check_out_date else 'N/A',
+            'rent_amount': float(rent_amount),
+            'status': guest_status
+        }
+
+# Yields payments report rows from one Payment -> Guest query, streamed in batches
+def payments_report_rows(start_date, end_date, status=None):
+    query = db.session.query(
+        Payment.id,
+        Guest.full_name,
+        Payment.amount,
+        Payment.payment_date,
+        Payment.payment_type,
+        Payment.status,
+        Payment.due_date
+    ).outerjoin(
+        Guest, Guest.id == Payment.guest_id
+    ).filter(
+        Payment.due_date >= start_date,
+        Payment.due_date <= end_date
+    )
+    
+    # Apply status filter if provided
+    if status:
+        query = query.filter(Payment.status == status)
+    
+    query = query.order_by(Payment.id).yield_per(REPORT_BATCH_SIZE)
+    
+    for payment_id, guest_name, amount, payment_date, payment_type, payment_status, due_date in query:
+        yield {
+            'payment_id': payment_id,
+            'guest_name': guest_name if guest_name is not None else 'Unknown',
+            'amount': float(amount),
+            'payment_date': payment_date.strftime('%Y-%m-%d'),
+            'payment_type': payment_type,
+            'status': payment_status,
+            'due_date': due_date.strftime('%Y-%m-%d')
+        }
+
+# Streams rows as a CSV attachment. The header goes out immediately and rows are
+# flushed in chunks of about CSV_CHUNK_SIZE bytes, with nothing written to disk.
+def csv_response(fieldnames, rows, filename):
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return chunk
+        
+        # Send the header before the query has produced any rows
+        writer.writeheader()
+        yield drain()
+        
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= CSV_CHUNK_SIZE:
+                yield drain()
+        
+        if buffer.tell():
+            yield drain()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
 @report_bp.route('/reports/rent', methods=['GET'])
 @jwt_required()
+@read_only
 def get_rent_report():
     # Get query parameters for filtering
     start_date = request.args.get('start_date')
@@ -56,48 +248,21 @@ def get_rent_report():
         # Default to today
         end_date = date.today()
     
-    # Base query
-    query = Payment.query.filter(
-        Payment.payment_date >= start_date,
-        Payment.payment_date <= end_date
-    )
-    
-    # Apply additional filters if provided
-    if guest_id:
-        query = query.filter(Payment.guest_id == guest_id)
-    
-    if room_id:
-        # Join with Guest to filter by room_id
-        query = query.join(Guest).filter(Guest.room_id == room_id)
-    
-    # Execute query and get results
-    payments = query.all()
-    
-    # Prepare data for report
-    report_data = []
-    total_amount = 0
-    
-    for payment in payments:
-        guest = Guest.query.get(payment.guest_id)
-        room = Room.query.get(guest.room_id) if guest else None
-        
-        payment_data = {
-            'payment_id': payment.id,
-            'guest_name': guest.full_name if guest else 'Unknown',
-            'room_number': room.room_number if room else 'Unknown',
-            'amount': float(payment.amount),
-            'payment_date': payment.payment_date.strftime('%Y-%m-%d'),
-            'status': payment.status,
-            'due_date': payment.due_date.strftime('%Y-%m-%d')
-        }
-        
-        report_data.append(payment_data)
-        
-        if payment.status == 'paid':
-            total_amount += float(payment.amount)
+    # Report rows come from a single joined, streamed query; each format consumes
+    # them as they arrive so only the JSON response holds every row in memory
+    report_rows = rent_report_rows(start_date, end_date, guest_id, room_id)
     
     # Generate report based on requested format
     if report_format == 'json':
+        report_data = []
+        total_amount = 0
+        
+        for payment_data in report_rows:
+            report_data.append(payment_data)
+            
+            if payment_data['status'] == 'paid':
+                total_amount += payment_data['amount']
+        
         return jsonify({
             'success': True,
             'data': {
@@ -112,32 +277,14 @@ def get_rent_report():
         }), 200
     
     elif report_format == 'csv':
-        # Create a temporary file
-        fd, path = tempfile.mkstemp(suffix='.csv')
-        
-        try:
-            with os.fdopen(fd, 'w', newline='') as temp_file:
-                # Create CSV writer
-                fieldnames = ['payment_id', 'guest_name', 'room_number', 'amount', 'payment_date', 'status', 'due_date']
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                
-                # Write header and data
-                writer.writeheader()
-                writer.writerows(report_data)
-            
-            # Send the file
-            return send_file(
-                path,
-                as_attachment=True,
-                download_name=f'rent_report_{start_date.strftime("%Y%m%d")}_{end_date.strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        
-        finally:
-            # Clean up the temporary file
-            os.remove(path)
+        # Stream rows straight from the query to the client
+        fieldnames = ['payment_id', 'guest_name', 'room_number', 'amount', 'payment_date', 'status', 'due_date']
+        return csv_response(fieldnames, report_rows, f'rent_report_{start_date.strftime("%Y%m%d")}_{end_date.strftime("%Y%m%d")}.csv')
     
     elif report_format == 'pdf':
+        # Imported on first use so workers start without the PDF stack
+        from fpdf import FPDF
+        
         # Create PDF using FPDF2
         pdf = FPDF()
         pdf.add_page()
@@ -163,7 +310,8 @@ def get_rent_report():
         
         # Table data
         pdf.set_font("helvetica", size=10)
-        for data in report_data:
+        total_amount = 0
+        for data in report_rows:
             pdf.cell(15, 10, txt=str(data['payment_id']), border=1)
             pdf.cell(40, 10, txt=data['guest_name'], border=1)
             pdf.cell(25, 10, txt=data['room_number'], border=1)
@@ -171,6 +319,9 @@ def get_rent_report():
             pdf.cell(30, 10, txt=data['payment_date'], border=1)
             pdf.cell(25, 10, txt=data['status'], border=1)
             pdf.cell(30, 10, txt=data['due_date'], border=1, ln=True)
+            
+            if data['status'] == 'paid':
+                total_amount += data['amount']
         
         # Summary
         pdf.ln(10)
@@ -207,6 +358,7 @@ def get_rent_report():
 
 @report_bp.route('/reports/occupancy', methods=['GET'])
 @jwt_required()
+@read_only
 def get_occupancy_report():
     # Get query parameters
     report_date = request.args.get('date')
@@ -228,31 +380,15 @@ def get_occupancy_report():
         # Default to today
         report_date = date.today()
     
-    # Get all rooms
-    rooms = Room.query.all()
+    # CSV is streamed straight from the query without building the report in memory
+    if report_format == 'csv':
+        fieldnames = ['room_id', 'room_number', 'capacity', 'status', 'occupancy', 'guests']
+        return csv_response(fieldnames, occupancy_report_rows(report_date), f'occupancy_report_{report_date.strftime("%Y%m%d")}.csv')
     
     # Prepare data for report
-    report_data = []
-    total_rooms = len(rooms)
-    occupied_rooms = 0
-    
-    for room in rooms:
-        # Get active guests in room
-        active_guests = Guest.query.filter_by(room_id=room.id, status='active').all()
-        
-        room_data = {
-            'room_id': room.id,
-            'room_number': room.room_number,
-            'capacity': room.capacity,
-            'status': room.status,
-            'occupancy': len(active_guests),
-            'guests': [guest.full_name for guest in active_guests]
-        }
-        
-        report_data.append(room_data)
-        
-        if room.status == 'occupied':
-            occupied_rooms += 1
+    report_data = list(occupancy_report_rows(report_date))
+    total_rooms = len(report_data)
+    occupied_rooms = sum(1 for room_data in report_data if room_data['status'] == 'occupied')
     
     # Calculate occupancy rate
     occupancy_rate = (occupied_rooms / total_rooms) * 100 if total_rooms > 0 else 0
@@ -273,33 +409,10 @@ def get_occupancy_report():
             'message': 'Occupancy report generated successfully'
         }), 200
     
-    elif report_format == 'csv':
-        # Create a temporary file
-        fd, path = tempfile.mkstemp(suffix='.csv')
-        
-        try:
-            with os.fdopen(fd, 'w', newline='') as temp_file:
-                # Create CSV writer
-                fieldnames = ['room_id', 'room_number', 'capacity', 'status', 'occupancy', 'guests']
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                
-                # Write header and data
-                writer.writeheader()
-                writer.writerows(report_data)
-            
-            # Send the file
-            return send_file(
-                path,
-                as_attachment=True,
-                download_name=f'occupancy_report_{report_date.strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        
-        finally:
-            # Clean up the temporary file
-            os.remove(path)
-    
     elif report_format == 'pdf':
+        # Imported on first use so workers start without the PDF stack
+        from fpdf import FPDF
+        
         # Create PDF using FPDF2
         pdf = FPDF()
         pdf.add_page()
@@ -367,41 +480,63 @@ def get_occupancy_report():
             }
         }), 400
 
+@report_bp.route('/reports/occupancy/timeline', methods=['GET'])
+@jwt_required()
+@read_only
+def get_occupancy_timeline():
+    # Get query parameters
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    room_id = request.args.get('room_id', type=int)
+    by_room = request.args.get('by_room', 'false').lower() == 'true'
+    
+    # Validate dates
+    try:
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else date.today()
+        # Default to the 30 days up to end_date
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else end_date - timedelta(days=29)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_DATE_FORMAT',
+                'message': 'Date format should be YYYY-MM-DD'
+            }
+        }), 400
+    
+    if start_date > end_date or (end_date - start_date).days >= MAX_TIMELINE_DAYS:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_DATE_RANGE',
+                'message': f'start_date must not be after end_date and the range is limited to {MAX_TIMELINE_DAYS} days'
+            }
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'timeline': build_occupancy_timeline(start_date, end_date, room_id, by_room),
+            'cache': occupancy_timeline_cache.stats()
+        },
+        'message': 'Occupancy timeline generated successfully'
+    }), 200
+
 @report_bp.route('/reports/guests', methods=['GET'])
 @jwt_required()
+@read_only
 def get_guests_report():
     # Get query parameters
     status = request.args.get('status')
     report_format = request.args.get('format', 'json')  # Default to JSON if not specified
     
-    # Base query
-    query = Guest.query
-    
-    # Apply filter if provided
-    if status:
-        query = query.filter(Guest.status == status)
-    
-    # Execute query and get results
-    guests = query.all()
+    # CSV is streamed straight from the query without building the report in memory
+    if report_format == 'csv':
+        fieldnames = ['guest_id', 'full_name', 'contact_number', 'room_number', 'check_in_date', 'check_out_date', 'rent_amount', 'status']
+        return csv_response(fieldnames, guests_report_rows(status), f'guests_report_{date.today().strftime("%Y%m%d")}.csv')
     
     # Prepare data for report
-    report_data = []
-    
-    for guest in guests:
-        room = Room.query.get(guest.room_id)
-        
-        guest_data = {
-            'guest_id': guest.id,
-            'full_name': guest.full_name,
-            'contact_number': guest.contact_number,
-            'room_number': room.room_number if room else 'Unknown',
-            'check_in_date': guest.check_in_date.strftime('%Y-%m-%d'),
-            'check_out_date': guest.check_out_date.strftime('%Y-%m-%d') if guest.check_out_date else 'N/A',
-            'rent_amount': float(guest.rent_amount),
-            'status': guest.status
-        }
-        
-        report_data.append(guest_data)
+    report_data = list(guests_report_rows(status))
     
     # Generate report based on requested format
     if report_format == 'json':
@@ -416,33 +551,10 @@ def get_guests_report():
             'message': 'Guests report generated successfully'
         }), 200
     
-    elif report_format == 'csv':
-        # Create a temporary file
-        fd, path = tempfile.mkstemp(suffix='.csv')
-        
-        try:
-            with os.fdopen(fd, 'w', newline='') as temp_file:
-                # Create CSV writer
-                fieldnames = ['guest_id', 'full_name', 'contact_number', 'room_number', 'check_in_date', 'check_out_date', 'rent_amount', 'status']
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                
-                # Write header and data
-                writer.writeheader()
-                writer.writerows(report_data)
-            
-            # Send the file
-            return send_file(
-                path,
-                as_attachment=True,
-                download_name=f'guests_report_{date.today().strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        
-        finally:
-            # Clean up the temporary file
-            os.remove(path)
-    
     elif report_format == 'pdf':
+        # Imported on first use so workers start without the PDF stack
+        from fpdf import FPDF
+        
         # Create PDF using FPDF2
         pdf = FPDF()
         pdf.add_page(orientation='L')  # Landscape for more columns
@@ -514,6 +626,7 @@ def get_guests_report():
 
 @report_bp.route('/reports/payments', methods=['GET'])
 @jwt_required()
+@read_only
 def get_payments_report():
     # Get query parameters
     start_date = request.args.get('start_date')
@@ -553,46 +666,24 @@ def get_payments_report():
         # Default to today
         end_date = date.today()
     
-    # Base query
-    query = Payment.query.filter(
-        Payment.due_date >= start_date,
-        Payment.due_date <= end_date
-    )
-    
-    # Apply status filter if provided
-    if status:
-        query = query.filter(Payment.status == status)
-    
-    # Execute query and get results
-    payments = query.all()
+    # CSV is streamed straight from the query without building the report in memory
+    if report_format == 'csv':
+        fieldnames = ['payment_id', 'guest_name', 'amount', 'payment_date', 'payment_type', 'status', 'due_date']
+        return csv_response(fieldnames, payments_report_rows(start_date, end_date, status), f'payments_report_{start_date.strftime("%Y%m%d")}_{end_date.strftime("%Y%m%d")}.csv')
     
     # Prepare data for report
-    report_data = []
+    report_data = list(payments_report_rows(start_date, end_date, status))
     total_amount = 0
     paid_amount = 0
     pending_amount = 0
     
-    for payment in payments:
-        guest = Guest.query.get(payment.guest_id)
-        
-        payment_data = {
-            'payment_id': payment.id,
-            'guest_name': guest.full_name if guest else 'Unknown',
-            'amount': float(payment.amount),
-            'payment_date': payment.payment_date.strftime('%Y-%m-%d'),
-            'payment_type': payment.payment_type,
-            'status': payment.status,
-            'due_date': payment.due_date.strftime('%Y-%m-%d')
-        }
-        
-        report_data.append(payment_data)
-        
-        total_amount += float(payment.amount)
+    for payment_data in report_data:
+        total_amount += payment_data['amount']
         
-        if payment.status == 'paid':
-            paid_amount += float(payment.amount)
+        if payment_data['status'] == 'paid':
+            paid_amount += payment_data['amount']
         else:
-            pending_amount += float(payment.amount)
+            pending_amount += payment_data['amount']
     
     # Generate report based on requested format
     if report_format == 'json':
@@ -611,33 +702,10 @@ def get_payments_report():
             'message': 'Payments report generated successfully'
         }), 200
     
-    elif report_format == 'csv':
-        # Create a temporary file
-        fd, path = tempfile.mkstemp(suffix='.csv')
-        
-        try:
-            with os.fdopen(fd, 'w', newline='') as temp_file:
-                # Create CSV writer
-                fieldnames = ['payment_id', 'guest_name', 'amount', 'payment_date', 'payment_type', 'status', 'due_date']
-                writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-                
-                # Write header and data
-                writer.writeheader()
-                writer.writerows(report_data)
-            
-            # Send the file
-            return send_file(
-                path,
-                as_attachment=True,
-                download_name=f'payments_report_{start_date.strftime("%Y%m%d")}_{end_date.strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        
-        finally:
-            # Clean up the temporary file
-            os.remove(path)
-    
     elif report_format == 'pdf':
+        # Imported on first use so workers start without the PDF stack
+        from fpdf import FPDF
+        
         # Create PDF using FPDF2
         pdf = FPDF()
         pdf.add_page()
@@ -706,3 +774,12 @@ def get_payments_report():
                 'message': 'Format must be json, csv, or pdf'
             }
         }), 400
+
+# Report views by type, used by the report job worker to render reports
+# outside of the request thread
+REPORT_VIEWS = {
+    'rent': get_rent_report,
+    'occupancy': get_occupancy_report,
+    'guests': get_guests_report,
+    'payments': get_payments_report
+}
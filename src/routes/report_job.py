@@ -0,0 +1,147 @@
+from flask import Blueprint, request, jsonify, send_file, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.report_job import ReportJob
+from src.services.report_jobs import REPORT_TYPES, REPORT_FORMATS, REPORT_PARAMS, submit_report_job
+from datetime import datetime
+import os
+
+report_job_bp = Blueprint('report_job', __name__)
+
+def job_to_dict(job):
+    job_data = job.to_dict()
+    job_data['download_url'] = url_for('report_job.download_report_job', job_id=job.id) if job.status == 'completed' else None
+    return job_data
+
+@report_job_bp.route('/reports/jobs', methods=['POST'])
+@jwt_required()
+def create_report_job():
+    data = request.get_json()
+    
+    if not data or not data.get('report_type'):
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'MISSING_FIELDS',
+                'message': 'report_type is required'
+            }
+        }), 400
+    
+    report_type = data.get('report_type')
+    report_format = data.get('format', 'json')
+    params = data.get('params') or {}
+    
+    if report_type not in REPORT_TYPES:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_REPORT_TYPE',
+                'message': 'Report type must be rent, occupancy, guests, or payments'
+            }
+        }), 400
+    
+    if report_format not in REPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_FORMAT',
+                'message': 'Format must be json, csv, or pdf'
+            }
+        }), 400
+    
+    if not isinstance(params, dict) or any(name not in REPORT_PARAMS[report_type] for name in params):
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMS',
+                'message': f'Params for {report_type} reports must be among: {", ".join(REPORT_PARAMS[report_type])}'
+            }
+        }), 400
+    
+    # Normalise values so identical requests hash identically
+    params = {name: str(value) for name, value in params.items() if value not in (None, '')}
+    
+    # Validate dates up front instead of failing later in the worker
+    for name, value in params.items():
+        if name.endswith('date'):
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': {
+                        'code': 'INVALID_DATE_FORMAT',
+                        'message': 'Date format should be YYYY-MM-DD'
+                    }
+                }), 400
+    
+    current_user = get_jwt_identity()
+    job, created = submit_report_job(report_type, report_format, params, current_user.get('id'))
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'job': job_to_dict(job)
+        },
+        'message': 'Report job queued successfully' if created else 'Existing report job reused'
+    }), 202 if created else 200
+
+@report_job_bp.route('/reports/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_report_job(job_id):
+    job = ReportJob.query.get(job_id)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_NOT_FOUND',
+                'message': 'Report job not found'
+            }
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'job': job_to_dict(job)
+        },
+        'message': 'Report job retrieved successfully'
+    }), 200
+
+@report_job_bp.route('/reports/jobs/<int:job_id>/download', methods=['GET'])
+@jwt_required()
+def download_report_job(job_id):
+    job = ReportJob.query.get(job_id)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_NOT_FOUND',
+                'message': 'Report job not found'
+            }
+        }), 404
+    
+    if job.status != 'completed':
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_NOT_READY',
+                'message': f'Report job is {job.status}'
+            }
+        }), 409
+    
+    if not job.file_path or not os.path.exists(job.file_path):
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'ARTIFACT_NOT_FOUND',
+                'message': 'Report file is no longer available'
+            }
+        }), 410
+    
+    return send_file(
+        job.file_path,
+        as_attachment=True,
+        download_name=job.file_name,
+        mimetype=job.mimetype
+    )
@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.room import db, Room
-from datetime import datetime
+from src.models.db import db
+from src.models.room import Room
+from src.models.guest import Guest
+from src.services.pagination import paginate, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
+from src.services.autocomplete import autocomplete_index
+from src.services.response_cache import ROOMS, GUESTS
+from src.services.etags import conditional_get, bump_table_versions
 
 room_bp = Blueprint('room', __name__)
 
 @room_bp.route('/rooms', methods=['GET'])
 @jwt_required()
+@conditional_get([ROOMS])
 def get_rooms():
     # Get query parameters for filtering
     status = request.args.get('status')
@@ -19,47 +26,62 @@ def get_rooms():
         query = query.filter(Room.status == status)
     
     # Execute query and get results
-    rooms = query.all()
-    rooms_list = [room.to_dict() for room in rooms]
+    try:
+        rooms, next_cursor = paginate(serializable(query, Room), Room.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    rooms_list = serialized_rows(rooms)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'rooms': rooms_list
+            'rooms': rooms_list,
+            'next_cursor': next_cursor
         },
         'message': 'Rooms retrieved successfully'
     }), 200
 
 @room_bp.route('/rooms/available', methods=['GET'])
 @jwt_required()
+@conditional_get([ROOMS])
 def get_available_rooms():
-    rooms = Room.query.filter_by(status='available').all()
-    rooms_list = [room.to_dict() for room in rooms]
+    try:
+        rooms, next_cursor = paginate(serializable(Room.query.filter_by(status='available'), Room), Room.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    rooms_list = serialized_rows(rooms)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'rooms': rooms_list
+            'rooms': rooms_list,
+            'next_cursor': next_cursor
         },
         'message': 'Available rooms retrieved successfully'
     }), 200
 
 @room_bp.route('/rooms/occupied', methods=['GET'])
 @jwt_required()
+@conditional_get([ROOMS])
 def get_occupied_rooms():
-    rooms = Room.query.filter_by(status='occupied').all()
-    rooms_list = [room.to_dict() for room in rooms]
+    try:
+        rooms, next_cursor = paginate(serializable(Room.query.filter_by(status='occupied'), Room), Room.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    rooms_list = serialized_rows(rooms)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'rooms': rooms_list
+            'rooms': rooms_list,
+            'next_cursor': next_cursor
         },
         'message': 'Occupied rooms retrieved successfully'
     }), 200
 
 @room_bp.route('/rooms/<int:room_id>', methods=['GET'])
 @jwt_required()
+@conditional_get([ROOMS])
 def get_room(room_id):
     room = Room.query.get(room_id)
     
@@ -132,7 +154,9 @@ def create_room():
     )
     
     db.session.add(new_room)
+    bump_table_versions(ROOMS)
     db.session.commit()
+    autocomplete_index.index_room(new_room)
     
     return jsonify({
         'success': True,
@@ -198,7 +222,9 @@ def update_room(room_id):
     if 'notes' in data:
         room.notes = data.get('notes')
     
+    bump_table_versions(ROOMS)
     db.session.commit()
+    autocomplete_index.index_room(room)
     
     return jsonify({
         'success': True,
@@ -234,7 +260,7 @@ def delete_room(room_id):
         }), 404
     
     # Check if room has active guests
-    if room.guests and any(guest.status == 'active' for guest in room.guests):
+    if room.active_occupants > 0:
         return jsonify({
             'success': False,
             'error': {
@@ -244,7 +270,9 @@ def delete_room(room_id):
         }), 400
     
     db.session.delete(room)
+    bump_table_versions(ROOMS)
     db.session.commit()
+    autocomplete_index.remove_room(room_id)
     
     return jsonify({
         'success': True,
@@ -253,6 +281,7 @@ def delete_room(room_id):
 
 @room_bp.route('/rooms/<int:room_id>/guests', methods=['GET'])
 @jwt_required()
+@conditional_get([ROOMS, GUESTS])
 def get_room_guests(room_id):
     room = Room.query.get(room_id)
     
@@ -265,13 +294,17 @@ def get_room_guests(room_id):
             }
         }), 404
     
-    guests = room.guests
-    guests_list = [guest.to_dict() for guest in guests]
+    try:
+        guests, next_cursor = paginate(serializable(Guest.query.filter_by(room_id=room.id), Guest), Guest.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    guests_list = serialized_rows(guests)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'guests': guests_list
+            'guests': guests_list,
+            'next_cursor': next_cursor
         },
         'message': 'Room guests retrieved successfully'
     }), 200
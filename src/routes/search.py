@@ -0,0 +1,89 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from src.models.room import Room
+from src.services.autocomplete import (
+    autocomplete_index, guest_suggestion, room_suggestion,
+    SUGGESTION_TYPES, DEFAULT_SUGGESTION_LIMIT, MAX_SUGGESTION_LIMIT
+)
+from src.services.guest_search import find_guests
+from sqlalchemy import func
+
+search_bp = Blueprint('search', __name__)
+
+# Used until the in-memory index has warmed up, or when it is disabled
+def database_suggestions(query, limit, types):
+    suggestions = []
+    
+    if 'room' in types:
+        rooms = Room.query.filter(
+            func.lower(Room.room_number).startswith(query.lower(), autoescape=True)
+        ).order_by(Room.room_number).limit(limit).all()
+        suggestions.extend(room_suggestion(room) for room in rooms)
+    
+    if 'guest' in types:
+        guests, _ = find_guests(query, limit)
+        suggestions.extend(guest_suggestion(guest) for guest in guests)
+    
+    return suggestions[:limit]
+
+@search_bp.route('/search/autocomplete', methods=['GET'])
+@jwt_required()
+def autocomplete():
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'MISSING_QUERY',
+                'message': 'Search query is required'
+            }
+        }), 400
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_SUGGESTION_LIMIT)), MAX_SUGGESTION_LIMIT))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_LIMIT',
+                'message': 'Limit must be an integer'
+            }
+        }), 400
+    
+    types = request.args.get('types', ','.join(SUGGESTION_TYPES)).split(',')
+    if any(kind not in SUGGESTION_TYPES for kind in types):
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_TYPE',
+                'message': 'Types must be guest, room, or both'
+            }
+        }), 400
+    
+    if autocomplete_index.ready:
+        suggestions = autocomplete_index.search(query, limit, types)
+        source = 'index'
+    else:
+        suggestions = database_suggestions(query, limit, types)
+        source = 'database'
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'suggestions': suggestions,
+            'source': source
+        },
+        'message': 'Suggestions retrieved successfully'
+    }), 200
+
+@search_bp.route('/search/autocomplete/stats', methods=['GET'])
+@jwt_required()
+def autocomplete_stats():
+    return jsonify({
+        'success': True,
+        'data': {
+            'index': autocomplete_index.stats()
+        },
+        'message': 'Autocomplete index stats retrieved successfully'
+    }), 200
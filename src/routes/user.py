@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.user import db, User
+from src.models.db import db
+from src.models.user import User
+from src.services.pagination import paginate, PaginationError, pagination_error
+from src.services.serialization import serializable, serialized_rows, json_response
 
 user_bp = Blueprint('user', __name__)
 
@@ -18,13 +21,17 @@ def get_users():
             }
         }), 403
     
-    users = User.query.all()
-    users_list = [user.to_dict() for user in users]
+    try:
+        users, next_cursor = paginate(serializable(User.query, User), User.id, request.args)
+    except PaginationError as e:
+        return pagination_error(e)
+    users_list = serialized_rows(users)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'data': {
-            'users': users_list
+            'users': users_list,
+            'next_cursor': next_cursor
         },
         'message': 'Users retrieved successfully'
     }), 200
@@ -0,0 +1,274 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+import logging
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through app.config
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_REFRESH_SECONDS = 300
+
+DEFAULT_SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 50
+
+SUGGESTION_TYPES = ['guest', 'room']
+
+def guest_suggestion(guest):
+    return {
+        'type': 'guest',
+        'id': guest.id,
+        'label': guest.full_name,
+        'contact_number': guest.contact_number,
+        'room_id': guest.room_id,
+        'status': guest.status
+    }
+
+def room_suggestion(room):
+    return {
+        'type': 'room',
+        'id': room.id,
+        'label': room.room_number,
+        'capacity': room.capacity
+    }
+
+# Guests are found by any word of their name onwards ("smith" finds
+# "John Smith") and by contact number digits; rooms by room number
+def _guest_keys(suggestion):
+    name = ' '.join(suggestion['label'].lower().split())
+    keys = {name[match.start():] for match in re.finditer(r'\S+', name)}
+    digits = re.sub(r'\D', '', suggestion['contact_number'] or '')
+    if digits:
+        keys.add(digits)
+    return keys
+
+def _room_keys(suggestion):
+    return {suggestion['label'].lower()}
+
+KEY_BUILDERS = {
+    'guest': _guest_keys,
+    'room': _room_keys
+}
+
+def _approx_size(keys, suggestion):
+    size = sys.getsizeof(suggestion) + sum(sys.getsizeof(value) for value in suggestion.values())
+    # Each key costs its string plus a (key, id) tuple and a list slot
+    return size + sum(sys.getsizeof(key) + 64 + 8 for key in keys)
+
+# One generation of the index: a sorted array of (key, id) per type, searched
+# with bisect, plus the suggestion payloads. Not thread-safe on its own;
+# AutocompleteIndex only touches the current generation under its lock.
+class _IndexState:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.keys = {kind: [] for kind in SUGGESTION_TYPES}
+        self.items = {kind: {} for kind in SUGGESTION_TYPES}
+        self.item_keys = {kind: {} for kind in SUGGESTION_TYPES}
+        self.item_sizes = {kind: {} for kind in SUGGESTION_TYPES}
+        self.approx_bytes = 0
+        self.complete = True
+    
+    # keep_sorted=False appends without sorting, for bulk loads that call
+    # sort() once at the end
+    def add(self, suggestion, keep_sorted=True):
+        kind = suggestion['type']
+        item_id = suggestion['id']
+        self.remove(kind, item_id)
+        
+        keys = KEY_BUILDERS[kind](suggestion)
+        size = _approx_size(keys, suggestion)
+        if self.approx_bytes + size > self.max_bytes:
+            # Over the cap the index stops growing and reports itself incomplete
+            self.complete = False
+            return
+        
+        for key in keys:
+            if keep_sorted:
+                insort(self.keys[kind], (key, item_id))
+            else:
+                self.keys[kind].append((key, item_id))
+        self.items[kind][item_id] = suggestion
+        self.item_keys[kind][item_id] = keys
+        self.item_sizes[kind][item_id] = size
+        self.approx_bytes += size
+    
+    def sort(self):
+        for entries in self.keys.values():
+            entries.sort()
+    
+    def remove(self, kind, item_id):
+        keys = self.item_keys[kind].pop(item_id, None)
+        if keys is None:
+            return
+        
+        entries = self.keys[kind]
+        for key in keys:
+            position = bisect_left(entries, (key, item_id))
+            if position < len(entries) and entries[position] == (key, item_id):
+                del entries[position]
+        del self.items[kind][item_id]
+        self.approx_bytes -= self.item_sizes[kind].pop(item_id)
+    
+    def search(self, kind, prefix, limit):
+        entries = self.keys[kind]
+        results = []
+        seen = set()
+        
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(results) < limit:
+            key, item_id = entries[position]
+            if not key.startswith(prefix):
+                break
+            if item_id not in seen:
+                seen.add(item_id)
+                results.append(self.items[kind][item_id])
+            position += 1
+        
+        return results
+
+# In-process prefix index over guest names, contact numbers and room numbers.
+# Route handlers update it after each commit. Every worker process has its own
+# copy, so it is also rebuilt in the background every refresh_seconds to pick
+# up changes made through other workers.
+class AutocompleteIndex:
+    def __init__(self):
+        self.enabled = False
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.refresh_seconds = DEFAULT_REFRESH_SECONDS
+        self.built_at = None
+        self._state = None
+        self._lock = threading.RLock()
+        self._rebuilding = False
+        self._pending = []
+        self._app = None
+        self._refresh_requested_at = None
+    
+    @property
+    def ready(self):
+        return self.enabled and self._state is not None
+    
+    def configure(self, app):
+        self.enabled = True
+        self.max_bytes = app.config.get('AUTOCOMPLETE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        self.refresh_seconds = app.config.get('AUTOCOMPLETE_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+        self._app = app
+    
+    # Applies a change now and, during a rebuild, again once the new
+    # generation is swapped in, so it is not lost if the rebuild read older rows
+    def _apply(self, operation):
+        with self._lock:
+            if self._state is not None:
+                operation(self._state)
+            if self._rebuilding:
+                self._pending.append(operation)
+    
+    def index_guest(self, guest):
+        if self.enabled:
+            suggestion = guest_suggestion(guest)
+            self._apply(lambda state: state.add(suggestion))
+    
+    def remove_guest(self, guest_id):
+        if self.enabled:
+            self._apply(lambda state: state.remove('guest', guest_id))
+    
+    def index_room(self, room):
+        if self.enabled:
+            suggestion = room_suggestion(room)
+            self._apply(lambda state: state.add(suggestion))
+    
+    def remove_room(self, room_id):
+        if self.enabled:
+            self._apply(lambda state: state.remove('room', room_id))
+    
+    def rebuild(self):
+        from src.models.db import db
+        from src.models.guest import Guest
+        from src.models.room import Room
+        
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._pending = []
+        
+        try:
+            state = _IndexState(self.max_bytes)
+            with self._app.app_context():
+                for room in db.session.query(Room.id, Room.room_number, Room.capacity).yield_per(5000):
+                    state.add(room_suggestion(room), keep_sorted=False)
+                guests = db.session.query(Guest.id, Guest.full_name, Guest.contact_number, Guest.room_id, Guest.status)
+                for guest in guests.yield_per(5000):
+                    state.add(guest_suggestion(guest), keep_sorted=False)
+            state.sort()
+            
+            with self._lock:
+                for operation in self._pending:
+                    operation(state)
+                self._state = state
+                self.built_at = time.time()
+            
+            if not state.complete:
+                logger.warning('Autocomplete index reached its %d byte cap and is incomplete', self.max_bytes)
+        except Exception:
+            logger.exception('Autocomplete index rebuild failed')
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = []
+    
+    def start_rebuild(self):
+        self._refresh_requested_at = time.time()
+        threading.Thread(target=self.rebuild, name='autocomplete-rebuild', daemon=True).start()
+    
+    # Returns up to limit suggestions whose key starts with query, exact
+    # matches first, then shorter labels. The lookups hold the lock because
+    # _apply() edits the current generation in place.
+    def search(self, query, limit=DEFAULT_SUGGESTION_LIMIT, types=SUGGESTION_TYPES):
+        prefix = ' '.join(query.lower().split())
+        
+        results = []
+        with self._lock:
+            state = self._state
+            for kind in types:
+                results.extend(state.search(kind, prefix, limit))
+                # Contact numbers are indexed as bare digits
+                if kind == 'guest' and re.fullmatch(r'[\d\s\-()+]+', prefix):
+                    digits = re.sub(r'\D', '', prefix)
+                    if digits and digits != prefix:
+                        results.extend(item for item in state.search(kind, digits, limit) if item not in results)
+        
+        results.sort(key=lambda item: (item['label'].lower() != prefix, len(item['label'])))
+        
+        # Stale generations are replaced in the background; this request is
+        # still answered from the current one
+        last_refresh = max(self.built_at or 0, self._refresh_requested_at or 0)
+        if self.refresh_seconds and time.time() - last_refresh > self.refresh_seconds:
+            self.start_rebuild()
+        
+        return results[:limit]
+    
+    def stats(self):
+        with self._lock:
+            state = self._state
+            return {
+                'enabled': self.enabled,
+                'ready': self.ready,
+                'complete': state.complete if state else None,
+                'guests': len(state.items['guest']) if state else 0,
+                'rooms': len(state.items['room']) if state else 0,
+                'keys': sum(len(entries) for entries in state.keys.values()) if state else 0,
+                'approx_bytes': state.approx_bytes if state else 0,
+                'max_bytes': self.max_bytes,
+                'built_at': datetime.utcfromtimestamp(self.built_at).isoformat() if self.built_at else None
+            }
+
+autocomplete_index = AutocompleteIndex()
+
+# Enables the index for this process and warms it in a background thread, so
+# startup does not wait on the database
+def init_autocomplete(app):
+    autocomplete_index.configure(app)
+    autocomplete_index.start_rebuild()
@@ -0,0 +1,104 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func
+from src.models.db import db
+from src.models.payment import Payment
+from src.models.monthly_collection import MonthlyCollection
+from src.services.sql_helpers import conflict_aware_insert
+from src.services.response_cache import PAYMENTS
+from src.services.etags import bump_table_versions
+
+# Snapshot of the fields that decide how a payment contributes to the rollup.
+# Returns None when the payment does not count as collected.
+def collection_key(payment):
+    if payment is None or payment.status != 'paid' or not payment.payment_date:
+        return None
+    return (payment.payment_date.year, payment.payment_date.month, Decimal(str(payment.amount)))
+
+def _upsert_statement(year, month, delta):
+    now = datetime.utcnow()
+    values = {
+        'year': year,
+        'month': month,
+        'amount': delta,
+        'created_at': now,
+        'updated_at': now
+    }
+    statement = conflict_aware_insert(MonthlyCollection)
+    if statement is None:
+        return None
+    
+    statement = statement.values(**values)
+    return statement.on_conflict_do_update(
+        index_elements=['year', 'month'],
+        set_={
+            'amount': MonthlyCollection.__table__.c.amount + statement.excluded.amount,
+            'updated_at': now
+        }
+    )
+
+# Adds delta to the (year, month) bucket inside the caller's transaction
+def apply_delta(year, month, delta):
+    if not delta:
+        return
+    
+    statement = _upsert_statement(year, month, delta)
+    if statement is not None:
+        db.session.execute(statement)
+        return
+    
+    # Fallback for databases without an upsert: increment, then insert if missing
+    updated = MonthlyCollection.query.filter_by(year=year, month=month).update(
+        {MonthlyCollection.amount: MonthlyCollection.amount + delta},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(MonthlyCollection(year=year, month=month, amount=delta))
+
+# Moves a payment's contribution from its old key to its new key.
+# Call with the keys captured before and after the change, before committing.
+def record_payment_change(old_key, new_key):
+    if old_key == new_key:
+        return
+    if old_key:
+        year, month, amount = old_key
+        apply_delta(year, month, -amount)
+    if new_key:
+        year, month, amount = new_key
+        apply_delta(year, month, amount)
+
+# Recomputes the rollup from the payments table, for backfills and repairs.
+# Limits the rebuild to one year when given.
+def rebuild_monthly_collection(year=None):
+    payment_year = func.extract('year', Payment.payment_date)
+    payment_month = func.extract('month', Payment.payment_date)
+    
+    query = db.session.query(
+        payment_year.label('year'),
+        payment_month.label('month'),
+        func.sum(Payment.amount).label('amount')
+    ).filter(Payment.status == 'paid')
+    
+    delete_query = MonthlyCollection.query
+    if year is not None:
+        query = query.filter(payment_year == year)
+        delete_query = delete_query.filter(MonthlyCollection.year == year)
+    
+    totals = query.group_by(payment_year, payment_month).all()
+    
+    delete_query.delete(synchronize_session=False)
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(MonthlyCollection, [
+        {
+            'year': int(row.year),
+            'month': int(row.month),
+            'amount': row.amount,
+            'created_at': now,
+            'updated_at': now
+        }
+        for row in totals
+    ])
+    bump_table_versions(PAYMENTS)
+    db.session.commit()
+    
+    return len(totals)
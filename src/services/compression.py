@@ -0,0 +1,224 @@
+from flask import current_app, request, send_from_directory
+import logging
+import mimetypes
+import os
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through app.config
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_BROTLI_QUALITY = 5
+DEFAULT_GZIP_LEVEL = 6
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/csv',
+    'text/css',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+    'text/xml'
+}
+
+def _compressible(mimetype):
+    return mimetype in COMPRESSIBLE_MIMETYPES
+
+# Encodings this process can produce, in order of preference
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+# The best encoding the client accepts, or None for an identity response
+def negotiate_encoding():
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None or request.accept_encodings[encoding] <= 0:
+        return None
+    return encoding
+
+# A compressed representation is a different entity, so its ETag carries
+# the encoding. Returns the ETags a client may hold for one identity ETag.
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}'
+
+def etag_variants(etag):
+    return [etag] + [encoded_etag(etag, encoding) for encoding in ['br', 'gzip']]
+
+# Incremental compressors with one interface: compress() buffers, flush()
+# emits everything so far so a streamed chunk reaches the client, finish()
+# ends the stream
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data):
+        return self._compressor.process(data)
+    
+    def flush(self):
+        return self._compressor.flush()
+    
+    def finish(self):
+        return self._compressor.finish()
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def compress(self, data):
+        return self._compressor.compress(data)
+    
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self):
+        return self._compressor.flush()
+
+def _compressor(encoding, brotli_quality, gzip_level):
+    if encoding == 'br':
+        return _BrotliStream(brotli_quality)
+    return _GzipStream(gzip_level)
+
+def compress_bytes(data, encoding, brotli_quality, gzip_level):
+    stream = _compressor(encoding, brotli_quality, gzip_level)
+    return stream.compress(data) + stream.finish()
+
+def _compress_stream(chunks, stream):
+    for chunk in chunks:
+        data = stream.compress(chunk) + stream.flush()
+        if data:
+            yield data
+    yield stream.finish()
+
+# after_request hook compressing JSON, CSV, HTML and other text responses for
+# clients that accept Brotli or gzip. Buffered bodies below the size
+# threshold are left alone; streamed bodies, such as CSV exports, and files
+# from send_file(), such as report job downloads, are compressed chunk by
+# chunk as they are generated or read, so they are never held in memory.
+def compress_response(response):
+    config = current_app.config
+    if (not _compressible(response.mimetype)
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    
+    brotli_quality = config.get('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+    gzip_level = config.get('COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL)
+    min_size = config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+    
+    if response.direct_passthrough:
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+        # The file is read block by block below; closing the response still
+        # closes the file
+        response.direct_passthrough = False
+        if hasattr(response.response, 'close'):
+            response.call_on_close(response.response.close)
+    
+    if response.is_streamed:
+        stream = _compressor(encoding, brotli_quality, gzip_level)
+        response.response = _compress_stream(response.iter_encoded(), stream)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress_bytes(data, encoding, brotli_quality, gzip_level))
+    
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+class _StaticAsset:
+    def __init__(self, mtime, etag, variants):
+        self.mtime = mtime
+        self.etag = etag
+        self.variants = variants
+
+# Static files compressed once at the highest levels and kept in memory,
+# keyed by path relative to the static folder. A file that changed on disk
+# since it was compressed is served by send_from_directory() again.
+class StaticAssetCache:
+    def __init__(self):
+        self._assets = {}
+        self._lock = threading.Lock()
+    
+    def warm(self, folder, min_size):
+        for directory, _, files in os.walk(folder):
+            for name in files:
+                full_path = os.path.join(directory, name)
+                mimetype = mimetypes.guess_type(name)[0]
+                stat = os.stat(full_path)
+                if not _compressible(mimetype) or stat.st_size < min_size:
+                    continue
+                
+                with open(full_path, 'rb') as asset_file:
+                    data = asset_file.read()
+                variants = {
+                    encoding: compress_bytes(data, encoding, 11, 9)
+                    for encoding in available_encodings()
+                }
+                etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+                with self._lock:
+                    self._assets[os.path.relpath(full_path, folder)] = _StaticAsset(stat.st_mtime, etag, variants)
+    
+    def response(self, folder, path):
+        asset = self._assets.get(os.path.normpath(path))
+        if asset is None:
+            return None
+        
+        encoding = negotiate_encoding()
+        full_path = os.path.join(folder, path)
+        if encoding is None or not os.path.exists(full_path) or os.path.getmtime(full_path) != asset.mtime:
+            return None
+        
+        response = current_app.response_class(asset.variants[encoding], mimetype=mimetypes.guess_type(path)[0])
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(encoded_etag(asset.etag, encoding))
+        response.last_modified = asset.mtime
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'assets': len(self._assets),
+                'bytes': sum(len(data) for asset in self._assets.values() for data in asset.variants.values())
+            }
+
+static_asset_cache = StaticAssetCache()
+
+# Serves a static file, precompressed when the client accepts it
+def static_file_response(folder, path):
+    response = static_asset_cache.response(folder, path)
+    if response is not None:
+        return response
+    return send_from_directory(folder, path)
+
+def _warm_static(app):
+    try:
+        static_asset_cache.warm(app.static_folder, app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE))
+    except Exception:
+        logger.exception('Precompressing static assets failed')
+
+# Compresses responses and precompresses the static folder in the background,
+# so startup does not wait on Brotli's highest level
+def init_compression(app):
+    app.after_request(compress_response)
+    if app.static_folder and os.path.isdir(app.static_folder):
+        threading.Thread(target=_warm_static, args=(app,), name='static-precompress', daemon=True).start()
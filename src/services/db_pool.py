@@ -0,0 +1,171 @@
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+import os
+import threading
+import time
+
+# Defaults, overridable through app.config or the environment
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 20
+DEFAULT_POOL_TIMEOUT = 30
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_POOL_PRE_PING = True
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+DEFAULT_APPLICATION_NAME = 'pgbuddy'
+DEFAULT_REPLICA_CONNECT_TIMEOUT = 2
+
+# Checkouts kept for the latency percentiles
+LATENCY_WINDOW = 1000
+
+def _setting(config, name, default=None):
+    return config.get(name, os.getenv(name, default))
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return bool(value)
+
+def database_uri(config):
+    uri = _setting(config, 'DATABASE_URL')
+    if uri:
+        return uri
+    return f"postgresql://{os.getenv('DB_USERNAME', 'postgres')}:{os.getenv('DB_PASSWORD', 'postgres')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'pg_management')}"
+
+# Optional read replica for read-only endpoints (src/services/read_replica.py).
+# Postgres replicas get a connect_timeout of REPLICA_CONNECT_TIMEOUT seconds,
+# so an unreachable replica fails its lag check quickly instead of hanging.
+def replica_database_uri(config):
+    uri = _setting(config, 'DATABASE_REPLICA_URL')
+    if not uri:
+        return None
+    url = make_url(uri)
+    if url.get_backend_name() != 'postgresql' or 'connect_timeout' in url.query:
+        return uri
+    timeout = int(_setting(config, 'REPLICA_CONNECT_TIMEOUT', DEFAULT_REPLICA_CONNECT_TIMEOUT))
+    return str(url.update_query_dict({'connect_timeout': str(timeout)}))
+
+# Engine options for SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_SIZE,
+# DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+# DB_STATEMENT_TIMEOUT_MS and DB_APPLICATION_NAME. Pre-ping replaces
+# connections the server dropped (after a Postgres restart, say) at checkout
+# instead of failing the request. SQLite keeps SQLAlchemy's default pool.
+def engine_options(config, uri):
+    url = make_url(uri)
+    options = {'pool_pre_ping': _flag(_setting(config, 'DB_POOL_PRE_PING', DEFAULT_POOL_PRE_PING))}
+    if url.get_backend_name() == 'sqlite':
+        return options
+    
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(_setting(config, 'DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+        'max_overflow': int(_setting(config, 'DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW)),
+        'pool_timeout': float(_setting(config, 'DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+        'pool_recycle': int(_setting(config, 'DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE))
+    })
+    if url.get_backend_name() == 'postgresql':
+        # Server-side limit per statement, and a name that shows up in
+        # pg_stat_activity next to each connection
+        statement_timeout = int(_setting(config, 'DB_STATEMENT_TIMEOUT_MS', DEFAULT_STATEMENT_TIMEOUT_MS))
+        options['connect_args'] = {
+            'options': f'-c statement_timeout={statement_timeout}',
+            'application_name': _setting(config, 'DB_APPLICATION_NAME', DEFAULT_APPLICATION_NAME)
+        }
+    return options
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+# Checkout latency and saturation across every pool in the process. Lives
+# outside the pool because SQLAlchemy recreates pools, after a disconnect
+# for one, and the counts should carry over.
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.saturated_checkouts = 0
+            self.peak_in_use = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self._recent = deque(maxlen=LATENCY_WINDOW)
+    
+    def record_checkout(self, wait_ms, saturated, in_use):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._recent.append(wait_ms)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            if saturated:
+                self.saturated_checkouts += 1
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def stats(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'saturated_checkouts': self.saturated_checkouts,
+                'peak_in_use': self.peak_in_use,
+                'wait_ms': {
+                    'avg': round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else None,
+                    'p50': _percentile(recent, 0.5),
+                    'p95': _percentile(recent, 0.95),
+                    'p99': _percentile(recent, 0.99),
+                    'max': round(self.max_wait_ms, 3)
+                }
+            }
+
+pool_metrics = PoolMetrics()
+
+# Connections a QueuePool hands out at most; None when overflow is unlimited
+def _capacity(pool):
+    if pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+# QueuePool timing each checkout, including any wait for a free connection,
+# connecting and the pre-ping. A checkout is saturated when every connection,
+# overflow included, was already in use as it started.
+class InstrumentedQueuePool(QueuePool):
+    def connect(self):
+        capacity = _capacity(self)
+        saturated = capacity is not None and self.checkedout() >= capacity
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout((time.perf_counter() - started) * 1000, saturated, self.checkedout())
+        return connection
+
+# Current pool occupancy plus the process-wide checkout metrics
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        in_use = pool.checkedout()
+        capacity = _capacity(pool)
+        stats.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'idle': pool.checkedin(),
+            'in_use': in_use,
+            'overflow': max(pool.overflow(), 0),
+            'saturation': round(in_use / capacity, 3) if capacity else None
+        })
+    stats.update(pool_metrics.stats())
+    return stats
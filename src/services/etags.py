@@ -0,0 +1,79 @@
+from datetime import date
+from functools import wraps
+from flask import g, request, Response
+from src.models.db import db
+from src.models.table_version import TableVersion
+from src.services.sql_helpers import conflict_aware_insert
+from src.services.compression import etag_variants
+import hashlib
+
+# Adds one to the change version of each table inside the caller's
+# transaction. Call before committing any write to a versioned table.
+def bump_table_versions(*tables):
+    for table_name in tables:
+        statement = conflict_aware_insert(TableVersion)
+        if statement is not None:
+            statement = statement.values(table_name=table_name, version=1)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['table_name'],
+                set_={'version': TableVersion.__table__.c.version + 1}
+            ))
+            continue
+        
+        # Fallback for databases without an upsert
+        updated = TableVersion.query.filter_by(table_name=table_name).update(
+            {TableVersion.version: TableVersion.version + 1},
+            synchronize_session=False
+        )
+        if not updated:
+            db.session.add(TableVersion(table_name=table_name, version=1))
+
+# Current versions of the tables, in order, from one primary key lookup
+def table_versions(tables):
+    versions = dict(db.session.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(tables)
+    ))
+    return [versions.get(table_name, 0) for table_name in tables]
+
+# table_versions() read once per request, so the ETag and the response cache
+# key of one request describe the same snapshot
+def request_table_versions(tables):
+    snapshot = g.setdefault('table_versions', {})
+    key = tuple(tables)
+    if key not in snapshot:
+        snapshot[key] = table_versions(tables)
+    return snapshot[key]
+
+def _etag(tables):
+    args = sorted(request.args.items(multi=True))
+    # Date-relative listings (due, overdue, due this week) change at midnight
+    raw = repr((request.path, date.today().isoformat(), request_table_versions(tables), args))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+# Decorator for GET handlers whose response only depends on the given tables
+# and the query string. The ETag is derived from the tables' change versions
+# before the handler runs, so a matching If-None-Match is answered with 304
+# without querying or serializing anything. Apply it below the auth decorator.
+def conditional_get(tables):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = _etag(tables)
+            
+            # Clients hold the compressed variant's ETag when the body was compressed
+            matched = next((tag for tag in etag_variants(etag) if request.if_none_match.contains_weak(tag)), None)
+            if matched:
+                response = Response(status=304)
+                response.set_etag(matched)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+            
+            result = view(*args, **kwargs)
+            response, status = result if isinstance(result, tuple) else (result, None)
+            if (status or response.status_code) == 200:
+                response.set_etag(etag)
+                # Clients may keep the body but must revalidate before reuse
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return result
+        return wrapper
+    return decorator
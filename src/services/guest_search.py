@@ -0,0 +1,100 @@
+from sqlalchemy import case, func, literal, or_, text
+from src.models.db import db
+from src.models.guest import Guest
+import re
+import threading
+
+# Result bounds for /guests/search
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+# Queries made only of digits and phone punctuation search contact numbers
+PHONE_QUERY = re.compile(r'^\+?[\d\s\-()]+$')
+
+_trigram_support = {}
+_trigram_lock = threading.Lock()
+
+# Whether the database has pg_trgm, checked once per engine. Migration 0004
+# installs it with the trigram index when the database user is allowed to.
+def trigram_available():
+    engine = db.engine
+    if engine.dialect.name != 'postgresql':
+        return False
+    
+    key = str(engine.url)
+    with _trigram_lock:
+        if key not in _trigram_support:
+            _trigram_support[key] = db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first() is not None
+        return _trigram_support[key]
+
+def search_limit(value):
+    if value is None or value == '':
+        return DEFAULT_SEARCH_LIMIT
+    
+    return max(1, min(int(value), MAX_SEARCH_LIMIT))
+
+# Contact numbers match by prefix, which the text_pattern_ops index serves;
+# the closest (shortest) numbers rank first
+def _phone_search(query, limit):
+    prefix = re.sub(r'[\s\-()]', '', query)
+    
+    return Guest.query.filter(
+        Guest.contact_number.startswith(prefix, autoescape=True)
+    ).order_by(
+        func.length(Guest.contact_number),
+        Guest.contact_number,
+        Guest.id
+    ).limit(limit).all()
+
+# Names match through the trigram index with typo tolerance: word_similarity
+# scores the query against the closest run of words in the name, so
+# "jon smth" still finds "John Smith". Prefix matches rank first.
+def _trigram_name_search(query, limit):
+    name = func.lower(Guest.full_name)
+    term = query.lower()
+    score = func.word_similarity(term, name)
+    
+    return Guest.query.filter(
+        or_(
+            literal(term).op('<%')(name),
+            name.startswith(term, autoescape=True)
+        )
+    ).order_by(
+        case((name.startswith(term, autoescape=True), 0), else_=1),
+        score.desc(),
+        Guest.id
+    ).limit(limit).all()
+
+# Fallback without pg_trgm: substring match ranked exact, then prefix, then
+# word prefix, then anywhere. No typo tolerance, but still bounded and ranked.
+def _basic_name_search(query, limit):
+    name = func.lower(Guest.full_name)
+    term = query.lower()
+    
+    return Guest.query.filter(
+        name.contains(term, autoescape=True)
+    ).order_by(
+        case(
+            (name == term, 0),
+            (name.startswith(term, autoescape=True), 1),
+            (name.contains(' ' + term, autoescape=True), 2),
+            else_=3
+        ),
+        func.length(Guest.full_name),
+        Guest.id
+    ).limit(limit).all()
+
+# Runs a ranked, bounded guest search. Returns (guests, mode) where mode is
+# 'phone', 'trigram' or 'basic'.
+def find_guests(query, limit=DEFAULT_SEARCH_LIMIT):
+    query = query.strip()
+    
+    if PHONE_QUERY.match(query) and any(char.isdigit() for char in query):
+        return _phone_search(query, limit), 'phone'
+    
+    if trigram_available():
+        return _trigram_name_search(query, limit), 'trigram'
+    
+    return _basic_name_search(query, limit), 'basic'
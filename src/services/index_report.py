@@ -0,0 +1,167 @@
+from datetime import date, datetime
+from sqlalchemy import inspect, select, text, or_
+from sqlalchemy.exc import DBAPIError
+from src.models.db import db
+import src.models.user
+from src.models.guest import Guest
+from src.models.payment import Payment
+from src.models.notification import Notification
+from src.models.room_history import RoomHistory
+import json
+
+# Representative shapes of the hot queries, keyed by the code that runs them.
+# Their plans are checked for sequential scans over large tables.
+def hot_queries():
+    today = date.today()
+    
+    return {
+        'payments due / overdue': select(Payment.id).where(
+            Payment.status.in_(['unpaid', 'partial']),
+            Payment.due_date < today
+        ).order_by(Payment.id).limit(101),
+        'payments by guest': select(Payment.id).where(Payment.guest_id == 1).order_by(Payment.id).limit(101),
+        'payments by status': select(Payment.id).where(Payment.status == 'paid').order_by(Payment.id).limit(101),
+        'payments report by due date': select(Payment.id).where(
+            Payment.due_date >= date(today.year, 1, 1),
+            Payment.due_date <= today
+        ),
+        'rent report by payment date': select(Payment.id).where(
+            Payment.payment_date >= date(today.year, 1, 1),
+            Payment.payment_date <= today
+        ),
+        'active guests in room': select(Guest.id).where(Guest.room_id == 1, Guest.status == 'active'),
+        'guests by status': select(Guest.id).where(Guest.status == 'active').order_by(Guest.id).limit(101),
+        'notifications by guest': select(Notification.id).where(Notification.guest_id == 1).order_by(Notification.id).limit(101),
+        'notification dispatcher claim': select(Notification.id).where(
+            Notification.status == 'pending',
+            or_(Notification.next_attempt_at == None, Notification.next_attempt_at <= datetime.utcnow())
+        ).order_by(Notification.id).limit(100),
+        'open room stay': select(RoomHistory.id).where(
+            RoomHistory.guest_id == 1,
+            RoomHistory.room_id == 1,
+            RoomHistory.end_date == None
+        ),
+        'occupancy report stays on date': select(RoomHistory.room_id, RoomHistory.guest_id).where(
+            RoomHistory.start_date <= today,
+            or_(RoomHistory.end_date == None, RoomHistory.end_date > today)
+        )
+    }
+
+def _explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    
+    if connection.dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + compiled.string, params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+    
+    return [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, params)]
+
+# Tables a plan reads with a full sequential scan
+def _sequential_scans(dialect, plan):
+    if dialect == 'postgresql':
+        scans = []
+        nodes = [plan]
+        while nodes:
+            node = nodes.pop()
+            if node.get('Node Type') == 'Seq Scan':
+                scans.append(node['Relation Name'])
+            nodes.extend(node.get('Plans', []))
+        return scans
+    
+    # SQLite reports "SCAN <table>" for a full scan and "SEARCH" or
+    # "SCAN <table> USING ... INDEX" when an index is used
+    return [detail.split()[1] for detail in plan if detail.startswith('SCAN ') and 'INDEX' not in detail]
+
+def _table_rows(connection, table_name):
+    if connection.dialect.name == 'postgresql':
+        # Planner estimate; avoids counting large tables
+        rows = connection.execute(
+            text('SELECT reltuples FROM pg_class WHERE relname = :name'),
+            {'name': table_name}
+        ).scalar()
+        return max(int(rows or 0), 0)
+    
+    return connection.execute(text(f'SELECT count(*) FROM {table_name}')).scalar()
+
+def _declared_indexes():
+    declared = {}
+    for table in db.metadata.tables.values():
+        for index in table.indexes:
+            declared[index.name] = table.name
+        for constraint in table.constraints:
+            if isinstance(constraint, db.UniqueConstraint) and constraint.name:
+                declared[constraint.name] = table.name
+    return declared
+
+# Indexes the models declare that the database does not have, usually
+# because migrations have not been applied
+def missing_indexes(connection):
+    inspector = inspect(connection)
+    existing = set()
+    for table_name in inspector.get_table_names():
+        existing.update(index['name'] for index in inspector.get_indexes(table_name))
+        existing.update(constraint['name'] for constraint in inspector.get_unique_constraints(table_name))
+    
+    return [
+        {'index': name, 'table': table_name}
+        for name, table_name in sorted(_declared_indexes().items())
+        if name not in existing
+    ]
+
+# Non-unique indexes PostgreSQL has never used since statistics were last
+# reset. Other databases do not track index usage, so this is empty for them.
+def unused_indexes(connection):
+    if connection.dialect.name != 'postgresql':
+        return []
+    
+    rows = connection.execute(text(
+        'SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid) '
+        'FROM pg_stat_user_indexes s JOIN pg_index i ON i.indexrelid = s.indexrelid '
+        'WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary '
+        'ORDER BY pg_relation_size(s.indexrelid) DESC'
+    ))
+    
+    return [
+        {'table': table_name, 'index': index_name, 'scans': scans, 'size_bytes': size}
+        for table_name, index_name, scans, size in rows
+    ]
+
+# Runs EXPLAIN on every hot query and flags sequential scans over tables with
+# at least min_rows rows. Small tables are scanned whatever the indexes, so
+# run this against production-sized data.
+def plan_report(connection, min_rows=1000):
+    dialect = connection.dialect.name
+    report = []
+    
+    for name, statement in hot_queries().items():
+        try:
+            plan = _explain(connection, statement)
+        except DBAPIError as e:
+            # Usually a schema that is behind the models; apply migrations first
+            report.append({'query': name, 'sequential_scans': [], 'flagged': True, 'error': str(e.orig)})
+            continue
+        
+        scans = [
+            {'table': table_name, 'rows': _table_rows(connection, table_name)}
+            for table_name in _sequential_scans(dialect, plan)
+        ]
+        report.append({
+            'query': name,
+            'sequential_scans': scans,
+            'flagged': any(scan['rows'] >= min_rows for scan in scans)
+        })
+    
+    return report
+
+def build_index_report(connection, min_rows=1000):
+    return {
+        'dialect': connection.dialect.name,
+        'missing_indexes': missing_indexes(connection),
+        'unused_indexes': unused_indexes(connection),
+        'plans': plan_report(connection, min_rows)
+    }
@@ -0,0 +1,155 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from src.models.db import db
+import importlib
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = 'src.migrations'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+# Key of the PostgreSQL advisory lock that keeps app workers starting together
+# from running the same migrations twice
+ADVISORY_LOCK_KEY = 7203114
+
+# A schema migration: a src/migrations/NNNN_name.py module that defines
+# DESCRIPTION and upgrade(connection). Modules set TRANSACTIONAL = False to run
+# outside a transaction, which CREATE INDEX CONCURRENTLY needs.
+#
+# Upgrades must be idempotent. A fresh database gets the current models from
+# the baseline migration, so later migrations find their changes in place.
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.description = getattr(module, 'DESCRIPTION', name)
+        self.transactional = getattr(module, 'TRANSACTIONAL', True)
+
+def discover_migrations():
+    migrations = []
+    for file_name in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r'^(\d{4})_(\w+)\.py$', file_name)
+        if not match:
+            continue
+        module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{file_name[:-3]}')
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    
+    return migrations
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, '
+        'name VARCHAR(255) NOT NULL, '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+
+def applied_versions(connection):
+    return {row[0] for row in connection.execute(text('SELECT version FROM schema_migrations'))}
+
+def _record(connection, migration):
+    connection.execute(
+        text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)'),
+        {'version': migration.version, 'name': migration.name, 'applied_at': datetime.utcnow()}
+    )
+
+# Returns (migration, applied) for every known migration, in version order
+def migration_status(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        applied = applied_versions(connection)
+    
+    return [(migration, migration.version in applied) for migration in discover_migrations()]
+
+# Applies pending migrations up to target (all when None), each in its own
+# transaction unless it opts out. Returns the versions that were applied.
+def run_migrations(engine=None, target=None):
+    engine = engine or db.engine
+    is_postgresql = engine.dialect.name == 'postgresql'
+    applied_now = []
+    
+    with engine.connect() as lock_connection:
+        if is_postgresql:
+            lock_connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+        
+        try:
+            with engine.begin() as connection:
+                _ensure_version_table(connection)
+                applied = applied_versions(connection)
+            
+            for migration in discover_migrations():
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                
+                logger.info('Applying migration %04d %s', migration.version, migration.name)
+                if migration.transactional:
+                    with engine.begin() as connection:
+                        migration.module.upgrade(connection)
+                        _record(connection, migration)
+                else:
+                    with engine.connect() as connection:
+                        migration.module.upgrade(connection.execution_options(isolation_level='AUTOCOMMIT'))
+                    with engine.begin() as connection:
+                        _record(connection, migration)
+                
+                applied_now.append(migration.version)
+        finally:
+            if is_postgresql:
+                lock_connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+    
+    return applied_now
+
+# Helpers for writing idempotent migrations
+
+def has_column(connection, table_name, column_name):
+    return any(column['name'] == column_name for column in inspect(connection).get_columns(table_name))
+
+def has_extension(connection, extension_name):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(
+        text('SELECT 1 FROM pg_extension WHERE extname = :name'),
+        {'name': extension_name}
+    ).first() is not None
+
+def add_column(connection, table_name, column_name, definition):
+    if not has_column(connection, table_name, column_name):
+        connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}'))
+
+def drop_column(connection, table_name, column_name):
+    if has_column(connection, table_name, column_name):
+        connection.execute(text(f'ALTER TABLE {table_name} DROP COLUMN {column_name}'))
+
+# Creates an index unless one with that name exists. where makes it a partial
+# index, using picks the index method (e.g. 'gin'); concurrently builds it
+# without blocking writes on PostgreSQL and needs a non-transactional migration.
+def create_index(connection, name, table_name, columns, where=None, unique=False, concurrently=False, using=None):
+    concurrently = concurrently and connection.dialect.name == 'postgresql'
+    
+    if concurrently:
+        # An interrupted concurrent build leaves an invalid index behind that
+        # IF NOT EXISTS would otherwise skip
+        invalid = connection.execute(text(
+            'SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid '
+            'WHERE c.relname = :name AND NOT i.indisvalid'
+        ), {'name': name}).first()
+        if invalid:
+            connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+    
+    statement = 'CREATE {}INDEX {}IF NOT EXISTS {} ON {} {}({})'.format(
+        'UNIQUE ' if unique else '',
+        'CONCURRENTLY ' if concurrently else '',
+        name,
+        table_name,
+        f'USING {using} ' if using else '',
+        ', '.join(columns)
+    )
+    if where:
+        statement += f' WHERE {where}'
+    
+    connection.execute(text(statement))
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from src.models.db import db
+from src.models.notification import Notification
+from src.models.guest import Guest
+from src.services.notification_providers import Delivery, PermanentDeliveryError, get_provider
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Delivers notifications queued in the notifications table (the outbox).
+# Rows are written as 'pending' in the request transaction; this dispatcher
+# claims them in batches, sends them through the per-channel providers and
+# records the outcome with one UPDATE per batch.
+class NotificationDispatcher:
+    def __init__(self, concurrency=4, batch_size=100, max_attempts=5,
+                 retry_base_seconds=30, retry_max_seconds=3600, lease_seconds=300, providers=None):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self.providers = providers or {}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='notification')
+    
+    # Providers are built up front in the calling thread, which has the app context
+    def _load_providers(self, channels):
+        for channel in channels:
+            if channel not in self.providers:
+                try:
+                    self.providers[channel] = get_provider(channel)
+                except ValueError as e:
+                    logger.error('No provider for %s notifications: %s', channel, e)
+    
+    def retry_delay(self, attempts):
+        return min(self.retry_base_seconds * (2 ** (attempts - 1)), self.retry_max_seconds)
+    
+    # Locks a batch of due rows and leases them to this worker by pushing
+    # next_attempt_at forward, so other dispatchers skip them until the lease ends
+    def claim_batch(self):
+        now = datetime.utcnow()
+        
+        query = db.session.query(
+            Notification.id,
+            Notification.type,
+            Notification.message,
+            Notification.attempts,
+            Guest.contact_number,
+            Guest.email
+        ).join(
+            Guest, Guest.id == Notification.guest_id
+        ).filter(
+            Notification.status == 'pending',
+            or_(Notification.next_attempt_at == None, Notification.next_attempt_at <= now)
+        ).order_by(Notification.id).limit(self.batch_size)
+        
+        if db.engine.dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True, of=Notification)
+        
+        rows = query.all()
+        if not rows:
+            db.session.commit()
+            return []
+        
+        Notification.query.filter(Notification.id.in_([row.id for row in rows])).update(
+            {Notification.next_attempt_at: now + timedelta(seconds=self.lease_seconds)},
+            synchronize_session=False
+        )
+        db.session.commit()
+        
+        return rows
+    
+    def _deliver(self, row):
+        delivery = Delivery(row.id, row.type, row.message, contact_number=row.contact_number, email=row.email)
+        provider = self.providers.get(row.type)
+        if provider is None:
+            return row, f'No provider configured for {row.type} notifications', True
+        
+        try:
+            provider.send(delivery)
+            return row, None, False
+        except PermanentDeliveryError as e:
+            return row, str(e), True
+        except Exception as e:
+            return row, str(e) or e.__class__.__name__, False
+    
+    # Claims and sends one batch. Returns the number of notifications processed.
+    def dispatch_batch(self):
+        rows = self.claim_batch()
+        if not rows:
+            return 0
+        
+        self._load_providers({row.type for row in rows})
+        results = list(self._executor.map(self._deliver, rows))
+        now = datetime.utcnow()
+        
+        sent_ids = [row.id for row, error, permanent in results if error is None]
+        failures = []
+        
+        for row, error, permanent in results:
+            if error is None:
+                continue
+            
+            attempts = row.attempts + 1
+            if permanent or attempts >= self.max_attempts:
+                failures.append({'id': row.id, 'attempts': attempts, 'status': 'failed', 'last_error': error, 'next_attempt_at': None})
+            else:
+                failures.append({
+                    'id': row.id,
+                    'attempts': attempts,
+                    'status': 'pending',
+                    'last_error': error,
+                    'next_attempt_at': now + timedelta(seconds=self.retry_delay(attempts))
+                })
+        
+        if sent_ids:
+            Notification.query.filter(Notification.id.in_(sent_ids)).update({
+                Notification.status: 'sent',
+                Notification.sent_at: now,
+                Notification.attempts: Notification.attempts + 1,
+                Notification.last_error: None,
+                Notification.next_attempt_at: None,
+                Notification.updated_at: now
+            }, synchronize_session=False)
+        
+        if failures:
+            for failure in failures:
+                failure['updated_at'] = now
+            db.session.bulk_update_mappings(Notification, failures)
+        
+        db.session.commit()
+        
+        logger.info('Dispatched %d notifications: %d sent, %d failed', len(results), len(sent_ids), len(failures))
+        return len(results)
+    
+    # Drains the outbox until it is empty (once=True) or forever, sleeping
+    # poll_interval seconds whenever there is nothing due
+    def run(self, poll_interval=5, once=False):
+        while True:
+            processed = self.dispatch_batch()
+            if processed:
+                continue
+            if once:
+                return
+            time.sleep(poll_interval)
+    
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,124 @@
+from flask import current_app
+import os
+import random
+import threading
+
+# Raised for failures that retrying cannot fix, such as a missing recipient
+class PermanentDeliveryError(Exception):
+    pass
+
+# What the dispatcher hands to a provider: the outbox row plus the recipient details
+class Delivery:
+    def __init__(self, notification_id, channel, message, contact_number=None, email=None):
+        self.notification_id = notification_id
+        self.channel = channel
+        self.message = message
+        self.contact_number = contact_number
+        self.email = email
+
+# Base class for per-channel delivery adapters. send() returns on success and
+# raises on failure; PermanentDeliveryError skips the remaining retries.
+class NotificationProvider:
+    def send(self, delivery):
+        raise NotImplementedError
+
+# Offline provider that records deliveries in memory, for local runs and tests.
+# failure_rate makes a share of sends fail so retries can be exercised.
+class FakeProvider(NotificationProvider):
+    def __init__(self, failure_rate=0.0):
+        self.failure_rate = failure_rate
+        self.sent = []
+        self._lock = threading.Lock()
+    
+    def send(self, delivery):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError('Simulated delivery failure')
+        with self._lock:
+            self.sent.append(delivery)
+
+class TwilioSmsProvider(NotificationProvider):
+    def __init__(self, account_sid, auth_token, from_number, timeout=10):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.timeout = timeout
+    
+    def send(self, delivery):
+        import requests
+        
+        if not delivery.contact_number:
+            raise PermanentDeliveryError('Guest has no contact number')
+        
+        response = requests.post(
+            f'https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json',
+            data={
+                'Body': delivery.message,
+                'From': self.from_number,
+                'To': delivery.contact_number
+            },
+            auth=(self.account_sid, self.auth_token),
+            timeout=self.timeout
+        )
+        
+        # Client errors (bad number, unsubscribed recipient) will not succeed on retry
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise PermanentDeliveryError(f'Twilio rejected the message: {response.status_code} {response.text[:200]}')
+        response.raise_for_status()
+
+class SendGridEmailProvider(NotificationProvider):
+    def __init__(self, api_key, from_email, subject='PG Management Notification', timeout=10):
+        self.api_key = api_key
+        self.from_email = from_email
+        self.subject = subject
+        self.timeout = timeout
+    
+    def send(self, delivery):
+        import requests
+        
+        if not delivery.email:
+            raise PermanentDeliveryError('Guest has no email address')
+        
+        response = requests.post(
+            'https://api.sendgrid.com/v3/mail/send',
+            json={
+                'personalizations': [{'to': [{'email': delivery.email}]}],
+                'from': {'email': self.from_email},
+                'subject': self.subject,
+                'content': [{'type': 'text/plain', 'value': delivery.message}]
+            },
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            timeout=self.timeout
+        )
+        
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise PermanentDeliveryError(f'SendGrid rejected the message: {response.status_code} {response.text[:200]}')
+        response.raise_for_status()
+
+def _setting(name, default=None):
+    return current_app.config.get(name, os.getenv(name, default))
+
+# Builds the provider configured for a channel ('sms' or 'email').
+# NOTIFICATION_SMS_PROVIDER / NOTIFICATION_EMAIL_PROVIDER select the adapter.
+def get_provider(channel):
+    if channel == 'sms':
+        name = _setting('NOTIFICATION_SMS_PROVIDER', 'fake')
+        if name == 'twilio':
+            return TwilioSmsProvider(
+                _setting('TWILIO_ACCOUNT_SID'),
+                _setting('TWILIO_AUTH_TOKEN'),
+                _setting('TWILIO_FROM_NUMBER')
+            )
+    elif channel == 'email':
+        name = _setting('NOTIFICATION_EMAIL_PROVIDER', 'fake')
+        if name == 'sendgrid':
+            return SendGridEmailProvider(
+                _setting('SENDGRID_API_KEY'),
+                _setting('SENDGRID_FROM_EMAIL', 'noreply@pgmanagement.com')
+            )
+    else:
+        raise ValueError(f'Unknown notification channel: {channel}')
+    
+    if name != 'fake':
+        raise ValueError(f'Unknown {channel} provider: {name}')
+    
+    return FakeProvider(float(_setting('NOTIFICATION_FAKE_FAILURE_RATE', 0)))
@@ -0,0 +1,118 @@
+from sqlalchemy import case, func, select
+from sqlalchemy.orm.util import identity_key
+from src.models.db import db
+from src.models.room import Room
+from src.models.guest import Guest
+from src.models.room_history import RoomHistory
+from src.services.response_cache import ROOMS
+from src.services.etags import bump_table_versions
+
+# Raised when a room has no free place left for a guest being moved into it
+class RoomFullError(Exception):
+    def __init__(self, room_id):
+        super().__init__(f'Room {room_id} is at full capacity')
+        self.room_id = room_id
+
+# The room a guest counts as an occupant of, or None when they do not count
+def occupancy_key(guest):
+    if guest is None or guest.status != 'active':
+        return None
+    return guest.room_id
+
+# Adds delta to a room's occupant counter inside the caller's transaction. A
+# single UPDATE keeps concurrent check-ins and check-outs from losing updates,
+# and sets the room occupied or available from the new count.
+#
+# Increments only apply while the room has capacity. The UPDATE locks the room
+# row until the transaction ends, so concurrent check-ins to one room queue up
+# and each re-checks capacity against the committed count; the losers get
+# RoomFullError instead of overfilling the room.
+def adjust_occupants(room_id, delta):
+    count = Room.active_occupants + delta
+    query = Room.query.filter(Room.id == room_id)
+    if delta > 0:
+        query = query.filter(count <= Room.capacity)
+    
+    updated = query.update({
+        Room.active_occupants: count,
+        Room.status: case((count > 0, 'occupied'), else_='available')
+    }, synchronize_session=False)
+    
+    # Reload the room on next access if this session already has it
+    room = db.session.identity_map.get(identity_key(Room, room_id))
+    if room is not None:
+        db.session.expire(room, ['active_occupants', 'status'])
+    
+    if delta > 0 and not updated:
+        raise RoomFullError(room_id)
+
+# Moves a guest between room counters given the occupancy_key() from before
+# and after a change. Raises RoomFullError if the new room is full; the
+# caller must roll back.
+#
+# The room rows are updated, and so locked, in ascending id order whichever
+# way the guest moves, so two guests swapping rooms wait on each other
+# instead of deadlocking.
+def record_occupancy_change(old_key, new_key):
+    if old_key == new_key:
+        return
+    changes = [(room_id, delta) for room_id, delta in ((old_key, -1), (new_key, 1)) if room_id is not None]
+    for room_id, delta in sorted(changes):
+        adjust_occupants(room_id, delta)
+
+# Closes and opens the guest's RoomHistory stays on the same occupancy_key()
+# transitions that move the room counters, so the occupancy report and the
+# counters agree: a stay ends on closed_on when the guest leaves a room or
+# stops being active, and one starts on opened_on in the room they now count in
+def record_stay_change(guest_id, old_key, new_key, closed_on, opened_on):
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        stay = RoomHistory.query.filter_by(guest_id=guest_id, room_id=old_key, end_date=None).first()
+        if stay:
+            stay.end_date = closed_on
+    if new_key is not None:
+        db.session.add(RoomHistory(room_id=new_key, guest_id=guest_id, start_date=opened_on))
+
+def _active_guest_count():
+    return select(func.count(Guest.id)).where(
+        Guest.room_id == Room.id,
+        Guest.status == 'active'
+    ).scalar_subquery()
+
+# Rooms whose counter disagrees with their active guests
+def find_occupancy_drift():
+    active_count = _active_guest_count()
+    rows = db.session.query(
+        Room.id,
+        Room.room_number,
+        Room.active_occupants,
+        active_count
+    ).filter(Room.active_occupants != active_count).order_by(Room.id).all()
+    
+    return [
+        {
+            'room_id': room_id,
+            'room_number': room_number,
+            'counter': counter,
+            'actual': actual
+        }
+        for room_id, room_number, counter, actual in rows
+    ]
+
+# Recounts the drifted rooms from the guests table in one UPDATE, setting
+# their status from the recount as adjust_occupants() does, and returns the
+# drift that was found
+def repair_occupancy_drift():
+    drift = find_occupancy_drift()
+    
+    if drift:
+        count = _active_guest_count()
+        Room.query.filter(Room.id.in_([room['room_id'] for room in drift])).update({
+            Room.active_occupants: count,
+            Room.status: case((count > 0, 'occupied'), else_='available')
+        }, synchronize_session=False)
+        bump_table_versions(ROOMS)
+        db.session.commit()
+    
+    return drift
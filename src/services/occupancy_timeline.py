@@ -0,0 +1,253 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+import calendar
+import heapq
+import threading
+import time
+from flask import current_app, g
+from sqlalchemy import or_
+from src.models.db import db
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+from src.services.read_replica import replica_router
+
+# Longest range one timeline request may cover
+MAX_TIMELINE_DAYS = 3700
+
+# Defaults, overridable through app.config
+DEFAULT_CACHE_SECONDS = 3600
+DEFAULT_CACHE_MONTHS = 240
+
+# Stays are read from the database in batches of this many rows
+STAY_BATCH_SIZE = 5000
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+def _month_end(day):
+    return date(day.year, day.month, calendar.monthrange(day.year, day.month)[1])
+
+def _months(start_date, end_date):
+    month = _month_start(start_date)
+    while month <= end_date:
+        yield month
+        month = _month_end(month) + timedelta(days=1)
+
+# Daily occupied beds per room between start_date and end_date inclusive, as
+# {'days': [beds per day], 'rooms': {room_id: [beds per day]}}; rooms that are
+# empty for the whole range are left out.
+#
+# Stays overlapping the range are streamed in start_date order and swept once:
+# a stay is added when the sweep reaches its start and removed, through a heap
+# of end dates, when it reaches its end. Stays are half-open like in the
+# occupancy report, so a guest does not count on their end_date.
+def sweep_occupancy(start_date, end_date):
+    stays = db.session.query(
+        RoomHistory.room_id,
+        RoomHistory.start_date,
+        RoomHistory.end_date
+    ).filter(
+        RoomHistory.start_date <= end_date,
+        or_(RoomHistory.end_date == None, RoomHistory.end_date > start_date)
+    ).order_by(RoomHistory.start_date).yield_per(STAY_BATCH_SIZE)
+    stays = iter(stays)
+    
+    day_count = (end_date - start_date).days + 1
+    days = [0] * day_count
+    rooms = {}
+    room_beds = {}
+    ends = []
+    beds = 0
+    next_stay = next(stays, None)
+    
+    for offset in range(day_count):
+        day = start_date + timedelta(days=offset)
+        
+        # Stays starting on or before this day
+        while next_stay is not None and next_stay.start_date <= day:
+            room_id = next_stay.room_id
+            room_beds[room_id] = room_beds.get(room_id, 0) + 1
+            beds += 1
+            if next_stay.end_date is not None:
+                heapq.heappush(ends, (next_stay.end_date, room_id))
+            next_stay = next(stays, None)
+        
+        # Stays ending on or before this day
+        while ends and ends[0][0] <= day:
+            _, room_id = heapq.heappop(ends)
+            room_beds[room_id] -= 1
+            beds -= 1
+        
+        days[offset] = beds
+        for room_id, count in room_beds.items():
+            if count:
+                if room_id not in rooms:
+                    rooms[room_id] = [0] * day_count
+                rooms[room_id][offset] = count
+    
+    return {'days': days, 'rooms': rooms}
+
+def _slice(result, start, stop):
+    return {
+        'days': result['days'][start:stop],
+        'rooms': {
+            room_id: counts[start:stop]
+            for room_id, counts in result['rooms'].items()
+            if any(counts[start:stop])
+        }
+    }
+
+# Caches the sweep of each closed month, the months before the current one.
+# Their stays only change when a guest's dates are backdated, and the guest
+# routes invalidate from the earliest date they touched. The cache lives in
+# each worker process, so entries also expire after cache_seconds to pick up
+# edits made through other workers.
+class OccupancyTimelineCache:
+    def __init__(self):
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+        self._invalidated_at = 0.0
+        self.hits = 0
+        self.misses = 0
+    
+    def _settings(self):
+        config = current_app.config
+        return (
+            config.get('OCCUPANCY_TIMELINE_CACHE_SECONDS', DEFAULT_CACHE_SECONDS),
+            config.get('OCCUPANCY_TIMELINE_CACHE_MONTHS', DEFAULT_CACHE_MONTHS)
+        )
+    
+    def _get(self, month, max_age):
+        with self._lock:
+            entry = self._months.get(month)
+            if entry is None or time.time() - entry[0] > max_age:
+                self.misses += 1
+                return None
+            self._months.move_to_end(month)
+            self.hits += 1
+            return entry[1]
+    
+    def _put(self, month, result, max_entries):
+        with self._lock:
+            self._months[month] = (time.time(), result)
+            self._months.move_to_end(month)
+            while len(self._months) > max_entries:
+                self._months.popitem(last=False)
+    
+    # Drops cached months from the month of since onwards
+    def invalidate(self, since=None):
+        with self._lock:
+            self._invalidated_at = time.monotonic()
+            if since is None:
+                self._months.clear()
+                return
+            for month in [month for month in self._months if month >= _month_start(since)]:
+                del self._months[month]
+    
+    # A month swept from the read replica is only cached once the last
+    # invalidation is older than the replica's lag bound, so a replica that
+    # has not yet replayed a backdated edit cannot put the old month back
+    def _cacheable(self):
+        if not g.get('db_read_replica'):
+            return True
+        with self._lock:
+            return time.monotonic() - self._invalidated_at > replica_router.max_lag
+    
+    # Daily occupancy between start_date and end_date inclusive. Closed months
+    # come from the cache; each run of consecutive uncached months, plus the
+    # current and future months, is computed with one sweep.
+    def timeline(self, start_date, end_date):
+        max_age, max_entries = self._settings()
+        current_month = _month_start(date.today())
+        cacheable = self._cacheable()
+        
+        months = list(_months(start_date, end_date))
+        results = {}
+        missing = []
+        for month in months:
+            cached = self._get(month, max_age) if month < current_month else None
+            if cached is not None:
+                results[month] = cached
+            else:
+                missing.append(month)
+        
+        # Group the missing months into consecutive runs
+        runs = []
+        for month in missing:
+            if runs and _month_end(runs[-1][-1]) + timedelta(days=1) == month:
+                runs[-1].append(month)
+            else:
+                runs.append([month])
+        
+        for run in runs:
+            run_start = run[0]
+            swept = sweep_occupancy(run_start, _month_end(run[-1]))
+            for month in run:
+                offset = (month - run_start).days
+                result = _slice(swept, offset, offset + (_month_end(month) - month).days + 1)
+                results[month] = result
+                if month < current_month and cacheable:
+                    self._put(month, result, max_entries)
+        
+        # Stitch the months together and trim to the requested range
+        days = []
+        rooms = {}
+        for month in months:
+            result = results[month]
+            for room_id, counts in result['rooms'].items():
+                rooms.setdefault(room_id, [0] * len(days))
+            for room_id in rooms:
+                rooms[room_id].extend(result['rooms'].get(room_id, [0] * len(result['days'])))
+            days.extend(result['days'])
+        
+        return _slice({'days': days, 'rooms': rooms},
+                      (start_date - months[0]).days,
+                      (end_date - months[0]).days + 1)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'cached_months': len(self._months),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+occupancy_timeline_cache = OccupancyTimelineCache()
+
+# Invalidates cached months a change to a guest's stays may have touched,
+# given the dates from before and after the change
+def invalidate_occupancy_timeline(*dates):
+    dates = [day for day in dates if day is not None]
+    occupancy_timeline_cache.invalidate(min(dates) if dates else None)
+
+# Timeline payload for the property, or a single room when room_id is given
+def build_occupancy_timeline(start_date, end_date, room_id=None, by_room=False):
+    result = occupancy_timeline_cache.timeline(start_date, end_date)
+    
+    if room_id is not None:
+        beds = result['rooms'].get(room_id, [0] * len(result['days']))
+        rooms = {room_id: beds}
+        capacity = db.session.query(Room.capacity).filter(Room.id == room_id).scalar() or 0
+    else:
+        beds = result['days']
+        rooms = result['rooms']
+        capacity = db.session.query(db.func.coalesce(db.func.sum(Room.capacity), 0)).scalar()
+    
+    timeline = {
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'capacity': int(capacity),
+        'days': [
+            {
+                'date': (start_date + timedelta(days=offset)).strftime('%Y-%m-%d'),
+                'occupied_beds': count,
+                'occupancy_rate': (count / capacity) * 100 if capacity else 0
+            }
+            for offset, count in enumerate(beds)
+        ]
+    }
+    
+    if by_room:
+        timeline['rooms'] = {str(key): counts for key, counts in sorted(rooms.items())}
+    
+    return timeline
@@ -0,0 +1,76 @@
+from flask import jsonify
+import base64
+import json
+
+# Page size bounds for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class PaginationError(ValueError):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+# Cursors are opaque to clients: base64url-encoded JSON of the last seen key
+def encode_cursor(last_id):
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['id']
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('INVALID_CURSOR', 'Cursor is not valid')
+    
+    if not isinstance(last_id, int):
+        raise PaginationError('INVALID_CURSOR', 'Cursor is not valid')
+    
+    return last_id
+
+def page_limit(value):
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError('INVALID_LIMIT', 'Limit must be an integer')
+    
+    if limit < 1:
+        raise PaginationError('INVALID_LIMIT', 'Limit must be at least 1')
+    
+    return min(limit, MAX_PAGE_SIZE)
+
+# Applies keyset pagination on the primary key to a query, reading limit and
+# cursor from args. Rows come back in id order and every page costs the same
+# index range scan, however deep it is. Returns (items, next_cursor).
+#
+# Paging is opt-in: a request with neither limit nor cursor gets every row, as
+# list endpoints returned before they were paginated, and no next_cursor.
+def paginate(query, id_column, args):
+    cursor = args.get('cursor')
+    if not args.get('limit') and not cursor:
+        return query.order_by(id_column).all(), None
+    
+    limit = page_limit(args.get('limit'))
+    
+    if cursor:
+        query = query.filter(id_column > decode_cursor(cursor))
+    
+    items = query.order_by(id_column).limit(limit + 1).all()
+    
+    if len(items) > limit:
+        items = items[:limit]
+        return items, encode_cursor(items[-1].id)
+    
+    return items, None
+
+def pagination_error(error):
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': error.code,
+            'message': str(error)
+        }
+    }), 400
@@ -0,0 +1,151 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through app.config or the environment
+DEFAULT_LOG_QUERIES = 50
+DEFAULT_LOG_DB_MS = 500
+DEFAULT_REPEAT_THRESHOLD = 5
+
+# Statement shapes listed when a request is logged
+LOGGED_SHAPES = 3
+
+# Collectors currently counting in this thread or task
+_active = ContextVar('query_collectors', default=())
+_registered = False
+
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'\?|%\(\w+\)s|%s')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)')
+
+# Statement text with literals and bound parameters replaced by ?, so the
+# same query with different values, or IN lists of any length, has one shape
+def statement_shape(statement):
+    shape = _STRING.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+# Statements executed while the collector was active, with their total time
+# and how often each shape ran
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes = Counter()
+    
+    def record(self, statement, duration_ms):
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+    
+    # Shapes that ran at least `threshold` times, most repeated first. A shape
+    # repeated once per row is the signature of an N+1 query.
+    def repeated(self, threshold=2):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+    
+    def duplicates(self):
+        return sum(count - 1 for count in self.shapes.values())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _active.get()
+    started = conn.info.get('query_started_at')
+    if not collectors or not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    for stats in collectors:
+        stats.record(statement, duration_ms)
+
+# Listens on every engine, the primary and the read replica alike
+def register_listeners():
+    global _registered
+    if _registered:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _registered = True
+
+def start_collecting():
+    stats = QueryStats()
+    _active.set(_active.get() + (stats,))
+    return stats
+
+def stop_collecting(stats):
+    _active.set(tuple(active for active in _active.get() if active is not stats))
+
+# Counts the statements run inside the block, in this thread:
+#     with track_queries() as stats:
+#         client.get('/api/v1/rooms')
+#     assert stats.count <= 3
+@contextmanager
+def track_queries():
+    register_listeners()
+    stats = start_collecting()
+    try:
+        yield stats
+    finally:
+        stop_collecting(stats)
+
+def _setting(app, name, default=None):
+    return app.config.get(name, os.getenv(name, default))
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return bool(value)
+
+# Per-request statement counting. In debug, or with SQL_QUERY_HEADERS=true,
+# responses carry X-DB-Queries and a Server-Timing entry for the database.
+# Requests over SQL_LOG_QUERIES statements or SQL_LOG_DB_MS of database time,
+# or repeating one statement shape SQL_REPEAT_THRESHOLD times, are logged
+# with their most repeated shapes.
+def init_query_counter(app):
+    register_listeners()
+    max_queries = int(_setting(app, 'SQL_LOG_QUERIES', DEFAULT_LOG_QUERIES))
+    max_db_ms = float(_setting(app, 'SQL_LOG_DB_MS', DEFAULT_LOG_DB_MS))
+    repeat_threshold = int(_setting(app, 'SQL_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD))
+    
+    @app.before_request
+    def start_request_queries():
+        g.query_stats = start_collecting()
+    
+    @app.after_request
+    def add_query_headers(response):
+        stats = g.get('query_stats')
+        # Read per request: app.run(debug=True) turns debug on after startup
+        if stats is not None and _flag(_setting(app, 'SQL_QUERY_HEADERS', app.debug)):
+            response.headers['X-DB-Queries'] = str(stats.count)
+            response.headers.add('Server-Timing', f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"')
+        return response
+    
+    # Teardown runs after a streamed body has been sent, so its queries count
+    @app.teardown_request
+    def log_request_queries(error=None):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return
+        stop_collecting(stats)
+        
+        repeated = stats.repeated(repeat_threshold)
+        if stats.count > max_queries or stats.duration_ms > max_db_ms or repeated:
+            logger.warning(
+                '%s %s ran %d queries in %.1f ms (%d duplicates); most repeated: %s',
+                request.method, request.path, stats.count, stats.duration_ms, stats.duplicates(),
+                '; '.join(f'{count}x {shape}' for shape, count in (repeated or stats.repeated())[:LOGGED_SHAPES]) or 'none'
+            )
@@ -0,0 +1,133 @@
+from functools import wraps
+from flask import g
+from sqlalchemy import text
+from src.models.db import db, REPLICA_BIND
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through app.config or the environment
+DEFAULT_MAX_LAG_SECONDS = 10
+DEFAULT_CHECK_SECONDS = 5
+DEFAULT_CHECK_TIMEOUT_MS = 1000
+
+# Seconds the replica is behind; 0 when it is not replaying a primary. An
+# idle primary also makes the replay timestamp age, which only sends reads
+# to the primary until the next write is replayed.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+def _setting(app, name, default=None):
+    return app.config.get(name, os.getenv(name, default))
+
+# Decides per request whether read-only endpoints may use the replica. The
+# replica's lag is measured at most every REPLICA_CHECK_SECONDS; while it is
+# unreachable or more than REPLICA_MAX_LAG_SECONDS behind, reads fall back
+# to the primary. One request at a time measures, outside the lock, and the
+# others meanwhile go by the last result, so a slow replica never queues
+# requests behind the check.
+class ReplicaRouter:
+    def __init__(self):
+        self.enabled = False
+        self.max_lag = DEFAULT_MAX_LAG_SECONDS
+        self.check_interval = DEFAULT_CHECK_SECONDS
+        self.check_timeout_ms = DEFAULT_CHECK_TIMEOUT_MS
+        self.healthy = False
+        self.lag = None
+        self.checked_at = 0.0
+        self.replica_requests = 0
+        self.primary_fallbacks = 0
+        self.check_errors = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def configure(self, app):
+        self.enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+        self.max_lag = float(_setting(app, 'REPLICA_MAX_LAG_SECONDS', DEFAULT_MAX_LAG_SECONDS))
+        self.check_interval = float(_setting(app, 'REPLICA_CHECK_SECONDS', DEFAULT_CHECK_SECONDS))
+        self.check_timeout_ms = int(_setting(app, 'REPLICA_CHECK_TIMEOUT_MS', DEFAULT_CHECK_TIMEOUT_MS))
+        self.healthy = False
+        self.lag = None
+        self.checked_at = 0.0
+    
+    def _measure_lag(self):
+        engine = db.get_engine(bind=REPLICA_BIND)
+        with engine.begin() as connection:
+            # Other databases, such as SQLite copies in development, only get
+            # a connectivity check
+            if engine.dialect.name != 'postgresql':
+                connection.execute(text('SELECT 1'))
+                return 0.0
+            # Connecting is bounded by connect_timeout in the replica URL
+            connection.execute(text(f'SET LOCAL statement_timeout = {int(self.check_timeout_ms)}'))
+            return float(connection.execute(REPLICA_LAG_SQL).scalar())
+    
+    def _refresh(self):
+        try:
+            lag = self._measure_lag()
+        except Exception:
+            logger.exception('Read replica check failed')
+            healthy, lag, failed = False, None, True
+        else:
+            healthy, failed = lag <= self.max_lag, False
+            if not healthy:
+                logger.warning('Read replica is %.1fs behind, reading from the primary', lag)
+        
+        with self._lock:
+            self.healthy = healthy
+            self.lag = lag
+            self.check_errors += failed
+            self.checked_at = time.monotonic()
+            self._refreshing = False
+    
+    # Whether the current request may read from the replica
+    def available(self):
+        if not self.enabled:
+            return False
+        with self._lock:
+            refresh = not self._refreshing and time.monotonic() - self.checked_at >= self.check_interval
+            if refresh:
+                self._refreshing = True
+        
+        if refresh:
+            self._refresh()
+        
+        with self._lock:
+            if self.healthy:
+                self.replica_requests += 1
+            else:
+                self.primary_fallbacks += 1
+            return self.healthy
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'healthy': self.healthy,
+                'lag_seconds': self.lag,
+                'max_lag_seconds': self.max_lag,
+                'replica_requests': self.replica_requests,
+                'primary_fallbacks': self.primary_fallbacks,
+                'check_errors': self.check_errors
+            }
+
+replica_router = ReplicaRouter()
+
+# Decorator for read-only handlers: their queries run on the read replica
+# when one is configured and within the staleness bound. Anything the request
+# writes still goes to the primary, and later reads follow it there. Apply it
+# below the auth decorator and above caching and ETag decorators, so those
+# read the same database as the handler.
+def read_only(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_router.available():
+            g.db_read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,271 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from src.models.db import db
+from src.models.report_job import ReportJob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+REPORT_TYPES = ['rent', 'occupancy', 'guests', 'payments']
+REPORT_FORMATS = ['json', 'csv', 'pdf']
+
+# Query parameters each report accepts, mirroring the /reports endpoints
+REPORT_PARAMS = {
+    'rent': ['start_date', 'end_date', 'guest_id', 'room_id'],
+    'occupancy': ['date'],
+    'guests': ['status'],
+    'payments': ['start_date', 'end_date', 'status']
+}
+
+# Defaults, overridable through app.config
+DEFAULT_WORKERS = 2
+DEFAULT_REUSE_SECONDS = 600
+DEFAULT_HEARTBEAT_SECONDS = 30
+DEFAULT_STALE_SECONDS = 900
+DEFAULT_RETENTION_SECONDS = 86400
+DEFAULT_EXPIRY_INTERVAL_SECONDS = 600
+
+IN_FLIGHT = ['pending', 'running']
+FINISHED = ['completed', 'failed']
+
+_executor = None
+_executor_lock = threading.Lock()
+_expiry_lock = threading.Lock()
+_next_expiry = 0
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('REPORT_JOB_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='report-job'
+            )
+        return _executor
+
+def _jobs_dir(app):
+    path = app.config.get('REPORT_JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'pg_report_jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def job_params_hash(report_type, report_format, params):
+    key = json.dumps({
+        'report_type': report_type,
+        'format': report_format,
+        'params': params
+    }, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+# Returns a job with identical parameters that is still queued or running
+# with a heartbeat within stale_seconds, or recently completed with its
+# artifact on disk, so repeat requests share one render
+def find_reusable_job(params_hash, reuse_seconds, stale_seconds=DEFAULT_STALE_SECONDS):
+    jobs = ReportJob.query.filter(
+        ReportJob.params_hash == params_hash,
+        ReportJob.status.in_(IN_FLIGHT + ['completed'])
+    ).order_by(ReportJob.id.desc()).all()
+    
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=reuse_seconds)
+    stale_cutoff = now - timedelta(seconds=stale_seconds)
+    for job in jobs:
+        if job.status in IN_FLIGHT:
+            if job.updated_at >= stale_cutoff:
+                return job
+        elif job.completed_at and job.completed_at >= cutoff and job.file_path and os.path.exists(job.file_path):
+            return job
+    
+    return None
+
+# Marks queued or running jobs failed once they have gone stale_seconds
+# without a heartbeat, which happens when the process running them exits.
+# Returns the number of jobs failed.
+def fail_stale_jobs(stale_seconds):
+    now = datetime.utcnow()
+    failed = ReportJob.query.filter(
+        ReportJob.status.in_(IN_FLIGHT),
+        ReportJob.updated_at < now - timedelta(seconds=stale_seconds)
+    ).update({
+        ReportJob.status: 'failed',
+        ReportJob.error: 'Report job stopped before finishing',
+        ReportJob.completed_at: now,
+        ReportJob.updated_at: now
+    }, synchronize_session=False)
+    
+    if failed:
+        db.session.commit()
+    return failed
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# Deletes finished jobs older than retention_seconds along with their
+# artifacts, then any file in the jobs directory that old which no job points
+# to, such as a .part file left by a render that crashed. Returns the number
+# of jobs deleted.
+def expire_report_jobs(app, retention_seconds):
+    cutoff = datetime.utcnow() - timedelta(seconds=retention_seconds)
+    jobs = ReportJob.query.filter(
+        ReportJob.status.in_(FINISHED),
+        ReportJob.completed_at < cutoff
+    ).all()
+    
+    for job in jobs:
+        if job.file_path:
+            _remove_file(job.file_path)
+        db.session.delete(job)
+    db.session.commit()
+    
+    directory = _jobs_dir(app)
+    kept = {path for (path,) in db.session.query(ReportJob.file_path).filter(ReportJob.file_path != None)}
+    oldest = time.time() - retention_seconds
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if path not in kept and os.path.isfile(path) and os.path.getmtime(path) < oldest:
+            _remove_file(path)
+    
+    return len(jobs)
+
+def _run_expiry(app):
+    with app.app_context():
+        expire_report_jobs(app, app.config.get('REPORT_JOB_RETENTION_SECONDS', DEFAULT_RETENTION_SECONDS))
+
+# Queues expiry on the worker pool at most every REPORT_JOB_EXPIRY_INTERVAL_SECONDS
+# per process
+def _schedule_expiry(app):
+    global _next_expiry
+    now = time.monotonic()
+    with _expiry_lock:
+        if now < _next_expiry:
+            return
+        _next_expiry = now + app.config.get('REPORT_JOB_EXPIRY_INTERVAL_SECONDS', DEFAULT_EXPIRY_INTERVAL_SECONDS)
+    _get_executor(app).submit(_run_expiry, app)
+
+# Creates a job (or reuses an identical one) and hands it to the worker pool.
+# The unique index on in-flight params_hash settles races between requests,
+# including ones served by other processes. Returns (job, created).
+def submit_report_job(report_type, report_format, params, user_id=None):
+    app = current_app._get_current_object()
+    params_hash = job_params_hash(report_type, report_format, params)
+    reuse_seconds = app.config.get('REPORT_JOB_REUSE_SECONDS', DEFAULT_REUSE_SECONDS)
+    stale_seconds = app.config.get('REPORT_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    
+    _schedule_expiry(app)
+    fail_stale_jobs(stale_seconds)
+    existing_job = find_reusable_job(params_hash, reuse_seconds, stale_seconds)
+    if existing_job:
+        return existing_job, False
+    
+    job = ReportJob(
+        report_type=report_type,
+        format=report_format,
+        params=json.dumps(params, sort_keys=True),
+        params_hash=params_hash,
+        status='pending',
+        created_by=user_id
+    )
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # An identical job was queued between the lookup and the insert
+        db.session.rollback()
+        existing_job = find_reusable_job(params_hash, reuse_seconds, stale_seconds)
+        if existing_job:
+            return existing_job, False
+        raise
+    
+    _get_executor(app).submit(run_report_job, app, job.id)
+    
+    return job, True
+
+def _update_job(job_id, **fields):
+    job = ReportJob.query.get(job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+    return job
+
+# Marks a running job alive on a connection of its own, leaving alone the
+# session that may still be streaming the report rows
+def _heartbeat(job_id):
+    with db.engine.begin() as connection:
+        connection.execute(
+            ReportJob.__table__.update().where(ReportJob.__table__.c.id == job_id).values(updated_at=datetime.utcnow())
+        )
+
+# Renders the report through its /reports view inside a synthetic request, so
+# job artifacts are byte-for-byte what the synchronous endpoint would return
+def _render(app, job_id, report_type, report_format, params):
+    from src.routes.report import REPORT_VIEWS
+    
+    view = REPORT_VIEWS[report_type]
+    query_string = dict(params, format=report_format)
+    
+    with app.test_request_context(query_string=query_string):
+        # Call the undecorated view; the job was authorised when it was submitted
+        response = app.make_response(view.__wrapped__())
+        
+        try:
+            if response.status_code != 200:
+                error = response.get_json(silent=True) or {}
+                raise ValueError(error.get('error', {}).get('message', f'Report failed with status {response.status_code}'))
+            
+            disposition = response.headers.get('Content-Disposition', '')
+            match = re.search(r'filename=([^;]+)', disposition)
+            file_name = match.group(1).strip('"') if match else f'{report_type}_report.{report_format}'
+            
+            path = os.path.join(_jobs_dir(app), f'{job_id}_{file_name}')
+            partial_path = path + '.part'
+            heartbeat_seconds = app.config.get('REPORT_JOB_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS)
+            last_heartbeat = time.monotonic()
+            with open(partial_path, 'wb') as artifact:
+                for chunk in response.iter_encoded():
+                    artifact.write(chunk)
+                    # Streamed reports beat while they write, so a long
+                    # render is not taken for a dead one
+                    if time.monotonic() - last_heartbeat >= heartbeat_seconds:
+                        _heartbeat(job_id)
+                        last_heartbeat = time.monotonic()
+            os.replace(partial_path, path)
+        finally:
+            response.close()
+    
+    return path, file_name, response.mimetype
+
+def run_report_job(app, job_id):
+    with app.app_context():
+        job = ReportJob.query.get(job_id)
+        if not job or job.status != 'pending':
+            return
+        
+        report_type = job.report_type
+        report_format = job.format
+        params = json.loads(job.params)
+        _update_job(job_id, status='running', started_at=datetime.utcnow())
+    
+    try:
+        path, file_name, mimetype = _render(app, job_id, report_type, report_format, params)
+    except Exception as e:
+        with app.app_context():
+            _update_job(job_id, status='failed', error=str(e), completed_at=datetime.utcnow())
+        return
+    
+    with app.app_context():
+        _update_job(
+            job_id,
+            status='completed',
+            file_path=path,
+            file_name=file_name,
+            mimetype=mimetype,
+            completed_at=datetime.utcnow()
+        )
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import request, Response
+from src.services.etags import request_table_versions
+import hashlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable through app.config or the environment
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 1024
+
+# Data a cached response depends on: the versioned tables behind ETags
+# (src/services/etags.py). A write bumps a table's version, which retires
+# every cached response built from it.
+GUESTS = 'guests'
+ROOMS = 'rooms'
+PAYMENTS = 'payments'
+
+# Base class for cache storage. Values are bytes.
+class CacheBackend:
+    def get(self, key):
+        raise NotImplementedError
+    
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+    
+    def stats(self):
+        return {}
+
+# Per-process LRU with a TTL on every entry. Keys carry the table versions,
+# so an entry is never served after a write in any worker; a shared backend
+# only saves each worker from computing the same response.
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+# Cache in Redis, shared by every worker. Needs the redis package; Redis
+# evicts and expires entries itself.
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url, prefix='pg:cache:'):
+        import redis
+        
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+    
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+    
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+    
+    def stats(self):
+        info = self.client.info('stats')
+        return {
+            'evictions': info.get('evicted_keys', 0),
+            'expirations': info.get('expired_keys', 0)
+        }
+
+def _setting(app, name, default=None):
+    return app.config.get(name, os.getenv(name, default))
+
+# Builds the backend selected by RESPONSE_CACHE_BACKEND ('memory', 'redis' or
+# 'none'), or None when caching is off
+def get_cache_backend(app):
+    name = _setting(app, 'RESPONSE_CACHE_BACKEND', 'memory')
+    if name == 'none':
+        return None
+    if name == 'memory':
+        return MemoryCacheBackend(int(_setting(app, 'RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)))
+    if name == 'redis':
+        return RedisCacheBackend(_setting(app, 'RESPONSE_CACHE_URL', 'redis://localhost:6379/0'))
+    raise ValueError(f'Unknown response cache backend: {name}')
+
+# Caches whole JSON responses of read endpoints, keyed by endpoint, query
+# string and the database version of each table the endpoint reads. Writes
+# bump those versions in their own transaction, so a write from any worker
+# gives later requests new keys. The versions come from the same per-request
+# snapshot as the ETag, and from the same database as the body: on a read
+# replica both lag together, so a cached body is never older than its key.
+class ResponseCache:
+    def __init__(self):
+        self.backend = None
+        self.ttl = DEFAULT_TTL_SECONDS
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+    
+    def configure(self, app):
+        self.backend = get_cache_backend(app)
+        self.ttl = float(_setting(app, 'RESPONSE_CACHE_TTL', DEFAULT_TTL_SECONDS))
+    
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def _key(self, name, tags):
+        versions = request_table_versions(tags)
+        args = sorted(request.args.items(multi=True))
+        # Date-relative endpoints (due this week, new guests) change at midnight
+        raw = repr((name, date.today().isoformat(), versions, args))
+        return 'response:' + name + ':' + hashlib.sha1(raw.encode()).hexdigest()
+    
+    # Decorator for GET handlers returning (json response, status). Apply it
+    # below the auth decorator so every request is still authenticated.
+    def cached(self, name, tags):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+                
+                # A cache outage falls back to computing the response
+                try:
+                    key = self._key(name, tags)
+                    body = self.backend.get(key)
+                except Exception:
+                    logger.exception('Response cache read failed')
+                    self._count('errors')
+                    return view(*args, **kwargs)
+                
+                if body is not None:
+                    self._count('hits')
+                    return Response(body, status=200, mimetype='application/json')
+                
+                self._count('misses')
+                response, status = view(*args, **kwargs)
+                if status == 200:
+                    try:
+                        self.backend.set(key, response.get_data(), self.ttl)
+                    except Exception:
+                        logger.exception('Response cache write failed')
+                        self._count('errors')
+                return response, status
+            return wrapper
+        return decorator
+    
+    def stats(self):
+        stats = {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors
+        }
+        if self.backend is not None:
+            try:
+                stats.update(self.backend.stats())
+            except Exception:
+                logger.exception('Response cache stats failed')
+        return stats
+
+response_cache = ResponseCache()
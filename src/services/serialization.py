@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Narrows a model query to the columns behind to_dict(). Rows come back as
+# tuples without ORM hydration and keep the attribute names, so paginate()
+# and serialized_rows() work on them unchanged.
+def serializable(query, model):
+    return query.with_entities(*[getattr(model, field) for field in model.SERIALIZED_FIELDS])
+
+# Plain dicts for rows from serializable(). Dates and Decimals stay as they
+# are and are converted while encoding, as to_dict() would convert them.
+def serialized_rows(rows):
+    return [row._asdict() for row in rows]
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+# Escapes characters the way json.dumps(ensure_ascii=True) does, including
+# surrogate pairs outside the BMP
+def _ascii_escape(match):
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u%04x' % code
+
+def dumps(payload):
+    config = current_app.config
+    pretty = config['JSONIFY_PRETTYPRINT_REGULAR'] or current_app.debug
+    
+    if orjson is not None and not pretty:
+        option = orjson.OPT_SORT_KEYS if config['JSON_SORT_KEYS'] else 0
+        text = orjson.dumps(payload, default=_default, option=option).decode('utf-8')
+        if config['JSON_AS_ASCII'] and not text.isascii():
+            text = _NON_ASCII.sub(_ascii_escape, text)
+        return text
+    
+    return json.dumps(
+        payload,
+        default=_default,
+        indent=2 if pretty else None,
+        separators=(', ', ': ') if pretty else (',', ':'),
+        sort_keys=config['JSON_SORT_KEYS'],
+        ensure_ascii=config['JSON_AS_ASCII']
+    )
+
+# Drop-in for jsonify() that also encodes dates as ISO 8601 and Decimals as
+# floats, producing the same bytes jsonify() produces for the to_dict() form
+# of the payload. Uses orjson when it is installed, the json module otherwise.
+def json_response(payload):
+    return current_app.response_class(
+        f'{dumps(payload)}\n',
+        mimetype=current_app.config['JSONIFY_MIMETYPE']
+    )
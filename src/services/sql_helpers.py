@@ -0,0 +1,46 @@
+from src.models.db import db
+
+# Rows per multi-row INSERT ... RETURNING, well inside PostgreSQL's limit of
+# 65535 bound parameters per statement
+RETURNING_BATCH_SIZE = 1000
+
+# Returns an INSERT for the model's table that supports ON CONFLICT clauses on
+# databases that have them (PostgreSQL, SQLite), or None elsewhere
+def conflict_aware_insert(model):
+    dialect = db.engine.dialect.name
+    
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    
+    return insert(model.__table__)
+
+# Runs an INSERT, for the given rows if any, and returns the ids of the rows
+# it added, in id order. PostgreSQL reports them with RETURNING. Elsewhere
+# they are read back in the same transaction with `inserted`, criteria that
+# match exactly the rows the statement adds, such as the created_at value it
+# writes to every row; a max(id) watermark would also pick up rows committed
+# concurrently.
+def insert_returning_ids(model, statement, inserted, rows=None):
+    if db.engine.dialect.name == 'postgresql':
+        if rows is None:
+            batches = [statement]
+        else:
+            batches = [
+                statement.values(rows[start:start + RETURNING_BATCH_SIZE])
+                for start in range(0, len(rows), RETURNING_BATCH_SIZE)
+            ]
+        
+        ids = []
+        for batch in batches:
+            ids.extend(row[0] for row in db.session.execute(batch.returning(model.id)))
+        return sorted(ids)
+    
+    if rows is None:
+        db.session.execute(statement)
+    else:
+        db.session.execute(statement, rows)
+    return [row[0] for row in db.session.query(model.id).filter(*inserted).order_by(model.id)]
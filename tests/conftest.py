@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Each test builds its own app on a SQLite file; nothing starts at import
+os.environ['AUTO_MIGRATE'] = 'false'
+os.environ['AUTOCOMPLETE_ENABLED'] = 'false'
+
+import pytest
+from flask_jwt_extended import create_access_token
+from src.main import create_app
+from src.models.db import db
+from src.services.migrations import run_migrations
+from src.services.query_counter import track_queries
+
+@pytest.fixture
+def database_path(tmp_path):
+    return str(tmp_path / 'test.db')
+
+@pytest.fixture
+def app(database_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'TESTING': True
+    })
+    with app.app_context():
+        run_migrations()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(app):
+    with app.app_context():
+        token = create_access_token(identity={'id': 1, 'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+# Counts the statements run inside a block:
+#     with query_counter() as stats:
+#         client.get('/api/v1/rooms', headers=auth_headers)
+#     assert stats.count <= 3
+@pytest.fixture
+def query_counter():
+    return track_queries
+
+# Runs request() once per size after seed(size) has added rows, and fails
+# when the statement count grows with the number of rows
+class QueryScaling:
+    def check(self, request, seed, sizes=(2, 10), slack=0):
+        counts = []
+        for size in sizes:
+            seed(size)
+            with track_queries() as stats:
+                response = request()
+            assert response.status_code == 200, response.get_data(as_text=True)
+            counts.append((size, stats))
+        
+        (smallest, first), (largest, last) = counts[0], counts[-1]
+        if last.count > first.count + slack:
+            repeated = '\n'.join(f'  {count}x {shape}' for shape, count in last.repeated())
+            pytest.fail(
+                f'Query count grows with rows: {first.count} queries after seeding {smallest}, '
+                f'{last.count} after {largest}\nRepeated statements:\n{repeated or "  none"}',
+                pytrace=False
+            )
+        return [stats.count for _, stats in counts]
+
+@pytest.fixture
+def query_scaling():
+    return QueryScaling()
@@ -0,0 +1,61 @@
+import sys
+import threading
+import pytest
+from src.services.autocomplete import AutocompleteIndex, _IndexState
+
+def guest(guest_id):
+    return {
+        'type': 'guest', 'id': guest_id, 'label': f'Guest {guest_id:04d}',
+        'contact_number': f'9{guest_id:09d}', 'room_id': 1, 'status': 'active'
+    }
+
+@pytest.fixture
+def index():
+    index = AutocompleteIndex()
+    index.enabled = True
+    index.refresh_seconds = 0
+    index._state = _IndexState(index.max_bytes)
+    for guest_id in range(200):
+        index._state.add(guest(guest_id))
+    return index
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_searches_run_safely_alongside_updates(index, fast_switching):
+    errors = []
+    done = threading.Event()
+    
+    def update():
+        for _ in range(200):
+            for guest_id in range(200):
+                index._apply(lambda state, guest_id=guest_id: state.remove('guest', guest_id))
+                index._apply(lambda state, guest_id=guest_id: state.add(guest(guest_id)))
+        done.set()
+    
+    def read():
+        try:
+            while not done.is_set():
+                for result in index.search('guest 00', limit=50):
+                    assert result['label'].startswith('Guest 00')
+                index.stats()
+        except Exception as error:
+            errors.append(error)
+            done.set()
+    
+    threads = [threading.Thread(target=update)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert index.stats()['guests'] == 200
+
+def test_search_finds_guests_by_name_and_digits(index):
+    assert [item['id'] for item in index.search('guest 0012')] == [12]
+    assert [item['id'] for item in index.search('90000 00012')] == [12]
@@ -0,0 +1,90 @@
+from datetime import date
+import gzip
+import brotli
+import pytest
+from flask import send_file
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+
+@pytest.fixture
+def rooms(app):
+    # Enough rooms and guests for the list and report bodies to pass the size threshold
+    with app.app_context():
+        for number in range(40):
+            room = Room(room_number=f'R{number:03d}', capacity=2, active_occupants=1, status='occupied', notes='Near the stairs')
+            db.session.add(room)
+            db.session.flush()
+            db.session.add(Guest(
+                full_name=f'Guest {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            ))
+        db.session.commit()
+
+def get(client, auth_headers, path, encoding, **headers):
+    return client.get(path, headers=dict(auth_headers, **{'Accept-Encoding': encoding}, **headers))
+
+@pytest.mark.parametrize('accept, expected', [
+    ('br, gzip', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None)
+])
+def test_encoding_is_negotiated_from_accept_encoding(client, auth_headers, rooms, accept, expected):
+    response = get(client, auth_headers, '/api/v1/rooms', accept)
+    assert response.headers.get('Content-Encoding') == expected
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+@pytest.mark.parametrize('encoding, decompress', [('br', brotli.decompress), ('gzip', gzip.decompress)])
+def test_compressed_body_matches_identity(client, auth_headers, rooms, encoding, decompress):
+    identity = get(client, auth_headers, '/api/v1/rooms', 'identity')
+    compressed = get(client, auth_headers, '/api/v1/rooms', encoding)
+    assert decompress(compressed.get_data()) == identity.get_data()
+
+def test_small_bodies_are_not_compressed(client, auth_headers):
+    response = get(client, auth_headers, '/api/v1/rooms', 'gzip')
+    assert 'Content-Encoding' not in response.headers
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_etag_names_the_encoding_and_revalidates(client, auth_headers, rooms, encoding):
+    identity = get(client, auth_headers, '/api/v1/rooms', 'identity')
+    compressed = get(client, auth_headers, '/api/v1/rooms', encoding)
+    assert compressed.headers['ETag'] == identity.headers['ETag'][:-1] + f'-{encoding}"'
+    
+    revalidated = get(client, auth_headers, '/api/v1/rooms', encoding, **{'If-None-Match': compressed.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    assert 'Content-Encoding' not in revalidated.headers
+
+def test_streamed_report_is_compressed_in_chunks(client, auth_headers, rooms):
+    identity = get(client, auth_headers, '/api/v1/reports/guests?format=csv', 'identity')
+    response = client.get('/api/v1/reports/guests?format=csv', buffered=False, headers=dict(auth_headers, **{'Accept-Encoding': 'gzip'}))
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(b''.join(response.response)) == identity.get_data()
+    response.close()
+
+@pytest.fixture
+def file_route(app, tmp_path):
+    def add(size):
+        path = tmp_path / f'report_{size}.csv'
+        path.write_bytes(b'guest_id,full_name\n' + b'1,Asha Rao\n' * (size // 10))
+        app.add_url_rule(f'/files/{size}', f'file_{size}', lambda: send_file(str(path), mimetype='text/csv'))
+        return path.read_bytes()
+    return add
+
+def test_sent_files_are_compressed_without_buffering(client, file_route):
+    content = file_route(200000)
+    response = client.get('/files/200000', buffered=False, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(b''.join(response.response)) == content
+    response.close()
+
+def test_small_sent_files_pass_through(client, file_route):
+    content = file_route(100)
+    response = client.get('/files/100', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == content
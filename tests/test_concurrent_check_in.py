@@ -0,0 +1,47 @@
+from collections import Counter
+from datetime import date
+import threading
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+
+THREADS = 12
+CAPACITY = 3
+
+def test_concurrent_check_ins_never_overfill_a_room(app, auth_headers):
+    with app.app_context():
+        room = Room(room_number='101', capacity=CAPACITY, status='available')
+        db.session.add(room)
+        db.session.commit()
+        room_id = room.id
+    
+    barrier = threading.Barrier(THREADS)
+    statuses = Counter()
+    lock = threading.Lock()
+    
+    # Every thread passes the capacity pre-check together, so the losers are
+    # stopped by the guarded counter UPDATE
+    def check_in(index):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/api/v1/guests', headers=auth_headers, json={
+            'full_name': f'Guest {index}', 'contact_number': f'90000{index:05d}', 'id_proof_url': 'id.jpg',
+            'check_in_date': date.today().isoformat(), 'rent_amount': 5000, 'room_id': room_id
+        })
+        code = (response.get_json(silent=True) or {}).get('error', {}).get('code')
+        with lock:
+            statuses[(response.status_code, code)] += 1
+    
+    threads = [threading.Thread(target=check_in, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert statuses[(201, None)] == CAPACITY
+    assert set(statuses) <= {(201, None), (409, 'ROOM_FULL'), (400, 'ROOM_FULL')}
+    assert sum(statuses.values()) == THREADS
+    with app.app_context():
+        room = Room.query.get(room_id)
+        assert Guest.query.filter_by(room_id=room_id, status='active').count() == CAPACITY
+        assert (room.active_occupants, room.status) == (CAPACITY, 'occupied')
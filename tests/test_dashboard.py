@@ -0,0 +1,57 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.payment import Payment
+from src.models.room import Room
+
+@pytest.fixture
+def ledger(app):
+    # Guests in every status and payments in every status, with paise amounts
+    with app.app_context():
+        rooms = [
+            Room(room_number='101', capacity=2, active_occupants=2, status='occupied'),
+            Room(room_number='102', capacity=2, active_occupants=0, status='available'),
+            Room(room_number='103', capacity=1, active_occupants=0, status='maintenance')
+        ]
+        db.session.add_all(rooms)
+        db.session.flush()
+        for number, status in enumerate(['active', 'active', 'inactive']):
+            guest = Guest(
+                full_name=f'Guest {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status=status, room_id=rooms[0].id
+            )
+            db.session.add(guest)
+            db.session.flush()
+            for month, (status, amount) in enumerate([('paid', 5000.25), ('partial', 2500.5), ('unpaid', 4999.75)], start=1):
+                db.session.add(Payment(
+                    guest_id=guest.id, amount=amount + number, payment_date=date(2026, month, 28),
+                    payment_type='full', status=status, due_date=date(2026, month, 1)
+                ))
+        db.session.commit()
+
+# The figures as the endpoint used to compute them, one query per table and
+# the sums in Python
+def per_table_summary():
+    return {
+        'active_guests': Guest.query.filter_by(status='active').count(),
+        'vacant_rooms': Room.query.filter_by(status='available').count(),
+        'total_collected': sum(float(payment.amount) for payment in Payment.query.filter_by(status='paid')),
+        'pending_dues': sum(float(payment.amount) for payment in Payment.query.filter(Payment.status.in_(['unpaid', 'partial'])))
+    }
+
+def test_summary_matches_the_per_table_figures(app, client, auth_headers, ledger):
+    summary = client.get('/api/v1/dashboard/summary', headers=auth_headers).get_json()['data']
+    with app.app_context():
+        expected = per_table_summary()
+    assert summary == pytest.approx(expected)
+    assert (summary['active_guests'], summary['vacant_rooms']) == (2, 1)
+
+def test_summary_of_an_empty_database(client, auth_headers):
+    summary = client.get('/api/v1/dashboard/summary', headers=auth_headers).get_json()['data']
+    assert summary == {'active_guests': 0, 'vacant_rooms': 0, 'total_collected': 0, 'pending_dues': 0}
+
+def test_summary_reads_payments_once(client, auth_headers, ledger, query_counter):
+    with query_counter() as stats:
+        client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    assert sum(count for shape, count in stats.shapes.items() if 'payments' in shape) == 1
@@ -0,0 +1,40 @@
+import gc
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect
+from src.main import create_app
+from src.models.db import db
+from src.models.room import Room
+from src.models.user import User
+
+def test_one_sqlalchemy_instance_is_loaded():
+    instances = [obj for obj in gc.get_objects() if isinstance(obj, SQLAlchemy)]
+    assert instances == [db]
+
+def test_every_model_shares_one_metadata_and_engine(app):
+    with app.app_context():
+        session = db.session()
+        mappers = list(db.Model.registry.mappers)
+        assert {mapper.class_.__name__ for mapper in mappers} >= {'User', 'Room', 'Guest', 'Payment', 'Notification'}
+        for mapper in mappers:
+            assert mapper.local_table.metadata is db.metadata
+            assert session.get_bind(mapper=inspect(mapper.class_)) is db.engine
+
+def test_create_all_on_sqlite_creates_every_table(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "create_all.db"}'})
+    with app.app_context():
+        db.create_all()
+        assert set(inspect(db.engine).get_table_names()) >= set(db.metadata.tables)
+
+def test_one_transaction_spans_users_and_rooms(app):
+    with app.app_context():
+        db.session.add(User(email='admin@example.com', password_hash='x', full_name='Admin', role='admin'))
+        db.session.add(Room(room_number='101', capacity=2, status='available'))
+        db.session.flush()
+        db.session.rollback()
+        assert User.query.count() == 0
+        assert Room.query.count() == 0
+
+def test_session_is_removed_with_its_app_context(app):
+    with app.app_context():
+        db.session.query(Room).count()
+    assert not db.session.registry.has()
@@ -0,0 +1,64 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.services.guest_search import MAX_SEARCH_LIMIT
+
+@pytest.fixture
+def guests(app):
+    with app.app_context():
+        room = Room(room_number='101', capacity=60, status='occupied')
+        db.session.add(room)
+        db.session.flush()
+        for name, contact_number in [
+            ('Joanne Smith', '1987650000'),
+            ('Mary Ann', '9876512345'),
+            ('Annapurna Devi', '98765'),
+            ('Ann', '9876500000'),
+            ('Ravi Nair', '9123456789')
+        ]:
+            db.session.add(Guest(
+                full_name=name, contact_number=contact_number, id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            ))
+        db.session.commit()
+
+def search(client, auth_headers, query, **params):
+    response = client.get('/api/v1/guests/search', headers=auth_headers, query_string=dict(q=query, **params))
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+def test_names_rank_exact_then_prefix_then_word_then_anywhere(client, auth_headers, guests):
+    data = search(client, auth_headers, 'ANN')
+    assert data['mode'] == 'basic'
+    assert [guest['full_name'] for guest in data['guests']] == ['Ann', 'Annapurna Devi', 'Mary Ann', 'Joanne Smith']
+
+@pytest.mark.parametrize('query', ['98765', '987-65', '(98765)'])
+def test_phone_numbers_match_by_prefix_shortest_first(client, auth_headers, guests, query):
+    data = search(client, auth_headers, query)
+    assert data['mode'] == 'phone'
+    assert [guest['contact_number'] for guest in data['guests']] == ['98765', '9876500000', '9876512345']
+
+def test_like_wildcards_match_literally(client, auth_headers, guests):
+    assert search(client, auth_headers, '%')['guests'] == []
+    assert search(client, auth_headers, 'a_n')['guests'] == []
+
+def test_results_are_bounded(app, client, auth_headers, guests):
+    with app.app_context():
+        room_id = Room.query.first().id
+        for number in range(MAX_SEARCH_LIMIT + 5):
+            db.session.add(Guest(
+                full_name=f'Annika {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room_id
+            ))
+        db.session.commit()
+    
+    assert len(search(client, auth_headers, 'ann', limit=2)['guests']) == 2
+    assert len(search(client, auth_headers, 'ann', limit=1000)['guests']) == MAX_SEARCH_LIMIT
+
+@pytest.mark.parametrize('params, code', [({'q': ' '}, 'MISSING_QUERY'), ({'q': 'ann', 'limit': 'many'}, 'INVALID_LIMIT')])
+def test_invalid_searches_are_refused(client, auth_headers, params, code):
+    response = client.get('/api/v1/guests/search', headers=auth_headers, query_string=params)
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == code
@@ -0,0 +1,63 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+
+@pytest.fixture
+def rooms(app):
+    with app.app_context():
+        added = [Room(room_number=number, capacity=2, status='available') for number in ('101', '102')]
+        db.session.add_all(added)
+        db.session.commit()
+        return [room.id for room in added]
+
+@pytest.fixture
+def guest_id(client, auth_headers, rooms):
+    response = client.post('/api/v1/guests', headers=auth_headers, json={
+        'full_name': 'Asha Rao', 'contact_number': '9000000000', 'id_proof_url': 'id.jpg',
+        'check_in_date': '2026-01-01', 'rent_amount': 5000, 'room_id': rooms[0]
+    })
+    assert response.status_code == 201
+    return response.get_json()['data']['guest']['id']
+
+def open_stays(app, guest_id):
+    with app.app_context():
+        return [stay.room_id for stay in RoomHistory.query.filter_by(guest_id=guest_id, end_date=None)]
+
+def active_occupants(app, room_id):
+    with app.app_context():
+        return Room.query.get(room_id).active_occupants
+
+def occupants_today(client, auth_headers, room_id):
+    response = client.get(f'/api/v1/reports/occupancy?date={date.today().isoformat()}', headers=auth_headers)
+    rooms = response.get_json()['data']['report']['rooms']
+    return next(room['guests'] for room in rooms if room['room_id'] == room_id)
+
+def update(client, auth_headers, guest_id, **fields):
+    response = client.put(f'/api/v1/guests/{guest_id}', headers=auth_headers, json=fields)
+    assert response.status_code == 200
+    return response
+
+def test_moving_an_active_guest_moves_the_stay(app, client, auth_headers, rooms, guest_id):
+    update(client, auth_headers, guest_id, room_id=rooms[1])
+    assert open_stays(app, guest_id) == [rooms[1]]
+    assert (active_occupants(app, rooms[0]), active_occupants(app, rooms[1])) == (0, 1)
+    assert occupants_today(client, auth_headers, rooms[1]) == ['Asha Rao']
+
+def test_moving_an_inactive_guest_opens_no_stay(app, client, auth_headers, rooms, guest_id):
+    assert client.post(f'/api/v1/guests/{guest_id}/checkout', headers=auth_headers).status_code == 200
+    update(client, auth_headers, guest_id, room_id=rooms[1])
+    assert open_stays(app, guest_id) == []
+    assert active_occupants(app, rooms[1]) == 0
+    assert occupants_today(client, auth_headers, rooms[1]) == []
+
+def test_reactivating_a_guest_opens_a_stay(app, client, auth_headers, rooms, guest_id):
+    update(client, auth_headers, guest_id, status='inactive')
+    assert open_stays(app, guest_id) == []
+    update(client, auth_headers, guest_id, room_id=rooms[1])
+    response = update(client, auth_headers, guest_id, status='active')
+    assert response.get_json()['data']['guest']['check_out_date'] is None
+    assert open_stays(app, guest_id) == [rooms[1]]
+    assert active_occupants(app, rooms[1]) == 1
+    assert occupants_today(client, auth_headers, rooms[1]) == ['Asha Rao']
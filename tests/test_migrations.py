@@ -0,0 +1,62 @@
+import importlib
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from src.models.db import db
+from src.services.migrations import discover_migrations, migration_status, run_migrations
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+def recorded_versions(engine):
+    with engine.connect() as connection:
+        return [row[0] for row in connection.execute(text('SELECT version FROM schema_migrations ORDER BY version'))]
+
+def index_names(engine, table_name):
+    return {index['name'] for index in inspect(engine).get_indexes(table_name)}
+
+def test_migrations_apply_in_order_and_only_once(engine):
+    versions = [migration.version for migration in discover_migrations()]
+    assert versions == sorted(versions) and len(set(versions)) == len(versions)
+    
+    assert run_migrations(engine) == versions
+    assert run_migrations(engine) == []
+    assert recorded_versions(engine) == versions
+    assert all(applied for _, applied in migration_status(engine))
+
+def test_target_stops_at_a_version(engine):
+    assert run_migrations(engine, target=3) == [1, 2, 3]
+    assert [migration.version for migration, applied in migration_status(engine) if not applied][0] == 4
+    assert run_migrations(engine)[0] == 4
+
+def test_failed_migration_is_not_recorded(engine, monkeypatch):
+    module = importlib.import_module('src.migrations.0008_guest_email')
+    upgrade = module.upgrade
+    
+    def fail_after_upgrading(connection):
+        upgrade(connection)
+        raise RuntimeError('interrupted')
+    
+    monkeypatch.setattr(module, 'upgrade', fail_after_upgrading)
+    with pytest.raises(RuntimeError):
+        run_migrations(engine)
+    assert 8 not in recorded_versions(engine)
+    
+    monkeypatch.setattr(module, 'upgrade', upgrade)
+    assert run_migrations(engine)[0] == 8
+
+def test_databases_from_create_all_get_the_hot_path_indexes(engine):
+    # Tables as the old startup db.create_all() left them, without the indexes
+    db.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+    assert 'ix_payments_open_due_date' not in index_names(engine, 'payments')
+    
+    run_migrations(engine)
+    assert {'ix_payments_open_due_date', 'ix_payments_due_date', 'ix_payments_status_id'} <= index_names(engine, 'payments')
+    assert {'ix_guests_active_room_id', 'ix_guests_status_id'} <= index_names(engine, 'guests')
+    assert 'ix_room_history_guest_room_end_date' in index_names(engine, 'room_history')
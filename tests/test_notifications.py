@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.notification import Notification
+from src.models.payment import Payment
+from src.models.room import Room
+from src.services.notification_dispatcher import NotificationDispatcher
+from src.services.notification_providers import FakeProvider
+
+@pytest.fixture
+def guests(app):
+    # Two active guests with an overdue payment each, only one with an email address
+    with app.app_context():
+        room = Room(room_number='101', capacity=2, active_occupants=2, status='occupied')
+        db.session.add(room)
+        db.session.flush()
+        ids = []
+        for name, email in [('Asha Rao', 'asha@example.com'), ('Ravi Nair', None)]:
+            guest = Guest(
+                full_name=name, contact_number='9000000000', email=email, id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            )
+            db.session.add(guest)
+            db.session.flush()
+            db.session.add(Payment(
+                guest_id=guest.id, amount=5000, payment_date=date.today(), payment_type='full',
+                status='unpaid', due_date=date.today() - timedelta(days=5)
+            ))
+            ids.append(guest.id)
+        db.session.commit()
+    return ids
+
+def queue(client, auth_headers, guest_id, notification_type):
+    return client.post('/api/v1/notifications', headers=auth_headers, json={
+        'guest_id': guest_id, 'type': notification_type, 'message': 'Rent is due'
+    })
+
+def test_email_is_refused_for_a_guest_without_an_address(client, auth_headers, guests):
+    response = queue(client, auth_headers, guests[1], 'email')
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == 'GUEST_HAS_NO_EMAIL'
+    
+    notification_id = queue(client, auth_headers, guests[1], 'sms').get_json()['data']['notification']['id']
+    response = client.put(f'/api/v1/notifications/{notification_id}', headers=auth_headers, json={'type': 'email'})
+    assert response.status_code == 400
+
+def test_email_is_delivered_to_the_guest_address(app, client, auth_headers, guests):
+    assert queue(client, auth_headers, guests[0], 'email').status_code == 201
+    
+    provider = FakeProvider()
+    dispatcher = NotificationDispatcher(providers={'email': provider})
+    with app.app_context():
+        dispatcher.run(once=True)
+        assert [notification.status for notification in Notification.query] == ['sent']
+    dispatcher.close()
+    assert [delivery.email for delivery in provider.sent] == ['asha@example.com']
+
+def test_fan_out_skips_email_for_guests_without_an_address(app, client, auth_headers, guests):
+    response = client.post('/api/v1/notifications/send-overdue', headers=auth_headers)
+    assert response.get_json()['data']['created_count'] == 3
+    with app.app_context():
+        queued = {(notification.guest_id, notification.type) for notification in Notification.query}
+    assert queued == {(guests[0], 'sms'), (guests[0], 'email'), (guests[1], 'sms')}
+
+def test_fan_out_lists_exactly_the_created_notifications(client, auth_headers, guests):
+    earlier = queue(client, auth_headers, guests[0], 'sms').get_json()['data']['notification']['id']
+    response = client.post('/api/v1/notifications/send-overdue', headers=auth_headers, json={
+        'include_notifications': True, 'limit': 2
+    })
+    data = response.get_json()['data']
+    listed = [notification['id'] for notification in data['notifications']]
+    assert len(listed) == 2 and earlier not in listed
+    assert all(notification['message'].startswith('URGENT') for notification in data['notifications'])
+    assert data['next_cursor'] is not None
+    
+    walked = client.get(f"/api/v1/notifications?cursor={data['created_cursor']}", headers=auth_headers).get_json()['data']
+    assert len(walked['notifications']) == 3
+    assert earlier not in [notification['id'] for notification in walked['notifications']]
@@ -0,0 +1,63 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.services import occupancy
+from src.services.occupancy import RoomFullError, find_occupancy_drift, record_occupancy_change, repair_occupancy_drift
+
+@pytest.fixture
+def rooms(app):
+    # A full room 1 and a room 2 with one guest and space for another
+    with app.app_context():
+        db.session.add_all([
+            Room(room_number='101', capacity=1, active_occupants=1, status='occupied'),
+            Room(room_number='102', capacity=2, active_occupants=1, status='occupied')
+        ])
+        db.session.commit()
+    return app
+
+@pytest.mark.parametrize('old_key, new_key', [(1, 2), (2, 1)])
+def test_rooms_are_updated_in_id_order(rooms, monkeypatch, old_key, new_key):
+    updated = []
+    monkeypatch.setattr(occupancy, 'adjust_occupants', lambda room_id, delta: updated.append(room_id))
+    with rooms.app_context():
+        record_occupancy_change(old_key, new_key)
+    assert updated == [1, 2]
+
+def test_moving_into_a_full_lower_room_raises(rooms):
+    with rooms.app_context():
+        with pytest.raises(RoomFullError) as raised:
+            record_occupancy_change(2, 1)
+        assert raised.value.room_id == 1
+        db.session.rollback()
+        assert [room.active_occupants for room in Room.query.order_by(Room.id)] == [1, 1]
+
+def test_moving_into_a_room_with_space(rooms):
+    with rooms.app_context():
+        record_occupancy_change(1, 2)
+        db.session.commit()
+        assert [(room.active_occupants, room.status) for room in Room.query.order_by(Room.id)] == [(0, 'available'), (2, 'occupied')]
+
+def test_counter_stays_out_of_the_room_payload(rooms, client, auth_headers):
+    listed = client.get('/api/v1/rooms', headers=auth_headers).get_json()['data']['rooms']
+    single = client.get(f"/api/v1/rooms/{listed[0]['id']}", headers=auth_headers).get_json()['data']['room']
+    assert 'active_occupants' not in listed[0]
+    assert set(single) == set(listed[0])
+
+def test_repair_resets_counter_and_status(app):
+    with app.app_context():
+        empty = Room(room_number='201', capacity=2, active_occupants=2, status='occupied')
+        taken = Room(room_number='202', capacity=2, active_occupants=0, status='available')
+        db.session.add_all([empty, taken])
+        db.session.flush()
+        db.session.add(Guest(
+            full_name='Asha Rao', contact_number='9000000000', id_proof_url='id.jpg',
+            check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=taken.id
+        ))
+        db.session.commit()
+        
+        assert [room['room_number'] for room in repair_occupancy_drift()] == ['201', '202']
+        db.session.expire_all()
+        assert [(room.active_occupants, room.status) for room in Room.query.order_by(Room.id)] == [(0, 'available'), (1, 'occupied')]
+        assert find_occupancy_drift() == []
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+from src.services.occupancy_timeline import invalidate_occupancy_timeline, occupancy_timeline_cache
+
+START = date(2025, 12, 25)
+END = date(2026, 3, 20)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    # The cache is per process and outlives each test's database
+    occupancy_timeline_cache.invalidate()
+    yield
+    occupancy_timeline_cache.invalidate()
+
+@pytest.fixture
+def stays(app):
+    # Stays crossing month ends, a one-day stay, an open stay and an empty room
+    with app.app_context():
+        rooms = [Room(room_number=f'10{number}', capacity=2, status='available') for number in range(1, 4)]
+        db.session.add_all(rooms)
+        db.session.flush()
+        for room, start_date, end_date in [
+            (rooms[0], date(2025, 12, 20), date(2026, 1, 10)),
+            (rooms[0], date(2026, 1, 5), None),
+            (rooms[1], date(2026, 1, 31), date(2026, 2, 1)),
+            (rooms[1], date(2026, 2, 1), date(2026, 3, 15))
+        ]:
+            guest = Guest(
+                full_name=f'Guest {start_date}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=start_date, rent_amount=5000, status='active', room_id=room.id
+            )
+            db.session.add(guest)
+            db.session.flush()
+            db.session.add(RoomHistory(room_id=room.id, guest_id=guest.id, start_date=start_date, end_date=end_date))
+        db.session.commit()
+        return [room.id for room in rooms]
+
+# Beds per room and day counted one day at a time, the way the occupancy
+# report counts a single date
+def beds_per_day(start_date, end_date):
+    stays = RoomHistory.query.all()
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    
+    def beds(day, room_id=None):
+        return sum(
+            1 for stay in stays
+            if stay.start_date <= day and (stay.end_date is None or stay.end_date > day)
+            and room_id in (None, stay.room_id)
+        )
+    
+    rooms = {str(room_id): [beds(day, room_id) for day in dates] for room_id in {stay.room_id for stay in stays}}
+    return [beds(day) for day in dates], {room_id: counts for room_id, counts in rooms.items() if any(counts)}
+
+def timeline(client, auth_headers, start_date=START, end_date=END, **params):
+    response = client.get('/api/v1/reports/occupancy/timeline', headers=auth_headers, query_string=dict(
+        start_date=start_date.isoformat(), end_date=end_date.isoformat(), **params
+    ))
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+def test_timeline_matches_a_per_day_count(app, client, auth_headers, stays):
+    data = timeline(client, auth_headers, by_room='true')['timeline']
+    with app.app_context():
+        days, rooms = beds_per_day(START, END)
+    
+    assert [day['occupied_beds'] for day in data['days']] == days
+    assert data['rooms'] == rooms
+    assert str(stays[2]) not in data['rooms']
+    assert data['capacity'] == 6
+    assert data['days'][0] == {'date': '2025-12-25', 'occupied_beds': 1, 'occupancy_rate': pytest.approx(100 / 6)}
+
+def test_a_room_timeline_uses_the_room_capacity(app, client, auth_headers, stays):
+    data = timeline(client, auth_headers, room_id=stays[1])['timeline']
+    with app.app_context():
+        _, rooms = beds_per_day(START, END)
+    assert [day['occupied_beds'] for day in data['days']] == rooms[str(stays[1])]
+    assert data['capacity'] == 2
+
+def test_cached_months_give_the_same_timeline(client, auth_headers, stays):
+    first = timeline(client, auth_headers)
+    assert first['cache']['hits'] == 0
+    
+    # A range starting mid-month is served from the months cached above
+    second = timeline(client, auth_headers, start_date=date(2026, 1, 15))
+    assert second['cache']['hits'] > 0
+    assert second['timeline']['days'] == first['timeline']['days'][21:]
+
+def test_backdated_stays_invalidate_cached_months(app, client, auth_headers, stays):
+    timeline(client, auth_headers)
+    with app.app_context():
+        db.session.add(RoomHistory(room_id=stays[2], guest_id=1, start_date=date(2026, 2, 10), end_date=date(2026, 2, 12)))
+        db.session.commit()
+        invalidate_occupancy_timeline(date(2026, 2, 10))
+        days, _ = beds_per_day(START, END)
+    
+    assert [day['occupied_beds'] for day in timeline(client, auth_headers)['timeline']['days']] == days
+
+@pytest.mark.parametrize('params, code', [
+    ({'start_date': '2026-03-01', 'end_date': '2026-02-01'}, 'INVALID_DATE_RANGE'),
+    ({'start_date': '2010-01-01', 'end_date': '2026-02-01'}, 'INVALID_DATE_RANGE'),
+    ({'start_date': '01/02/2026'}, 'INVALID_DATE_FORMAT')
+])
+def test_invalid_ranges_are_refused(client, auth_headers, params, code):
+    response = client.get('/api/v1/reports/occupancy/timeline', headers=auth_headers, query_string=params)
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == code
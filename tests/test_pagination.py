@@ -0,0 +1,30 @@
+import pytest
+from src.models.db import db
+from src.models.room import Room
+from src.services import pagination
+
+@pytest.fixture
+def rooms(app):
+    with app.app_context():
+        db.session.add_all([Room(room_number=f'R{number}', capacity=2, status='available') for number in range(5)])
+        db.session.commit()
+
+def list_rooms(client, auth_headers, query=''):
+    response = client.get(f'/api/v1/rooms{query}', headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    return [room['room_number'] for room in data['rooms']], data['next_cursor']
+
+def test_lists_are_unbounded_without_limit_or_cursor(client, auth_headers, rooms, monkeypatch):
+    monkeypatch.setattr(pagination, 'DEFAULT_PAGE_SIZE', 2)
+    assert list_rooms(client, auth_headers) == ([f'R{number}' for number in range(5)], None)
+
+def test_limit_and_cursor_page_through_the_list(client, auth_headers, rooms):
+    first, cursor = list_rooms(client, auth_headers, '?limit=3')
+    rest, last_cursor = list_rooms(client, auth_headers, f'?cursor={cursor}')
+    assert (first, rest, last_cursor) == (['R0', 'R1', 'R2'], ['R3', 'R4'], None)
+
+def test_invalid_limit_is_rejected(client, auth_headers, rooms):
+    response = client.get('/api/v1/rooms?limit=zero', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == 'INVALID_LIMIT'
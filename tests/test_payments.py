@@ -0,0 +1,73 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.payment import Payment
+from src.models.room import Room
+
+@pytest.fixture
+def guests(app):
+    # Three active guests, the first already billed for March 2026
+    with app.app_context():
+        room = Room(room_number='101', capacity=3, active_occupants=3, status='occupied')
+        db.session.add(room)
+        db.session.flush()
+        ids = []
+        for number in range(3):
+            guest = Guest(
+                full_name=f'Guest {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            )
+            db.session.add(guest)
+            db.session.flush()
+            ids.append(guest.id)
+        db.session.add(Payment(
+            guest_id=ids[0], amount=5000, payment_date=date(2026, 3, 31), payment_type='full',
+            status='unpaid', due_date=date(2026, 3, 1)
+        ))
+        db.session.commit()
+    return ids
+
+def generate(client, auth_headers, **options):
+    response = client.post('/api/v1/payments/generate-monthly', headers=auth_headers, json=dict(
+        month=3, year=2026, include_payments=True, **options
+    ))
+    assert response.status_code == 201
+    return response.get_json()['data']
+
+def test_generated_listing_holds_exactly_the_inserted_rows(client, auth_headers, guests):
+    data = generate(client, auth_headers, limit=1)
+    assert (data['generated_count'], data['skipped_count']) == (2, 1)
+    assert [payment['guest_id'] for payment in data['generated']] == [guests[1]]
+    
+    data = generate(client, auth_headers, limit=1, cursor=data['next_cursor'])
+    assert data['generated_count'] == 0
+    assert [payment['guest_id'] for payment in data['generated']] == [guests[2]]
+    assert data['next_cursor'] is None
+
+def test_rerun_lists_nothing_new(client, auth_headers, guests):
+    generate(client, auth_headers)
+    data = generate(client, auth_headers)
+    assert (data['generated_count'], data['generated']) == (0, [])
+
+def test_cursor_pages_skip_payments_from_other_runs(app, client, auth_headers, guests):
+    data = generate(client, auth_headers, limit=1)
+    
+    # A payment recorded by hand for the same month after the run
+    with app.app_context():
+        guest = Guest(
+            full_name='Late Guest', contact_number='9000000000', id_proof_url='id.jpg',
+            check_in_date=date(2026, 3, 1), rent_amount=5000, status='inactive',
+            room_id=Room.query.first().id
+        )
+        db.session.add(guest)
+        db.session.flush()
+        db.session.add(Payment(
+            guest_id=guest.id, amount=5000, payment_date=date(2026, 3, 31), payment_type='full',
+            status='paid', due_date=date(2026, 3, 1)
+        ))
+        db.session.commit()
+    
+    data = generate(client, auth_headers, limit=5, cursor=data['next_cursor'])
+    assert [payment['guest_id'] for payment in data['generated']] == [guests[2]]
+    assert data['next_cursor'] is None
@@ -0,0 +1,66 @@
+from datetime import date
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.services.query_counter import statement_shape
+
+@pytest.fixture
+def add_rooms(app):
+    added = []
+    
+    # Adds `count` occupied rooms with two active guests each
+    def seed(count):
+        with app.app_context():
+            for _ in range(count):
+                room = Room(room_number=f'R{len(added) + 1}', capacity=3, status='occupied')
+                db.session.add(room)
+                db.session.flush()
+                for number in range(2):
+                    db.session.add(Guest(
+                        full_name=f'Guest {room.room_number}-{number}', contact_number='9000000000',
+                        id_proof_url='id.jpg', check_in_date=date(2026, 1, 1), rent_amount=5000,
+                        status='active', room_id=room.id
+                    ))
+                added.append(room.room_number)
+            db.session.commit()
+    return seed
+
+def test_statement_shape_ignores_values_and_in_list_length():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == 'SELECT * FROM t WHERE id IN (?) AND name = ?'
+    assert statement_shape('SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s) LIMIT 10') == 'SELECT * FROM t WHERE id IN (?) LIMIT ?'
+
+@pytest.mark.parametrize('path', [
+    '/api/v1/rooms',
+    '/api/v1/guests',
+    '/api/v1/dashboard/summary',
+    '/api/v1/reports/occupancy?date=2026-02-01'
+])
+def test_endpoint_queries_do_not_grow_with_rows(client, auth_headers, add_rooms, query_scaling, path):
+    query_scaling.check(lambda: client.get(path, headers=auth_headers), add_rooms, sizes=(1, 5))
+
+def test_room_guests_are_not_loaded_per_room(app, client, auth_headers, add_rooms, query_counter):
+    add_rooms(5)
+    with query_counter() as stats:
+        response = client.get('/api/v1/rooms', headers=auth_headers)
+    assert response.status_code == 200
+    assert not stats.repeated()
+
+def test_debug_responses_carry_query_headers(app, client, auth_headers, add_rooms):
+    add_rooms(1)
+    app.config['SQL_QUERY_HEADERS'] = True
+    response = client.get('/api/v1/rooms', headers=auth_headers)
+    assert int(response.headers['X-DB-Queries']) >= 1
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+
+def test_scaling_check_catches_per_row_queries(app, add_rooms, query_scaling):
+    # A lazy load of each room's guests, the pattern the check exists for
+    def per_row():
+        with app.app_context():
+            rooms = Room.query.all()
+            for room in rooms:
+                Guest.query.filter_by(room_id=room.id).all()
+        return app.response_class(status=200)
+    
+    with pytest.raises(pytest.fail.Exception, match='Query count grows with rows'):
+        query_scaling.check(per_row, add_rooms, sizes=(1, 3))
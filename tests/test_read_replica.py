@@ -0,0 +1,121 @@
+import shutil
+import threading
+import pytest
+from flask_jwt_extended import create_access_token
+from src.main import create_app
+from src.models.db import db
+from src.models.room import Room
+from src.services.etags import bump_table_versions
+from src.services.migrations import run_migrations
+from src.services.occupancy_timeline import occupancy_timeline_cache
+from src.services.read_replica import replica_router
+from src.services.response_cache import ROOMS
+
+@pytest.fixture
+def replica_path(tmp_path):
+    return str(tmp_path / 'replica.db')
+
+# An app whose replica is a copy of the primary SQLite file; copying the
+# file again plays the replica catching up
+@pytest.fixture
+def replica_app(database_path, replica_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'DATABASE_REPLICA_URL': f'sqlite:///{replica_path}',
+        'REPLICA_CHECK_SECONDS': 0,
+        'TESTING': True
+    })
+    with app.app_context():
+        run_migrations()
+        db.session.add(Room(room_number='101', capacity=2, status='available'))
+        bump_table_versions(ROOMS)
+        db.session.commit()
+    shutil.copy(database_path, replica_path)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+        db.get_engine(bind='replica').dispose()
+
+# Its own token: the shared auth_headers fixture would build a second app
+# and reconfigure the process-wide replica router
+@pytest.fixture
+def replica_headers(replica_app):
+    with replica_app.app_context():
+        token = create_access_token(identity={'id': 1, 'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+def add_vacant_room(app, room_number):
+    with app.app_context():
+        db.session.add(Room(room_number=room_number, capacity=2, status='available'))
+        bump_table_versions(ROOMS)
+        db.session.commit()
+
+def vacant_rooms(client, headers):
+    return client.get('/api/v1/dashboard/summary', headers=headers).get_json()['data']['vacant_rooms']
+
+def test_read_only_endpoints_read_the_replica(replica_app, replica_headers):
+    client = replica_app.test_client()
+    add_vacant_room(replica_app, '102')
+    assert vacant_rooms(client, replica_headers) == 1
+    
+    # Writes and their own reads stay on the primary
+    response = client.get('/api/v1/rooms', headers=replica_headers)
+    assert len(response.get_json()['data']['rooms']) == 2
+
+def test_cached_replica_response_refreshes_when_the_replica_catches_up(replica_app, replica_headers, database_path, replica_path):
+    client = replica_app.test_client()
+    add_vacant_room(replica_app, '102')
+    assert vacant_rooms(client, replica_headers) == 1
+    
+    # Within the cache TTL, the replica's new versions give a new key
+    shutil.copy(database_path, replica_path)
+    assert vacant_rooms(client, replica_headers) == 2
+
+def test_lagging_replica_falls_back_to_the_primary(replica_app, replica_headers, monkeypatch):
+    client = replica_app.test_client()
+    add_vacant_room(replica_app, '102')
+    monkeypatch.setattr(replica_router, '_measure_lag', lambda: replica_router.max_lag + 1)
+    assert vacant_rooms(client, replica_headers) == 2
+    assert replica_router.stats()['healthy'] is False
+
+def test_slow_replica_check_does_not_block_other_requests(replica_app, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow_measure():
+        started.set()
+        release.wait(5)
+        return 0.0
+    
+    monkeypatch.setattr(replica_router, '_measure_lag', slow_measure)
+    checker = threading.Thread(target=replica_router.available)
+    checker.start()
+    try:
+        assert started.wait(5)
+        # Another request goes by the last result while the check runs
+        finished = threading.Event()
+        threading.Thread(target=lambda: (replica_router.available(), finished.set())).start()
+        assert finished.wait(1)
+    finally:
+        release.set()
+        checker.join()
+    assert replica_router.stats()['healthy'] is True
+
+def timeline_capacity(client, headers):
+    response = client.get('/api/v1/reports/occupancy/timeline?start_date=2026-01-01&end_date=2026-01-07', headers=headers)
+    return response.get_json()['data']['timeline']['capacity']
+
+def test_occupancy_timeline_reads_the_replica(replica_app, replica_headers, database_path, replica_path):
+    client = replica_app.test_client()
+    add_vacant_room(replica_app, '102')
+    assert timeline_capacity(client, replica_headers) == 2
+    
+    shutil.copy(database_path, replica_path)
+    assert timeline_capacity(client, replica_headers) == 4
+
+def test_replica_months_are_not_cached_right_after_an_invalidation(replica_app, replica_headers):
+    client = replica_app.test_client()
+    occupancy_timeline_cache.invalidate()
+    cached = occupancy_timeline_cache.stats()['cached_months']
+    timeline_capacity(client, replica_headers)
+    assert occupancy_timeline_cache.stats()['cached_months'] == cached
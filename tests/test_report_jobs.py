@@ -0,0 +1,139 @@
+from datetime import date, datetime, timedelta
+import os
+import time
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.report_job import ReportJob
+from src.models.room import Room
+from src.services import report_jobs
+from src.services.report_jobs import expire_report_jobs, fail_stale_jobs, find_reusable_job, job_params_hash
+
+HOUR = 3600
+
+@pytest.fixture
+def jobs_dir(app, tmp_path):
+    directory = tmp_path / 'report_jobs'
+    directory.mkdir()
+    app.config['REPORT_JOBS_DIR'] = str(directory)
+    return directory
+
+def add_job(status, age, params_hash='same', file_path=None):
+    at = datetime.utcnow() - timedelta(seconds=age)
+    job = ReportJob(
+        report_type='guests', format='csv', params='{}', params_hash=params_hash, status=status,
+        file_path=file_path, created_at=at, updated_at=at,
+        completed_at=at if status in ['completed', 'failed'] else None
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+def write_artifact(directory, name, age):
+    path = directory / name
+    path.write_text('report')
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return str(path)
+
+def test_in_flight_jobs_are_reused_until_they_go_stale(app):
+    with app.app_context():
+        stale = add_job('running', 2 * HOUR)
+        assert find_reusable_job('same', reuse_seconds=600, stale_seconds=HOUR) is None
+        fresh = add_job('pending', 10, params_hash='other')
+        assert find_reusable_job('other', reuse_seconds=600, stale_seconds=HOUR).id == fresh
+        
+        ReportJob.query.get(stale).updated_at = datetime.utcnow()
+        db.session.commit()
+        assert find_reusable_job('same', reuse_seconds=600, stale_seconds=HOUR).id == stale
+
+def test_stale_jobs_are_failed(app):
+    with app.app_context():
+        stale = add_job('running', 2 * HOUR)
+        fresh = add_job('running', 10, params_hash='other')
+        assert fail_stale_jobs(HOUR) == 1
+        db.session.expire_all()
+        assert ReportJob.query.get(stale).status == 'failed'
+        assert ReportJob.query.get(stale).error
+        assert ReportJob.query.get(fresh).status == 'running'
+
+def test_expiry_removes_old_jobs_and_artifacts(app, jobs_dir):
+    with app.app_context():
+        old_file = write_artifact(jobs_dir, '1_old.csv', 2 * HOUR)
+        new_file = write_artifact(jobs_dir, '2_new.csv', 10)
+        orphan = write_artifact(jobs_dir, '3_crashed.csv.part', 2 * HOUR)
+        add_job('completed', 2 * HOUR, file_path=old_file)
+        add_job('failed', 2 * HOUR)
+        new = add_job('completed', 10, file_path=new_file)
+        running = add_job('running', 2 * HOUR)
+        
+        assert expire_report_jobs(app, HOUR) == 2
+        assert {job.id for job in ReportJob.query} == {new, running}
+        assert sorted(os.listdir(jobs_dir)) == ['2_new.csv']
+        assert not os.path.exists(orphan)
+
+@pytest.fixture
+def guests(app, jobs_dir):
+    with app.app_context():
+        room = Room(room_number='101', capacity=2, active_occupants=2, status='occupied')
+        db.session.add(room)
+        db.session.flush()
+        for name in ['Asha Rao', 'Ravi Nair']:
+            db.session.add(Guest(
+                full_name=name, contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            ))
+        db.session.commit()
+
+def submit(client, auth_headers):
+    return client.post('/api/v1/reports/jobs', headers=auth_headers, json={
+        'report_type': 'guests', 'format': 'csv', 'params': {'status': 'active'}
+    })
+
+def wait_for(client, auth_headers, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f'/api/v1/reports/jobs/{job_id}', headers=auth_headers).get_json()['data']['job']
+        if job['status'] in ['completed', 'failed'] or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+def test_job_artifact_matches_the_synchronous_report(client, auth_headers, guests):
+    response = submit(client, auth_headers)
+    assert response.status_code == 202
+    job = wait_for(client, auth_headers, response.get_json()['data']['job']['id'])
+    assert job['status'] == 'completed'
+    assert 'progress' not in job
+    
+    download = client.get(job['download_url'], headers=auth_headers)
+    report = client.get('/api/v1/reports/guests?format=csv&status=active', headers=auth_headers)
+    assert download.status_code == 200
+    assert download.get_data() == report.get_data()
+    assert b'Asha Rao' in download.get_data()
+
+def test_identical_requests_share_one_job(client, auth_headers, guests):
+    first = submit(client, auth_headers)
+    second = submit(client, auth_headers)
+    assert (first.status_code, second.status_code) == (202, 200)
+    assert second.get_json()['data']['job']['id'] == first.get_json()['data']['job']['id']
+    wait_for(client, auth_headers, first.get_json()['data']['job']['id'])
+
+def test_insert_race_reuses_the_job_that_won(app, client, auth_headers, guests, monkeypatch):
+    # Another process queues the same report after this one looked for it
+    with app.app_context():
+        winner = add_job('pending', 10, params_hash=job_params_hash('guests', 'csv', {'status': 'active'}))
+    lookups = []
+    real_lookup = report_jobs.find_reusable_job
+    
+    def find_after_the_race(*args):
+        lookups.append(args)
+        return real_lookup(*args) if len(lookups) > 1 else None
+    
+    monkeypatch.setattr(report_jobs, 'find_reusable_job', find_after_the_race)
+    
+    response = submit(client, auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['data']['job']['id'] == winner
+    assert len(lookups) == 2
+    with app.app_context():
+        assert ReportJob.query.count() == 1
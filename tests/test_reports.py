@@ -0,0 +1,146 @@
+from datetime import date
+import csv
+import io
+import tempfile
+import pytest
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.payment import Payment
+from src.models.room import Room
+from src.models.room_history import RoomHistory
+
+RANGE = 'start_date=2026-02-01&end_date=2026-03-31'
+
+@pytest.fixture
+def payments(app):
+    # Two rooms with a guest each and a month of payments per guest, one of
+    # them outside RANGE
+    with app.app_context():
+        ids = {}
+        for number in range(2):
+            room = Room(room_number=f'10{number + 1}', capacity=1, active_occupants=1, status='occupied')
+            db.session.add(room)
+            db.session.flush()
+            guest = Guest(
+                full_name=f'Guest {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+            )
+            db.session.add(guest)
+            db.session.flush()
+            ids[number] = (guest.id, room.id)
+            for month, status in [(1, 'paid'), (2, 'paid'), (3, 'partial')]:
+                db.session.add(Payment(
+                    guest_id=guest.id, amount=5000.5 + number, payment_date=date(2026, month, 28),
+                    payment_type='full', status=status, due_date=date(2026, month, 1)
+                ))
+        db.session.commit()
+    return ids
+
+# Rows as the report built them before the joined query, looking the guest
+# and room up for every payment
+def rent_rows_per_payment(guest_id=None):
+    query = Payment.query.filter(Payment.payment_date >= date(2026, 2, 1), Payment.payment_date <= date(2026, 3, 31))
+    if guest_id:
+        query = query.filter(Payment.guest_id == guest_id)
+    rows = []
+    for payment in query.order_by(Payment.id):
+        guest = Guest.query.get(payment.guest_id)
+        room = Room.query.get(guest.room_id)
+        rows.append({
+            'payment_id': payment.id,
+            'guest_name': guest.full_name,
+            'room_number': room.room_number,
+            'amount': float(payment.amount),
+            'payment_date': payment.payment_date.strftime('%Y-%m-%d'),
+            'status': payment.status,
+            'due_date': payment.due_date.strftime('%Y-%m-%d')
+        })
+    return rows
+
+def rent_report(client, auth_headers, query=''):
+    response = client.get(f'/api/v1/reports/rent?{RANGE}{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return response.get_json()['data']['report']
+
+def test_rent_report_matches_per_payment_lookups(app, client, auth_headers, payments):
+    report = rent_report(client, auth_headers)
+    with app.app_context():
+        assert report['payments'] == rent_rows_per_payment()
+    assert report['total_amount'] == pytest.approx(5000.5 + 5001.5)
+
+@pytest.mark.parametrize('filter_name', ['guest_id', 'room_id'])
+def test_rent_report_filters(app, client, auth_headers, payments, filter_name):
+    guest_id, room_id = payments[1]
+    value = guest_id if filter_name == 'guest_id' else room_id
+    report = rent_report(client, auth_headers, f'&{filter_name}={value}')
+    with app.app_context():
+        assert report['payments'] == rent_rows_per_payment(guest_id)
+
+def test_rent_report_lists_payments_of_deleted_guests(app, client, auth_headers, payments):
+    with app.app_context():
+        Guest.query.filter_by(id=payments[0][0]).delete()
+        db.session.commit()
+    report = rent_report(client, auth_headers)
+    assert [row['guest_name'] for row in report['payments']] == ['Unknown', 'Unknown', 'Guest 1', 'Guest 1']
+    assert {row['room_number'] for row in report['payments'][:2]} == {'Unknown'}
+
+def test_rent_report_queries_do_not_grow_with_rows(app, client, auth_headers, query_scaling):
+    def seed(count):
+        with app.app_context():
+            for _ in range(count):
+                room = Room(room_number=f'R{Room.query.count() + 1}', capacity=1, status='occupied')
+                db.session.add(room)
+                db.session.flush()
+                guest = Guest(
+                    full_name=f'Guest {room.room_number}', contact_number='9000000000', id_proof_url='id.jpg',
+                    check_in_date=date(2026, 1, 1), rent_amount=5000, status='active', room_id=room.id
+                )
+                db.session.add(guest)
+                db.session.flush()
+                db.session.add(Payment(
+                    guest_id=guest.id, amount=5000, payment_date=date(2026, 2, 28),
+                    payment_type='full', status='paid', due_date=date(2026, 2, 1)
+                ))
+            db.session.commit()
+    
+    query_scaling.check(lambda: client.get(f'/api/v1/reports/rent?{RANGE}', headers=auth_headers), seed)
+
+@pytest.fixture
+def stays(app, payments):
+    # Both guests were in their rooms on 2026-02-15
+    with app.app_context():
+        for guest_id, room_id in payments.values():
+            db.session.add(RoomHistory(guest_id=guest_id, room_id=room_id, start_date=date(2026, 1, 1)))
+        db.session.commit()
+
+REPORTS = [
+    (f'/api/v1/reports/rent?{RANGE}', 'payments'),
+    ('/api/v1/reports/occupancy?date=2026-02-15', 'rooms'),
+    ('/api/v1/reports/guests?status=active', 'guests'),
+    (f'/api/v1/reports/payments?{RANGE}', 'payments')
+]
+
+@pytest.mark.parametrize('path, rows_key', REPORTS)
+def test_csv_rows_match_the_json_report(client, auth_headers, stays, path, rows_key):
+    json_rows = client.get(path, headers=auth_headers).get_json()['data']['report'][rows_key]
+    response = client.get(f'{path}&format=csv', headers=auth_headers)
+    csv_rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert json_rows
+    assert csv_rows == [{name: str(value) for name, value in row.items()} for row in json_rows]
+
+@pytest.mark.parametrize('path', [path for path, _ in REPORTS])
+def test_csv_is_streamed_without_temp_files(client, auth_headers, stays, monkeypatch, path):
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError('CSV exports must not write temp files')
+    
+    monkeypatch.setattr(tempfile, 'mkstemp', no_temp_files)
+    response = client.get(f'{path}&format=csv', buffered=False, headers=auth_headers)
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    assert 'attachment' in response.headers['Content-Disposition']
+    
+    # The header row goes out before any report row
+    chunks = iter(response.response)
+    assert next(chunks).count(b'\n') == 1
+    assert b''.join(chunks)
+    response.close()
@@ -0,0 +1,61 @@
+from datetime import date
+import subprocess
+import sys
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.room import Room
+from src.services.response_cache import response_cache
+
+# Writes through a separate interpreter, like another gunicorn worker would:
+# nothing in this process hears about it except through the database
+WRITE_FROM_ANOTHER_PROCESS = '''
+import sqlite3, sys
+connection = sqlite3.connect(sys.argv[1])
+connection.execute("UPDATE guests SET status = 'active' WHERE status = 'inactive'")
+connection.execute("UPDATE table_versions SET version = version + 1 WHERE table_name = 'guests'")
+connection.commit()
+'''
+
+def add_guests(app):
+    with app.app_context():
+        room = Room(room_number='101', capacity=3, status='occupied')
+        db.session.add(room)
+        db.session.flush()
+        for number, status in enumerate(['active', 'inactive']):
+            db.session.add(Guest(
+                full_name=f'Guest {number}', contact_number='9000000000', id_proof_url='id.jpg',
+                check_in_date=date(2026, 1, 1), rent_amount=5000, status=status, room_id=room.id
+            ))
+        db.session.commit()
+
+def test_write_in_another_process_changes_etag_and_body(app, client, auth_headers, database_path):
+    add_guests(app)
+    
+    first = client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    assert first.get_json()['data']['active_guests'] == 1
+    hits = response_cache.stats()['hits']
+    cached = client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    assert cached.get_json() == first.get_json()
+    assert response_cache.stats()['hits'] == hits + 1
+    
+    subprocess.run([sys.executable, '-c', WRITE_FROM_ANOTHER_PROCESS, database_path], check=True)
+    
+    second = client.get('/api/v1/dashboard/summary', headers={**auth_headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.get_json()['data']['active_guests'] == 2
+    
+    revalidated = client.get('/api/v1/dashboard/summary', headers={**auth_headers, 'If-None-Match': second.headers['ETag']})
+    assert revalidated.status_code == 304
+
+def test_cached_body_matches_its_etag(app, client, auth_headers, database_path):
+    add_guests(app)
+    client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    subprocess.run([sys.executable, '-c', WRITE_FROM_ANOTHER_PROCESS, database_path], check=True)
+    
+    # Both requests after the write agree, whether computed or from the cache
+    computed = client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    cached = client.get('/api/v1/dashboard/summary', headers=auth_headers)
+    assert computed.headers['ETag'] == cached.headers['ETag']
+    assert computed.get_json() == cached.get_json()
+    assert cached.get_json()['data']['active_guests'] == 2
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from flask import jsonify
+from src.models.db import db
+from src.models.guest import Guest
+from src.models.notification import Notification
+from src.models.payment import Payment
+from src.models.room import Room
+from src.models.user import User
+from src.services import serialization
+from src.services.serialization import json_response, serializable, serialized_rows
+
+@pytest.fixture
+def records(app):
+    # Non-ASCII names, null dates, fractional amounts and microsecond timestamps
+    with app.app_context():
+        room = Room(room_number='101', capacity=2, status='occupied', notes='Café side — "quiet"')
+        db.session.add(room)
+        db.session.flush()
+        guest = Guest(
+            full_name='Zoë Ñandú \U0001F600', contact_number='+91 90000 00000', id_proof_url='id.jpg',
+            check_in_date=date(2026, 1, 1), rent_amount=Decimal('5000.75'), status='active', room_id=room.id,
+            created_at=datetime(2026, 1, 1, 9, 30, 15, 123456)
+        )
+        db.session.add(guest)
+        db.session.add(Guest(
+            full_name='Ravi Nair', contact_number='9000000000', email='ravi@example.com', id_proof_url='id.jpg',
+            check_in_date=date(2026, 1, 1), check_out_date=date(2026, 2, 1), rent_amount=5000,
+            status='inactive', room_id=room.id
+        ))
+        db.session.flush()
+        db.session.add(Payment(
+            guest_id=guest.id, amount=Decimal('2500.10'), payment_date=date(2026, 1, 31), payment_type='partial',
+            status='partial', due_date=date(2026, 1, 1)
+        ))
+        db.session.add(Notification(guest_id=guest.id, type='sms', message='Rent is due\nToday', status='pending'))
+        db.session.add(User(email='admin@example.com', password_hash='x', full_name='Admin', role='admin'))
+        db.session.commit()
+
+@pytest.mark.parametrize('model', [Guest, Payment, Room, Notification, User])
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_tuples_encode_to_the_to_dict_bytes(app, records, monkeypatch, model, encoder):
+    if encoder == 'json':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    with app.test_request_context():
+        rows = serializable(model.query.order_by(model.id), model).all()
+        expected = jsonify({'items': [item.to_dict() for item in model.query.order_by(model.id)]})
+        assert json_response({'items': serialized_rows(rows)}).get_data() == expected.get_data()
+        assert rows and set(rows[0]._fields) == set(model.SERIALIZED_FIELDS)
+
+def test_pretty_printed_responses_match_jsonify(app, records):
+    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+    with app.test_request_context():
+        rows = serializable(Guest.query.order_by(Guest.id), Guest).all()
+        expected = jsonify({'guests': [guest.to_dict() for guest in Guest.query.order_by(Guest.id)]})
+        assert json_response({'guests': serialized_rows(rows)}).get_data() == expected.get_data()
+
+@pytest.mark.parametrize('path, key, model', [
+    ('/api/v1/guests', 'guests', Guest),
+    ('/api/v1/payments', 'payments', Payment),
+    ('/api/v1/rooms', 'rooms', Room)
+])
+def test_list_endpoints_return_the_to_dict_payload(app, client, auth_headers, records, path, key, model):
+    listed = client.get(path, headers=auth_headers).get_json()['data'][key]
+    with app.app_context():
+        expected = [item.to_dict() for item in model.query.order_by(model.id)]
+    assert [{name: item[name] for name in expected[0]} for item in listed] == expected
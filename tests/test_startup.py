@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from sqlalchemy import inspect
+from src.main import create_app
+from src.models.db import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only the report exports need
+HEAVY_MODULES = ['pandas', 'numpy', 'fpdf', 'matplotlib']
+
+IMPORT_APP = f'''
+import json, sys
+import src.main
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+'''
+
+def test_importing_the_app_loads_no_report_stack_and_no_database():
+    # The database port points nowhere, so any database I/O at import fails
+    env = dict(os.environ, DB_HOST='127.0.0.1', DB_PORT='1', AUTO_MIGRATE='true', AUTOCOMPLETE_ENABLED='true')
+    env.pop('DATABASE_URL', None)
+    result = subprocess.run([sys.executable, '-c', IMPORT_APP], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == []
+
+def test_migrations_wait_for_the_first_request(tmp_path, monkeypatch):
+    monkeypatch.setenv('AUTO_MIGRATE', 'true')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'startup.db'}", 'TESTING': True})
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+    
+    app.test_client().get('/api/v1/rooms')
+    with app.app_context():
+        assert {'schema_migrations', 'guests', 'payments'} <= set(inspect(db.engine).get_table_names())
+        db.engine.dispose()
+
+def test_pdf_reports_still_render(client, auth_headers):
+    response = client.get('/api/v1/reports/guests?format=pdf', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.get_data().startswith(b'%PDF')